@@ -3,13 +3,36 @@
 Config-driven: reads commands from .claude/quality-gate.json (generated by /ignite).
 Fails open if config missing (warns but allows commit).
 Skips gates whose lead binary is not installed (early-phase graceful degradation).
+
+A gate command may be an object with "paths"/"extensions" filters: the gate
+is skipped when no staged file matches them. "{staged_files}" and
+"{staged_files:py}" in a command expand to the staged files (after the
+gate's filters, then by extension); a command without them checks the
+whole project.
+
+Gates run one after another (typecheck → lint → test) unless the config sets
+"parallel": true, in which case up to "max_workers" gates run at once. With
+"fail_fast" (default) the first failure stops the run: in parallel mode the
+gates still running are killed along with every process they started.
 """
+import fnmatch
+import hashlib
+import shlex
 import shutil
+import signal
 import sys
 import json
 import re
 import subprocess
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+GATE_ORDER = ["typecheck", "lint", "test"]
+ERROR_LINES = 10  # output lines quoted per failed gate
+DRAIN_SECONDS = 5  # how long to wait for a killed gate's pipes to close
 
 
 def _resolve_binary(cmd):
@@ -32,6 +55,374 @@ def _command_exists(cmd):
     return shutil.which(binary) is not None
 
 
+# {staged_files} or {staged_files:py,pyi} in a gate command
+STAGED_PLACEHOLDER = re.compile(r"\{staged_files(?::([\w.,+-]+))?\}")
+# Short options of git commit that take a value: the rest of the cluster is that value
+_COMMIT_VALUE_OPTS = set("mFCctuS")
+
+
+def _gate_spec(value):
+    """Normalize a quality-gate.json command entry.
+
+    Either a command string (full-project, always runs) or an object:
+      {"command": "ruff check {staged_files:py}", "paths": ["src/"], "extensions": ["py"]}
+    Returns None for disabled gates ("N/A" or empty).
+    """
+    if isinstance(value, dict):
+        cmd = value.get("command")
+        paths = value.get("paths") or []
+        extensions = value.get("extensions") or []
+    else:
+        cmd, paths, extensions = value, [], []
+    if not isinstance(cmd, str) or not cmd.strip() or cmd == "N/A":
+        return None
+    if isinstance(paths, str):
+        paths = [paths]
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    return {
+        "command": cmd,
+        "paths": [p.replace("\\", "/") for p in paths if isinstance(p, str) and p],
+        "extensions": _normalize_exts(e for e in extensions if isinstance(e, str)),
+    }
+
+
+def _normalize_exts(exts):
+    return {"." + e.strip().lstrip(".").lower() for e in exts if e.strip().lstrip(".")}
+
+
+def _commits_all(command):
+    """True if the git commit stages tracked changes itself (-a / --all)."""
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        tokens = command.split()
+    after_commit = False
+    for token in tokens:
+        if not after_commit:
+            after_commit = token == "commit"
+            continue
+        if token in ("&&", "||", ";", "|"):
+            break
+        if token == "--all":
+            return True
+        if token.startswith("-") and not token.startswith("--"):
+            for ch in token[1:]:
+                if ch == "a":
+                    return True
+                if ch in _COMMIT_VALUE_OPTS:
+                    break
+    return False
+
+
+def _staged_files(cwd, command, timeout):
+    """Files the commit will contain (added, copied, modified, renamed).
+
+    Deleted files are left out: there is nothing to lint or typecheck.
+    `git commit -a` adds tracked changes at commit time, so those count too.
+    Paths are relative to cwd, where the gates run and "paths" filters apply
+    (a project in a monorepo subdirectory); files outside it are left out.
+    Returns None if git cannot tell (not a repo, git missing).
+    """
+    diff = ["git", "diff", "--name-only", "--relative", "-z", "--diff-filter=ACMR"]
+    diff += ["HEAD"] if _commits_all(command) else ["--cached"]
+    try:
+        result = subprocess.run(diff, capture_output=True, cwd=cwd, timeout=timeout)
+        if result.returncode != 0 and "HEAD" in diff:  # no commits yet
+            diff[-1] = "--cached"
+            result = subprocess.run(diff, capture_output=True, cwd=cwd, timeout=timeout)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return [f for f in result.stdout.decode("utf-8", "replace").split("\0") if f]
+
+
+def _matches(path, paths, extensions):
+    """Path/extension filter of a gate. Paths are directory prefixes or globs."""
+    if extensions and os.path.splitext(path)[1].lower() not in extensions:
+        return False
+    if not paths:
+        return True
+    for pattern in paths:
+        prefix = pattern.rstrip("/")
+        if path == prefix or path.startswith(prefix + "/") or fnmatch.fnmatchcase(path, pattern):
+            return True
+    return False
+
+
+def _expand_staged(cmd, files):
+    """Replace staged-file placeholders with shell-quoted paths.
+
+    Returns (command, empty): empty is True when a placeholder matched
+    no file, in which case the gate has nothing to check.
+    """
+    empty = False
+
+    def _sub(m):
+        nonlocal empty
+        exts = _normalize_exts(m.group(1).split(",")) if m.group(1) else set()
+        selected = [f for f in files if _matches(f, [], exts)]
+        if not selected:
+            empty = True
+        return " ".join(shlex.quote(f) for f in selected)
+
+    return STAGED_PLACEHOLDER.sub(_sub, cmd), empty
+
+
+# --- Result cache ---
+
+# Passed gates are remembered per (staged tree, gate command, config) in
+# .claude/quality-gate-cache.json, so a retried commit skips them.
+CACHE_FILENAME = "quality-gate-cache.json"
+CACHE_MAX_ENTRIES = 512  # least recently used entries are evicted past this
+
+
+def _git(args, cwd, timeout, env=None):
+    """Run git; stdout as text, or None on any failure."""
+    try:
+        result = subprocess.run(
+            ["git"] + args, capture_output=True, text=True, cwd=cwd, timeout=timeout, env=env,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _tree_hash(cwd, command, timeout):
+    """Hash of the tree the commit will record (`git write-tree`), or None.
+
+    Gates check the working tree, not the index, so there is no usable
+    hash while tracked files have unstaged changes. Under `git commit -a`
+    those are part of the commit: the tree is written from a scratch copy
+    of the index with them added.
+    """
+    if not _commits_all(command):
+        try:
+            dirty = subprocess.run(
+                ["git", "diff", "--quiet"], capture_output=True, cwd=cwd, timeout=timeout,
+            ).returncode != 0
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return None if dirty else _git(["write-tree"], cwd, timeout)
+    index = _git(["rev-parse", "--git-path", "index"], cwd, timeout)
+    if not index:
+        return None
+    fd, scratch = tempfile.mkstemp(suffix=".index")
+    os.close(fd)
+    try:
+        shutil.copyfile(os.path.join(cwd, index), scratch)
+        env = dict(os.environ, GIT_INDEX_FILE=scratch)
+        if _git(["add", "-u"], cwd, timeout, env) is None:
+            return None
+        return _git(["write-tree"], cwd, timeout, env)
+    except OSError:
+        return None
+    finally:
+        try:
+            os.remove(scratch)
+        except OSError:
+            pass
+
+
+def _cache_key(tree, gate, cmd, config_hash, bash_cmd):
+    material = f"{tree}\0{gate}\0{cmd}\0{config_hash}\0{bash_cmd}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cache_load(path):
+    """{key: last used (epoch seconds)}; empty if missing or corrupt."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(entries, dict):
+        return {}
+    return {k: v for k, v in entries.items() if isinstance(v, (int, float))}
+
+
+def _cache_save(path, entries):
+    """Write the newest CACHE_MAX_ENTRIES entries. Failures are ignored."""
+    newest = sorted(entries.items(), key=lambda kv: kv[1], reverse=True)[:CACHE_MAX_ENTRIES]
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(dict(newest), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Fail open: the gates already ran
+
+
+# --- Gate execution ---
+
+
+def _spawn(bash_cmd, cmd, cwd):
+    """Start a gate in its own process group so it can be killed as a whole."""
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    return subprocess.Popen(
+        [bash_cmd, "-c", cmd],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=cwd,
+        **kwargs,
+    )
+
+
+def _kill_tree(proc):
+    """Kill a gate's shell and everything it started (test runners, workers)."""
+    try:
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                capture_output=True,
+                timeout=DRAIN_SECONDS,
+            )
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        pass  # group already gone
+    try:
+        proc.kill()
+    except OSError:
+        pass
+
+
+class _GateRunner:
+    """Runs gates and keeps track of the live ones so a failure can cancel the rest."""
+
+    def __init__(self, bash_cmd, cwd, timeout):
+        self.bash_cmd = bash_cmd
+        self.cwd = cwd
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._running = {}  # gate -> Popen
+        self._killed = set()
+
+    def run(self, gate, cmd):
+        """Run one gate. Returns a result dict; status is passed, failed,
+        timeout, cancelled (never started), killed (cancelled while running)
+        or error (could not start: warn, do not block)."""
+        result = {"gate": gate, "cmd": cmd, "status": "cancelled", "output": "", "seconds": 0.0}
+        if self.cancelled.is_set():
+            return result
+        start = time.monotonic()
+        try:
+            proc = _spawn(self.bash_cmd, cmd, self.cwd)
+        except OSError as e:
+            result.update(status="error", output=str(e))
+            return result
+        with self._lock:
+            self._running[gate] = proc
+            if self.cancelled.is_set():  # cancel() ran between the check and the spawn
+                self._killed.add(gate)
+                _kill_tree(proc)
+        try:
+            try:
+                stdout, stderr = proc.communicate(timeout=self.timeout)
+                timed_out = False
+            except subprocess.TimeoutExpired:
+                _kill_tree(proc)
+                timed_out = True
+                try:
+                    stdout, stderr = proc.communicate(timeout=DRAIN_SECONDS)
+                except subprocess.TimeoutExpired:
+                    stdout, stderr = "", ""  # a grandchild left the group and holds the pipe
+        finally:
+            with self._lock:
+                self._running.pop(gate, None)
+                killed = gate in self._killed
+        result["seconds"] = time.monotonic() - start
+        if killed:
+            result["status"] = "killed"
+            return result
+        if timed_out:
+            result["status"] = "timeout"
+        elif proc.returncode != 0:
+            # Collect error output (stderr first, fallback to stdout)
+            result["status"] = "failed"
+            result["output"] = (stderr or "").strip() or (stdout or "").strip()
+        else:
+            result["status"] = "passed"
+        return result
+
+    def cancel(self):
+        """Stop gates not yet started and kill the process groups of running ones."""
+        with self._lock:
+            self.cancelled.set()
+            for gate, proc in self._running.items():
+                self._killed.add(gate)
+                _kill_tree(proc)
+
+
+def _run_sequential(runner, gates, fail_fast):
+    results = []
+    for gate, cmd in gates:
+        result = runner.run(gate, cmd)
+        results.append(result)
+        if fail_fast and result["status"] in ("failed", "timeout"):
+            runner.cancelled.set()
+    return results
+
+
+def _run_parallel(runner, gates, fail_fast, max_workers):
+    def run(gate, cmd):
+        result = runner.run(gate, cmd)
+        # Cancel from the worker, before it picks up a queued gate
+        if fail_fast and result["status"] in ("failed", "timeout"):
+            runner.cancel()
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(run, gate, cmd) for gate, cmd in gates]
+        return [future.result() for future in as_completed(futures)]
+
+
+def _failure_block(result, timeout):
+    """Deny-reason paragraph for one failed or timed-out gate."""
+    gate, cmd = result["gate"], result["cmd"]
+    if result["status"] == "timeout":
+        return (
+            f"Quality gate: {gate} timed out after {timeout}s.\n"
+            f"Command: {cmd}\n"
+        )
+    error_lines = result["output"].splitlines()
+    block = f"Quality gate: {gate} FAILED. Fix before committing:\n"
+    block += f"  Command: {cmd}\n"
+    for line in error_lines[:ERROR_LINES]:
+        block += f"  {line}\n"
+    if len(error_lines) > ERROR_LINES:
+        block += f"  ... ({len(error_lines) - ERROR_LINES} more lines)\n"
+    block += f"Run: {cmd} for full output.\n"
+    return block
+
+
+def _deny_reason(results, timeout):
+    failed = [r for r in results if r["status"] in ("failed", "timeout")]
+    if not failed:
+        return None
+    failed.sort(key=lambda r: GATE_ORDER.index(r["gate"]))
+    reason = "\n".join(_failure_block(r, timeout) for r in failed)
+    for status, label in (("killed", "Cancelled while running"), ("cancelled", "Not run")):
+        gates = sorted((r["gate"] for r in results if r["status"] == status), key=GATE_ORDER.index)
+        if gates:
+            reason += f"{label} (stopped after the first failure): {', '.join(gates)}\n"
+    reason += "Fix the issue or use --no-verify to bypass."
+    return reason
+
+
+def _positive_int(value, default):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        return default
+    return value
+
+
 def main():
     try:
         data = json.load(sys.stdin)
@@ -73,15 +464,26 @@ def main():
 
     commands = config.get("commands", {})
     timeout = config.get("timeout_seconds", 60)
-
-    # Run quality checks sequentially: typecheck → lint → test
-    gate_order = ["typecheck", "lint", "test"]
+    parallel = config.get("parallel", False) is True
+    fail_fast = config.get("fail_fast", True) is not False
     bash_cmd = os.environ.get("CLAUDE_CODE_GIT_BASH_PATH", "bash")
 
-    for gate in gate_order:
-        cmd = commands.get(gate, "N/A")
-        if not cmd or cmd == "N/A":
-            continue
+    specs = [(gate, _gate_spec(commands.get(gate, "N/A"))) for gate in GATE_ORDER]
+    specs = [(gate, spec) for gate, spec in specs if spec]
+    staged = None
+    if any(spec["paths"] or spec["extensions"] or STAGED_PLACEHOLDER.search(spec["command"])
+           for _, spec in specs):
+        staged = _staged_files(cwd, command, timeout)
+        if staged is None:
+            print(
+                "Quality gate WARNING: could not list staged files, "
+                "filters ignored and staged-file gates skipped.",
+                file=sys.stderr,
+            )
+
+    gates = []
+    for gate, spec in specs:
+        cmd = spec["command"]
 
         # Early-phase guard: skip gates whose binary isn't installed yet
         if not _command_exists(cmd):
@@ -93,62 +495,76 @@ def main():
             )
             continue
 
-        try:
-            result = subprocess.run(
-                [bash_cmd, "-c", cmd],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=cwd,
-            )
-        except subprocess.TimeoutExpired:
-            reason = (
-                f"Quality gate: {gate} timed out after {timeout}s.\n"
-                f"Command: {cmd}\n"
-                f"Fix the issue or use --no-verify to bypass."
-            )
-            json.dump(
-                {
-                    "hookSpecificOutput": {
-                        "hookEventName": "PreToolUse",
-                        "permissionDecision": "deny",
-                        "permissionDecisionReason": reason,
-                    }
-                },
-                sys.stdout,
-            )
-            sys.exit(0)
-        except FileNotFoundError as e:
+        if staged is not None:
+            relevant = [f for f in staged if _matches(f, spec["paths"], spec["extensions"])]
+            cmd, empty = _expand_staged(cmd, relevant)
+            filtered = spec["paths"] or spec["extensions"]
+            if (filtered and not relevant) or empty:
+                print(
+                    f"Quality gate: {gate} skipped — no staged files it checks.",
+                    file=sys.stderr,
+                )
+                continue
+        elif STAGED_PLACEHOLDER.search(cmd):
+            continue
+        gates.append((gate, cmd))
+
+    cache_path = os.path.join(cwd, ".claude", CACHE_FILENAME)
+    cache, keys = {}, {}
+    if gates and config.get("cache", True) is not False:
+        tree = _tree_hash(cwd, command, timeout)
+        if tree:
+            config_hash = hashlib.sha256(
+                json.dumps(config, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            cache = _cache_load(cache_path)
+            keys = {gate: _cache_key(tree, gate, cmd, config_hash, bash_cmd) for gate, cmd in gates}
+            now = time.time()
+            for gate, cmd in list(gates):
+                if keys[gate] in cache:
+                    cache[keys[gate]] = now
+                    gates.remove((gate, cmd))
+                    print(
+                        f"Quality gate: {gate} cached pass (tree {tree[:12]} unchanged).",
+                        file=sys.stderr,
+                    )
+
+    runner = _GateRunner(bash_cmd, cwd, timeout)
+    if parallel and len(gates) > 1:
+        # Gates share the working tree: set "parallel": false for tools that
+        # write caches or build output the others read
+        max_workers = _positive_int(config.get("max_workers"), len(gates))
+        results = _run_parallel(runner, gates, fail_fast, min(max_workers, len(gates)))
+    else:
+        results = _run_sequential(runner, gates, fail_fast)
+
+    if keys:
+        now = time.time()
+        for result in results:
+            if result["status"] == "passed":
+                cache[keys[result["gate"]]] = now
+        _cache_save(cache_path, cache)
+
+    for result in results:
+        if result["status"] == "error":
             print(
-                f"Quality gate WARNING: Failed to run {gate}: {e}",
+                f"Quality gate WARNING: Failed to run {result['gate']}: {result['output']}",
                 file=sys.stderr,
             )
-            continue
 
-        if result.returncode != 0:
-            # Collect error output (stderr first, fallback to stdout)
-            error_output = result.stderr.strip() or result.stdout.strip()
-            error_lines = error_output.splitlines()[:10]
-
-            reason = f"Quality gate: {gate} FAILED. Fix before committing:\n"
-            reason += f"  Command: {cmd}\n"
-            for line in error_lines:
-                reason += f"  {line}\n"
-            if len(error_output.splitlines()) > 10:
-                reason += f"  ... ({len(error_output.splitlines()) - 10} more lines)\n"
-            reason += f"Run: {cmd} for full output."
-
-            json.dump(
-                {
-                    "hookSpecificOutput": {
-                        "hookEventName": "PreToolUse",
-                        "permissionDecision": "deny",
-                        "permissionDecisionReason": reason,
-                    }
-                },
-                sys.stdout,
-            )
-            sys.exit(0)
+    reason = _deny_reason(results, timeout)
+    if reason:
+        json.dump(
+            {
+                "hookSpecificOutput": {
+                    "hookEventName": "PreToolUse",
+                    "permissionDecision": "deny",
+                    "permissionDecisionReason": reason,
+                }
+            },
+            sys.stdout,
+        )
+        sys.exit(0)
 
     # All gates passed (or were N/A)
     sys.exit(0)
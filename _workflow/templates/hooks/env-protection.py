@@ -35,6 +35,9 @@ SENSITIVE_PATTERNS = [
     (r"key\.pem$", "PEM private key"),
 ]
 
+# Compiled once at import (kept warm by hook-daemon.py)
+_SENSITIVE_RULES = [(re.compile(p, re.IGNORECASE), desc) for p, desc in SENSITIVE_PATTERNS]
+
 
 def _check_path(path):
     """Check if a file path matches any sensitive pattern. Returns (matched, description)."""
@@ -42,8 +45,8 @@ def _check_path(path):
         return False, ""
     # Normalize path separators
     normalized = path.replace("\\", "/")
-    for pattern, desc in SENSITIVE_PATTERNS:
-        if re.search(pattern, normalized, re.IGNORECASE):
+    for regex, desc in _SENSITIVE_RULES:
+        if regex.search(normalized):
             return True, desc
     return False, ""
 
@@ -52,8 +55,8 @@ def _check_bash_command(command):
     """Check if a bash command accesses sensitive files. Returns (matched, description)."""
     if not command:
         return False, ""
-    for pattern, desc in SENSITIVE_PATTERNS:
-        if re.search(pattern, command, re.IGNORECASE):
+    for regex, desc in _SENSITIVE_RULES:
+        if regex.search(command):
             return True, desc
     return False, ""
 
@@ -0,0 +1,120 @@
+"""Ignite hook client: run a hook through hook-daemon.py when it is up.
+
+Register hooks as `python .claude/hooks/hook-client.py <hook>.py` instead of
+`python .claude/hooks/<hook>.py`. The client forwards stdin, cwd and environment
+to the daemon and replays its stdout, stderr and exit code. If the daemon is not
+running (or the platform has no Unix sockets) the hook runs in this process,
+exactly as if it had been invoked directly.
+
+Startup time is the point, so this imports only builtin modules: no json (it
+pulls in re), no hashlib, and _socket rather than socket. The wire format is
+NUL-separated fields (see hook-daemon.py). Set IGNITE_HOOKD=0 to bypass the
+daemon.
+"""
+import sys
+import os
+import zlib
+
+try:
+    import _socket
+except ImportError:  # Stripped-down builds
+    _socket = None
+
+# The daemon's client, not a hook: hook-daemon.py never serves a file with this line
+NOT_A_HOOK = True
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def socket_path(hooks_dir=HOOKS_DIR):
+    """Per-user, per-hooks-directory socket path (kept in sync with hook-daemon.py)."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    digest = zlib.crc32(hooks_dir.encode("utf-8", "surrogateescape"))
+    return os.path.join(base, f"ignite-hookd-{os.getuid()}", f"{digest:08x}.sock")
+
+
+def _connect():
+    if _socket is None or not hasattr(_socket, "AF_UNIX") or os.environ.get("IGNITE_HOOKD") == "0":
+        return None
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    sock.settimeout(0.5)
+    try:
+        sock.connect(socket_path())
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _encode(fields):
+    return b"\0".join(f.encode("utf-8", "surrogateescape") for f in fields)
+
+
+def _forward(sock, hook, stdin_text):
+    """Send one hook run to the daemon. Returns (exit, stdout, stderr), or None on any failure.
+
+    Request: run, hook, cwd, argc, argv..., envc, KEY=VALUE..., then stdin as the
+    last field. Reply: exit code, stdout length (in characters), then stdout and
+    stderr back to back.
+    """
+    argv = sys.argv[2:]
+    env = [f"{k}={v}" for k, v in os.environ.items()]
+    request = ["run", hook, os.getcwd(), str(len(argv))] + argv + [str(len(env))] + env + [stdin_text]
+    try:
+        sock.sendall(_encode(request))
+        sock.shutdown(_socket.SHUT_WR)
+        sock.settimeout(None)  # The hook itself may take a while (quality gates)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        code, out_len, output = b"".join(chunks).decode("utf-8", "surrogateescape").split("\0", 2)
+        code, out_len = int(code), int(out_len)
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    return code, output[:out_len], output[out_len:]
+
+
+def _run_in_process(path, stdin_text=None):
+    import io
+    import runpy
+
+    if stdin_text is not None:
+        sys.stdin = io.StringIO(stdin_text)
+    sys.argv = [path] + sys.argv[2:]
+    sys.path[0] = os.path.dirname(path)
+    runpy.run_path(path, run_name="__main__")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("hook-client: usage: hook-client.py <hook>.py", file=sys.stderr)
+        sys.exit(0)  # Fail open
+    hook = sys.argv[1]
+    path = os.path.join(HOOKS_DIR, hook)
+    if hook != os.path.basename(hook) or not os.path.isfile(path):
+        print(f"hook-client: no such hook: {hook}", file=sys.stderr)
+        sys.exit(0)  # Fail open
+
+    sock = _connect()
+    if sock is None:
+        _run_in_process(path)
+        return
+
+    stdin_text = sys.stdin.read()
+    reply = _forward(sock, hook, stdin_text)
+    if reply is None:
+        _run_in_process(path, stdin_text)
+        return
+    code, out, err = reply
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""Ignite hook daemon: keeps hook modules imported and their rule sets compiled.
+
+Optional. Hooks registered through hook-client.py forward their stdin JSON to
+this daemon over a Unix socket instead of starting a fresh interpreter; when the
+daemon is not running the client runs the hook in-process as before.
+
+Usage:
+    python .claude/hooks/hook-daemon.py start    # Detach and serve this hooks dir
+    python .claude/hooks/hook-daemon.py status
+    python .claude/hooks/hook-daemon.py stop
+    python .claude/hooks/hook-daemon.py serve    # Foreground (debugging)
+
+Each request runs in a child forked from the warm daemon, so a hook sees its
+own cwd, environment and stdio exactly as in a cold start, and nothing it
+changes leaks into later requests. Unix only (needs AF_UNIX and fork).
+
+Wire format (the client avoids importing json): a request is NUL-separated
+UTF-8 fields, `run, hook, cwd, argc, argv..., envc, KEY=VALUE..., stdin`, and
+the reply is `exit, len(stdout), stdout+stderr`. Control requests are a single
+field (`ping`, `shutdown`) answered with JSON.
+"""
+import sys
+import json
+import os
+import io
+import importlib.util
+import runpy
+import socket
+import subprocess
+import time
+import traceback
+import zlib
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Never served: files with this line at module level (the daemon, its client,
+# the standalone scanner CLI and shared modules). hook_integrity.py is both a
+# shared module and an optional PreToolUse hook, so it is served.
+NOT_A_HOOK_LINE = b"\nNOT_A_HOOK = True"
+
+# The daemon itself, not a hook
+NOT_A_HOOK = True
+
+# Modules the hooks import from this directory: a change to one reloads every hook.
+SHARED_MODULES = ("cerbero_core.py", "lorekeeper_docs.py", "hook_integrity.py")
+
+# Exit after this long without requests.
+IDLE_TIMEOUT_SECONDS = 30 * 60
+
+# Upper bound on one request (hook stdin JSON plus environment).
+MAX_REQUEST_BYTES = 64 << 20
+
+
+def socket_path(hooks_dir=HOOKS_DIR):
+    """Per-user, per-hooks-directory socket path (kept in sync with hook-client.py)."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    digest = zlib.crc32(hooks_dir.encode("utf-8", "surrogateescape"))
+    return os.path.join(base, f"ignite-hookd-{os.getuid()}", f"{digest:08x}.sock")
+
+
+def _private_dir(path):
+    """Create the socket directory 0700 and refuse one another user could write."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"insecure socket directory: {path}")
+
+
+def _request(op, timeout=2.0):
+    """Send one control request to a running daemon. Returns the reply or None."""
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(socket_path())
+        sock.sendall(op.encode("ascii"))
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        sock.close()
+        return json.loads(b"".join(chunks).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+# --- Hook modules ---
+
+
+_modules = {}
+_shared_stamp = [None]
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None  # Missing: the hooks' own fallbacks apply
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _check_shared_modules():
+    """Forget every loaded hook and shared module if a shared module changed.
+
+    The hooks import them by name, so the stale copy would stay in sys.modules
+    (and in every hook module holding a reference) until the daemon exits.
+    """
+    stamp = tuple(_file_stamp(os.path.join(HOOKS_DIR, name)) for name in SHARED_MODULES)
+    if stamp == _shared_stamp[0]:
+        return
+    if _shared_stamp[0] is not None:
+        _modules.clear()
+        for name in SHARED_MODULES:
+            sys.modules.pop(os.path.splitext(name)[0], None)
+    _shared_stamp[0] = stamp
+
+
+def _is_guarded(path):
+    """True if the script only acts under `if __name__ == "__main__"`."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return 'if __name__ == "__main__":' in f.read()
+    except OSError:
+        return False
+
+
+def _load_hook(name):
+    """Return the imported module for a hook, re-importing it if the file changed.
+
+    Scripts that do their work at import time get None and run via runpy.
+    A change to one of the SHARED_MODULES reloads every hook.
+    """
+    _check_shared_modules()
+    path = os.path.join(HOOKS_DIR, name)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _modules.get(name)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    module = None
+    if _is_guarded(path):
+        stem = os.path.splitext(name)[0].replace("-", "_")
+        spec = importlib.util.spec_from_file_location(f"ignite_hook_{stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not callable(getattr(module, "main", None)):
+            module = None
+    _modules[name] = (stamp, module)
+    return module
+
+
+_markers = {}
+
+
+def _is_hook(name):
+    """True for a .py file in HOOKS_DIR without the NOT_A_HOOK line (cached by stamp)."""
+    if not name.endswith(".py"):
+        return False
+    path = os.path.join(HOOKS_DIR, name)
+    stamp = _file_stamp(path)
+    if stamp is None:
+        return False
+    cached = _markers.get(name)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    try:
+        with open(path, "rb") as f:
+            is_hook = NOT_A_HOOK_LINE not in f.read()
+    except OSError:
+        return False
+    _markers[name] = (stamp, is_hook)
+    return is_hook
+
+
+def _hook_names():
+    return sorted(name for name in os.listdir(HOOKS_DIR) if _is_hook(name))
+
+
+def _valid_hook(name):
+    return isinstance(name, str) and name == os.path.basename(name) and _is_hook(name)
+
+
+def _run_hook(request):
+    """Child side: run one hook with the client's cwd, env and stdin."""
+    name = request["hook"]
+    path = os.path.join(HOOKS_DIR, name)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    try:
+        module = _load_hook(name)
+        os.chdir(request["cwd"] or HOOKS_DIR)
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [path] + request["argv"]
+        sys.stdin = io.StringIO(request["stdin"])
+        sys.stdout, sys.stderr = stdout, stderr
+        if module is not None:
+            module.main()
+        else:
+            runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            stderr.write(f"{e.code}\n")
+            code = 1
+    except Exception:
+        traceback.print_exc(file=stderr)
+        code = 1
+    finally:
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    out = stdout.getvalue()
+    return f"{code}\0{len(out)}\0{out}{stderr.getvalue()}"
+
+
+def _parse_request(data):
+    """Decode a request into a dict; raises ValueError if it is malformed."""
+    fields = data.decode("utf-8", "surrogateescape").split("\0")
+    if fields[0] != "run":
+        return {"op": fields[0]}
+    hook, cwd = fields[1], fields[2]
+    argc = int(fields[3])
+    argv = fields[4:4 + argc]
+    envc = int(fields[4 + argc])
+    env_items = fields[5 + argc:5 + argc + envc]
+    if len(env_items) != envc:
+        raise ValueError("truncated request")
+    env = dict(item.split("=", 1) for item in env_items)
+    stdin = "\0".join(fields[5 + argc + envc:])
+    return {"op": "run", "hook": hook, "cwd": cwd, "argv": argv, "env": env, "stdin": stdin}
+
+
+def _read_request(conn):
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_REQUEST_BYTES:
+            raise ValueError("request too large")
+        chunks.append(chunk)
+    try:
+        return _parse_request(b"".join(chunks))
+    except (IndexError, ValueError):
+        raise ValueError("malformed request")
+
+
+def _reply(conn, payload):
+    """Send a reply: JSON for control requests, the framed string for hook runs."""
+    data = payload if isinstance(payload, str) else json.dumps(payload)
+    try:
+        conn.sendall(data.encode("utf-8", "surrogateescape"))
+    except OSError:
+        pass
+
+
+def _reap():
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] > 0:
+            pass
+    except ChildProcessError:
+        pass
+
+
+# --- Server ---
+
+
+def serve():
+    path = socket_path()
+    _private_dir(os.path.dirname(path))
+    if _request("ping") is not None:
+        print(f"hook-daemon: already running on {path}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        os.unlink(path)  # Stale socket from a daemon that died
+    except FileNotFoundError:
+        pass
+
+    # Warm up: import every guarded hook once so children inherit it compiled
+    for name in _hook_names():
+        try:
+            _load_hook(name)
+        except Exception as e:
+            print(f"hook-daemon: could not preload {name}: {e}", file=sys.stderr)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    server.settimeout(60)
+    last_request = time.monotonic()
+
+    while True:
+        _reap()
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            if time.monotonic() - last_request > IDLE_TIMEOUT_SECONDS:
+                break
+            continue
+        last_request = time.monotonic()
+        conn.settimeout(10)
+        try:
+            request = _read_request(conn)
+        except (OSError, ValueError) as e:
+            _reply(conn, {"error": str(e)})
+            conn.close()
+            continue
+
+        op = request["op"]
+        if op == "ping":
+            _reply(conn, {"pid": os.getpid(), "hooks_dir": HOOKS_DIR, "hooks": _hook_names()})
+            conn.close()
+            continue
+        if op == "shutdown":
+            _reply(conn, {"stopped": os.getpid()})
+            conn.close()
+            break
+        if op != "run" or not _valid_hook(request.get("hook")):
+            _reply(conn, {"error": f"unknown hook: {request.get('hook')}"})
+            conn.close()
+            continue
+
+        try:
+            _load_hook(request["hook"])  # Re-import here if edited, so later children inherit it
+        except Exception:
+            pass  # The child hits the same error and reports it like a cold start would
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            conn.settimeout(None)
+            _reply(conn, _run_hook(request))
+            conn.close()
+            os._exit(0)
+        conn.close()
+
+    server.close()
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def start():
+    if _request("ping") is not None:
+        print(f"hook-daemon: already running on {socket_path()}")
+        return
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    for _ in range(50):
+        time.sleep(0.1)
+        if _request("ping") is not None:
+            print(f"hook-daemon: serving {HOOKS_DIR} on {socket_path()}")
+            return
+    print("hook-daemon: did not come up; hooks keep running in-process", file=sys.stderr)
+    sys.exit(1)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"):
+        print("hook-daemon: needs Unix sockets and fork; hooks run in-process on this platform")
+        sys.exit(0 if command == "status" else 1)
+
+    if command == "serve":
+        serve()
+    elif command == "start":
+        start()
+    elif command == "stop":
+        reply = _request("shutdown")
+        print("hook-daemon: stopped" if reply else "hook-daemon: not running")
+    elif command == "status":
+        reply = _request("ping")
+        if reply is None:
+            print("hook-daemon: not running (hooks run in-process)")
+            sys.exit(1)
+        print(f"hook-daemon: pid {reply['pid']} serving {reply['hooks_dir']}")
+        print("hooks: " + ", ".join(reply["hooks"]))
+    else:
+        print(__doc__.strip())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
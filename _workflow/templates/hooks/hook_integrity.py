@@ -0,0 +1,233 @@
+"""Hook integrity: PreToolUse — stat-only check of deployed hooks against the baseline.
+
+Also the shared module behind the full check (lorekeeper-session-gate at
+SessionStart) and scripts/generate-hook-baseline.py.
+
+.claude/hook-integrity.json maps each hook (path relative to .claude/) to its
+SHA-256 and stat fingerprint (size, mtime_ns, inode, ctime_ns). A file whose
+fingerprint still matches is trusted without reading it; only files whose
+fingerprint changed are re-hashed, in 1 MiB chunks on a thread pool. A
+re-hash that matches refreshes the fingerprint, so the next run is stat-only
+again. Legacy baselines (path -> hash) are always hashed and upgraded.
+ctime is in the fingerprint because os.utime() can restore mtime after an
+in-place edit but nothing can set ctime back. The SessionStart check still
+re-hashes every hook once per FULL_REHASH_SECONDS (time of the last full
+check in .claude/hook-integrity-state.json), so a fingerprint forged by other
+means (clock changes, a restored filesystem) is caught within a day.
+
+As a hook it never reads file content: a changed fingerprint is reported as
+additionalContext, and the SessionStart check settles whether the content
+changed. Cost: one stat() per hook.
+
+    python .claude/hooks/hook_integrity.py --verify [--full]   # full check from the CLI
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+
+BASELINE_PATH = os.path.join(".claude", "hook-integrity.json")
+STATE_PATH = os.path.join(".claude", "hook-integrity-state.json")
+CHUNK_BYTES = 1 << 20
+MAX_WORKERS = 8
+FULL_REHASH_SECONDS = 24 * 3600
+
+
+def fingerprint(st):
+    """Stat fingerprint of a file: [size, mtime_ns, inode, ctime_ns]."""
+    return [st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns]
+
+
+def hash_file(path):
+    """SHA-256 of a file, read in chunks (hashlib releases the GIL on large updates)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_files(paths, workers=MAX_WORKERS):
+    """{path: sha256 or None if unreadable}, hashed in parallel."""
+    def one(path):
+        try:
+            return path, hash_file(path)
+        except OSError:
+            return path, None
+
+    if len(paths) <= 1:
+        return dict(one(p) for p in paths)
+    from concurrent.futures import ThreadPoolExecutor  # Not needed on the stat-only path
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        return dict(pool.map(one, paths))
+
+
+def load_baseline(cwd):
+    """The baseline dict, or None if missing or unreadable (callers fail open)."""
+    try:
+        with open(os.path.join(cwd, BASELINE_PATH), "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return baseline if isinstance(baseline, dict) else None
+
+
+def save_baseline(cwd, baseline):
+    """Write the baseline atomically (sorted, indented: it is reviewed in diffs)."""
+    import tempfile
+
+    path = os.path.join(cwd, BASELINE_PATH)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def full_rehash_due(cwd):
+    """True if no full re-hash was recorded in the last FULL_REHASH_SECONDS.
+
+    A missing or unreadable state file, or a time in the future, counts as due.
+    """
+    try:
+        with open(os.path.join(cwd, STATE_PATH), "r", encoding="utf-8") as f:
+            full_at = json.load(f).get("full_at")
+    except (OSError, ValueError, AttributeError):
+        return True
+    if isinstance(full_at, bool) or not isinstance(full_at, (int, float)):
+        return True
+    age = time.time() - full_at
+    return age < 0 or age > FULL_REHASH_SECONDS
+
+
+def _record_full_rehash(cwd):
+    try:
+        with open(os.path.join(cwd, STATE_PATH), "w", encoding="utf-8") as f:
+            json.dump({"full_at": int(time.time())}, f)
+    except OSError:
+        pass  # Fail open: the next session re-hashes in full again
+
+
+def _entry(value):
+    """(sha256, fingerprint or None) from a baseline value, either format."""
+    if isinstance(value, dict):
+        return value.get("sha256"), value.get("stat")
+    return value, None
+
+
+def build_baseline(cwd):
+    """Hash every .py under .claude/hooks/. Returns the baseline dict."""
+    claude_dir = os.path.join(cwd, ".claude")
+    paths = []
+    for root, _dirs, files in os.walk(os.path.join(claude_dir, "hooks")):
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".py"))
+    stats = {p: os.stat(p) for p in paths}
+    hashes = hash_files(paths)
+    baseline = {}
+    for path in paths:
+        if hashes[path] is None:
+            raise OSError(f"cannot read {path}")
+        rel_path = os.path.relpath(path, claude_dir).replace("\\", "/")
+        baseline[rel_path] = {"sha256": hashes[path], "stat": fingerprint(stats[path])}
+    return baseline
+
+
+def verify(cwd, stat_only=False, rehash_all=False, refresh=True):
+    """Compare deployed hooks against the baseline. Returns list of warnings.
+
+    stat_only: never read content; report changed fingerprints as such.
+    rehash_all: ignore fingerprints and hash every file (recorded as the
+        last full re-hash, see full_rehash_due()).
+    refresh: store new fingerprints of files whose content still matches.
+    """
+    baseline = load_baseline(cwd)
+    if baseline is None:
+        return []  # No or unreadable baseline — skip (first run or pre-integrity)
+    claude_dir = os.path.join(cwd, ".claude")
+    warnings, to_hash = [], {}
+    for rel_path, value in sorted(baseline.items()):
+        expected, stored = _entry(value)
+        full_path = os.path.join(claude_dir, rel_path)
+        try:
+            st = os.stat(full_path)
+        except FileNotFoundError:
+            warnings.append(f"HOOK INTEGRITY: {rel_path} is missing (was in baseline)")
+            continue
+        except OSError:
+            warnings.append(f"HOOK INTEGRITY: {rel_path} is unreadable")
+            continue
+        current = fingerprint(st)
+        if stored == current and not rehash_all:
+            continue
+        if stat_only:
+            if stored is not None:  # Legacy entries have nothing to compare yet
+                warnings.append(
+                    f"HOOK INTEGRITY: {rel_path} changed on disk since the baseline "
+                    "(size/mtime) — content is checked at next session start."
+                )
+            continue
+        to_hash[full_path] = (rel_path, expected, current)
+
+    refreshed = False
+    for full_path, actual in hash_files(list(to_hash)).items():
+        rel_path, expected, current = to_hash[full_path]
+        if actual is None:
+            warnings.append(f"HOOK INTEGRITY: {rel_path} is unreadable")
+        elif actual != expected:
+            warnings.append(
+                f"HOOK INTEGRITY: {rel_path} has been modified since deployment. "
+                "Verify the change is intentional."
+            )
+        elif refresh:
+            baseline[rel_path] = {"sha256": expected, "stat": current}
+            refreshed = True
+    if refreshed:
+        try:
+            save_baseline(cwd, baseline)
+        except OSError:
+            pass  # Fail open: next run hashes these files again
+    if rehash_all and not stat_only:
+        _record_full_rehash(cwd)
+    warnings.sort()
+    return warnings
+
+
+def main():
+    if "--verify" in sys.argv[1:]:
+        warnings = verify(os.getcwd(), rehash_all="--full" in sys.argv[1:])
+        for warning in warnings:
+            print(warning)
+        print(f"Hook integrity: {len(warnings)} problem(s)" if warnings else "Hook integrity: OK")
+        sys.exit(1 if warnings else 0)
+
+    try:
+        data = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        sys.exit(0)
+    cwd = data.get("cwd", ".")
+    try:
+        warnings = verify(cwd, stat_only=True)
+    except Exception as e:  # Fail open, like every Ignite hook
+        print(f"Hook integrity WARNING: check failed: {e}", file=sys.stderr)
+        sys.exit(0)
+    if warnings:
+        json.dump({
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "additionalContext": "\n".join(warnings[:5]),
+            }
+        }, sys.stdout)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,18 @@ import subprocess
 import os
 from datetime import date
 
+try:
+    import lorekeeper_docs  # Shared doc-state snapshot + docs validator (deployed alongside)
+except ImportError:
+    lorekeeper_docs = None
+
 HOOK_VERSION = "3.0.0"
 
+# Soft budget for the slow checks, and the hard watchdog (Claude Code kills hooks at 60 s);
+# overridable in lorekeeper_docs.HOOK_BUDGETS_PATH
+LATENCY_BUDGET_MS = 40_000
+WATCHDOG_MS = 55_000
+
 
 def _load_config(cwd):
     """Load lorekeeper config. Returns defaults if not found/corrupt.
@@ -52,69 +62,72 @@ def _load_config(cwd):
         return DEFAULTS
 
 
-def _check_freshness(cwd, cfg):
-    """Check if SCRATCHPAD and CHANGELOG-DEV.md have today's date. Returns list of warnings."""
-    today = date.today().isoformat()
-    warnings = []
+def _validate_docs(cwd, cfg, script_path, timeout, state):
+    """Run the docs validation; returns (fail_lines, warn_lines, summary_line, returncode).
 
-    scratchpad_path = os.path.join(cwd, cfg["docs"]["scratchpad"]["path"])
-    if os.path.isfile(scratchpad_path):
-        try:
-            with open(scratchpad_path, "r", encoding="utf-8") as f:
-                if today not in f.read():
-                    warnings.append(
-                        "SCRATCHPAD.md has no entry for today — add session section"
-                    )
-        except (OSError, UnicodeDecodeError):
-            pass
-
-    changelog_path = os.path.join(cwd, cfg["docs"]["changelog"]["path"])
-    if os.path.isfile(changelog_path):
-        try:
-            with open(changelog_path, "r", encoding="utf-8") as f:
-                if today not in f.read():
-                    warnings.append(
-                        "CHANGELOG-DEV.md has no entry for today "
-                        "— add entry if significant changes were made"
-                    )
-        except (OSError, UnicodeDecodeError):
-            pass
+    The stock validate-docs.sh only wraps lorekeeper_docs.py: when the script
+    is that file, unmodified, the checks run in-process on the doc-state
+    snapshot. A custom or edited validation script is still run through bash.
+    Raises subprocess.TimeoutExpired / FileNotFoundError like subprocess.run.
 
-    return warnings
+    NOTE (M-QUAL-001): Same helper in commit-gate and session-end — keep in sync.
+    """
+    if lorekeeper_docs.is_stock_wrapper(script_path):
+        report = lorekeeper_docs.validate(cwd, cfg, state=state)
+        summary, code = lorekeeper_docs.verdict(report)
+        return (lorekeeper_docs.messages(report, lorekeeper_docs.FAIL),
+                lorekeeper_docs.messages(report, lorekeeper_docs.WARN), summary, code)
+    bash_cmd = os.environ.get("CLAUDE_CODE_GIT_BASH_PATH", "bash")
+    result = subprocess.run(
+        [bash_cmd, script_path], capture_output=True, text=True, timeout=timeout, cwd=cwd,
+    )
+    lines = result.stdout.splitlines()
+    keyword = cfg.get("validation_summary_keyword", "RESULTADO:")
+    summary = next((l.strip() for l in lines if keyword in l), "")
+    return ([l.strip() for l in lines if "[FAIL]" in l],
+            [l.strip() for l in lines if "[WARN]" in l], summary, result.returncode)
 
 
-def main():
-    try:
-        data = json.load(sys.stdin)
-    except (json.JSONDecodeError, ValueError):
-        print("Lorekeeper: could not parse hook input - failing open", file=sys.stderr)
-        sys.exit(0)
-    command = data.get("tool_input", {}).get("command", "")
-    cwd = data.get("cwd", ".")
+def _readable(doc):
+    """Facts of a doc that exists and could be read, else None.
 
-    # Only intercept git commit commands
-    if not re.search(r"\bgit\s+commit\b", command):
-        sys.exit(0)
+    NOTE (M-QUAL-001): Same helper in session-gate, commit-gate and session-end — keep in sync.
+    """
+    return doc if doc and not doc.get("error") else None
 
-    # Escape hatch: --no-verify bypasses docs check
-    if "--no-verify" in command:
-        print(
-            "Lorekeeper: --no-verify detected, skipping docs validation.",
-            file=sys.stderr,
+
+def _check_freshness(state):
+    """Check if SCRATCHPAD and CHANGELOG-DEV.md have today's date. Returns list of warnings."""
+    today = date.today().isoformat()
+    warnings = []
+
+    scratchpad = _readable(state["scratchpad"])
+    if scratchpad and today not in scratchpad["dates"]:
+        warnings.append(
+            "SCRATCHPAD.md has no entry for today — add session section"
         )
-        sys.exit(0)
 
-    cfg = _load_config(cwd)
+    changelog = _readable(state["changelog"])
+    if changelog and today not in changelog["dates"]:
+        warnings.append(
+            "CHANGELOG-DEV.md has no entry for today "
+            "— add entry if significant changes were made"
+        )
+
+    return warnings
+
 
+def _gate(cwd, cfg, deadline):
+    """Run the checks and write the verdict. Exits; the watchdog may interrupt it."""
     # --- Optional: sync-hooks.sh --check (gated by config) ---
-    if cfg.get("sync_hooks_check", False):
+    if cfg.get("sync_hooks_check", False) and lorekeeper_docs.checkpoint(deadline, "sync-hooks.sh --check"):
         sync_script = os.path.join(cwd, "scripts", "sync-hooks.sh")
         if os.path.isfile(sync_script):
             try:
                 bash_cmd = os.environ.get("CLAUDE_CODE_GIT_BASH_PATH", "bash")
                 sync_result = subprocess.run(
                     [bash_cmd, sync_script, "--check"],
-                    capture_output=True, text=True, timeout=15, cwd=cwd,
+                    capture_output=True, text=True, timeout=lorekeeper_docs.time_left(deadline, 15), cwd=cwd,
                 )
                 if sync_result.returncode != 0:
                     reason = "Lorekeeper: hook copies are out of sync. Fix before committing:\n"
@@ -122,6 +135,7 @@ def main():
                         if "[FAIL]" in line:
                             reason += f"  {line}\n"
                     reason += "Run: bash scripts/sync-hooks.sh --sync"
+                    lorekeeper_docs.disarm_watchdog(deadline)
                     json.dump(
                         {
                             "hookSpecificOutput": {
@@ -144,15 +158,19 @@ def main():
             file=sys.stderr,
         )
         sys.exit(0)
+    if not lorekeeper_docs.checkpoint(deadline, "validate-docs.sh"):
+        print(
+            f"Lorekeeper WARNING: {deadline['budget_ms']} ms latency budget spent, "
+            f"{cfg['validation_script']} not run.",
+            file=sys.stderr,
+        )
+        sys.exit(0)
 
+    # Stat-keyed snapshot: docs unchanged since the last hook run are not re-read
+    state = lorekeeper_docs.doc_state(cwd, cfg)
     try:
-        bash_cmd = os.environ.get("CLAUDE_CODE_GIT_BASH_PATH", "bash")
-        result = subprocess.run(
-            [bash_cmd, script_path],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=cwd,
+        fail_lines, warn_lines, _, _ = _validate_docs(
+            cwd, cfg, script_path, lorekeeper_docs.time_left(deadline, 30), state
         )
     except (subprocess.TimeoutExpired, FileNotFoundError) as e:
         print(
@@ -161,19 +179,14 @@ def main():
         )
         sys.exit(0)
 
-    has_fail = "[FAIL]" in result.stdout
-    has_warn = "[WARN]" in result.stdout
-
     # Hard gate: [FAIL] blocks the commit
-    if has_fail:
-        fail_lines = [
-            l.strip() for l in result.stdout.splitlines() if "[FAIL]" in l
-        ]
+    if fail_lines:
         reason = "Lorekeeper: documentation validation FAILED. Fix before committing:\n"
         for line in fail_lines[:5]:
             reason += f"  {line}\n"
         reason += f"Run: bash {cfg['validation_script']} for full report."
 
+        lorekeeper_docs.disarm_watchdog(deadline)
         json.dump(
             {
                 "hookSpecificOutput": {
@@ -189,14 +202,11 @@ def main():
     # --- Accumulate all warnings (validate-docs [WARN] + freshness) ---
     all_warnings = []
 
-    if has_warn:
-        warn_lines = [
-            l.strip() for l in result.stdout.splitlines() if "[WARN]" in l
-        ]
+    if warn_lines:
         all_warnings.extend(warn_lines[:5])
 
     # Freshness checks (only run if commit isn't blocked)
-    freshness_warnings = _check_freshness(cwd, cfg)
+    freshness_warnings = _check_freshness(state)
     all_warnings.extend(freshness_warnings)
 
     # Emit warnings as additionalContext (injected into Claude's conversation)
@@ -204,6 +214,7 @@ def main():
         msg = "Lorekeeper commit warnings — act on these after committing:\n"
         for w in all_warnings:
             msg += f"  - {w}\n"
+        lorekeeper_docs.disarm_watchdog(deadline)
         json.dump(
             {
                 "hookSpecificOutput": {
@@ -220,5 +231,46 @@ def main():
     sys.exit(0)
 
 
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        print("Lorekeeper: could not parse hook input - failing open", file=sys.stderr)
+        sys.exit(0)
+    command = data.get("tool_input", {}).get("command", "")
+    cwd = data.get("cwd", ".")
+
+    # Only intercept git commit commands
+    if not re.search(r"\bgit\s+commit\b", command):
+        sys.exit(0)
+
+    # Escape hatch: --no-verify bypasses docs check
+    if "--no-verify" in command:
+        print(
+            "Lorekeeper: --no-verify detected, skipping docs validation.",
+            file=sys.stderr,
+        )
+        sys.exit(0)
+
+    if lorekeeper_docs is None:
+        print("Lorekeeper: lorekeeper_docs.py missing next to the hooks - failing open", file=sys.stderr)
+        sys.exit(0)
+
+    cfg = _load_config(cwd)
+    deadline = lorekeeper_docs.hook_deadline("lorekeeper-commit-gate.py", cwd, LATENCY_BUDGET_MS, WATCHDOG_MS)
+    lorekeeper_docs.arm_watchdog(deadline)
+    try:
+        _gate(cwd, cfg, deadline)
+    except KeyboardInterrupt:
+        print(
+            f"Lorekeeper WARNING: commit gate stopped by its {deadline['watchdog_ms']} ms watchdog "
+            "— failing open, docs not validated.",
+            file=sys.stderr,
+        )
+    finally:
+        lorekeeper_docs.disarm_watchdog(deadline)
+    sys.exit(0)
+
+
 if __name__ == "__main__":
     main()
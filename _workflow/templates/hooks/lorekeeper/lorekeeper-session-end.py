@@ -1,14 +1,28 @@
 """Lorekeeper hook: SessionEnd — documentation checkpoint + cross-session pending + graduation automation."""
 import sys
+import base64
+import hashlib
+import heapq
 import json
 import os
 import re
+import struct
 import subprocess
-from collections import defaultdict
+import tempfile
 from datetime import date, datetime, timezone
 
+try:
+    import lorekeeper_docs  # Shared doc-state snapshot + docs validator (deployed alongside)
+except ImportError:
+    lorekeeper_docs = None
+
 HOOK_VERSION = "3.0.0"
 
+# Soft budget for the slow checks, and the hard watchdog (Claude Code kills hooks at 60 s);
+# overridable in lorekeeper_docs.HOOK_BUDGETS_PATH
+LATENCY_BUDGET_MS = 30_000
+WATCHDOG_MS = 50_000
+
 
 def _load_config(cwd):
     """Load lorekeeper config. Returns defaults if not found/corrupt.
@@ -46,169 +60,416 @@ def _load_config(cwd):
         return DEFAULTS
 
 
-def analyze_graduation_candidates(scratchpad_path):
-    """Analyze SCRATCHPAD.md for patterns appearing in 3+ different sessions.
+def _validate_docs(cwd, cfg, script_path, timeout, state):
+    """Run the docs validation; returns (fail_lines, warn_lines, summary_line, returncode).
 
-    Returns list of graduation candidate strings, or empty list.
-    Fails silently (returns []) on any error.
+    The stock validate-docs.sh only wraps lorekeeper_docs.py: when the script
+    is that file, unmodified, the checks run in-process on the doc-state
+    snapshot. A custom or edited validation script is still run through bash.
+    Raises subprocess.TimeoutExpired / FileNotFoundError like subprocess.run.
+
+    NOTE (M-QUAL-001): Same helper in commit-gate and session-end — keep in sync.
     """
-    try:
-        with open(scratchpad_path, "r", encoding="utf-8") as f:
-            content = f.read()
-    except (OSError, UnicodeDecodeError):
-        return []
+    if lorekeeper_docs.is_stock_wrapper(script_path):
+        report = lorekeeper_docs.validate(cwd, cfg, state=state)
+        summary, code = lorekeeper_docs.verdict(report)
+        return (lorekeeper_docs.messages(report, lorekeeper_docs.FAIL),
+                lorekeeper_docs.messages(report, lorekeeper_docs.WARN), summary, code)
+    bash_cmd = os.environ.get("CLAUDE_CODE_GIT_BASH_PATH", "bash")
+    result = subprocess.run(
+        [bash_cmd, script_path], capture_output=True, text=True, timeout=timeout, cwd=cwd,
+    )
+    lines = result.stdout.splitlines()
+    keyword = cfg.get("validation_summary_keyword", "RESULTADO:")
+    summary = next((l.strip() for l in lines if keyword in l), "")
+    return ([l.strip() for l in lines if "[FAIL]" in l],
+            [l.strip() for l in lines if "[WARN]" in l], summary, result.returncode)
 
-    lines = content.splitlines()
 
-    # Parse entries by session date (sessions start with "## YYYY-MM-DD")
-    session_entries = {}  # date -> [lines]
-    current_date = None
+def _readable(doc):
+    """Facts of a doc that exists and could be read, else None.
 
-    for line in lines:
-        date_match = re.match(r"^## (\d{4}-\d{2}-\d{2})", line)
-        if date_match:
-            current_date = date_match.group(1)
-            session_entries.setdefault(current_date, [])
-            continue
-        if current_date and line.strip().startswith("- "):
-            # Strip agent tags like [claude], [lorekeeper], etc.
-            clean = re.sub(r"\[[\w-]+\]\s*", "", line.strip()[2:]).strip().lower()
-            if len(clean) > 10:  # Skip very short entries
-                session_entries[current_date].append(clean)
+    NOTE (M-QUAL-001): Same helper in session-gate, commit-gate and session-end — keep in sync.
+    """
+    return doc if doc and not doc.get("error") else None
+
+
+# --- Graduation analysis ---
+# Per-section index: only "## YYYY-MM-DD" sections whose text changed since
+# the last run are processed again; everything else comes from the index.
+# Two engines: "ngram" counts exact phrases across sessions; "minhash" groups
+# entries that say the same thing in different words.
+
+GRADUATION_INDEX_PATH = os.path.join(".claude", "lorekeeper-graduation.json")
+GRADUATION_INDEX_VERSION = 2
+GRADUATION_MIN_SESSIONS = 3
+GRADUATION_TOP_K = 5
+SESSION_HEADING = re.compile(r"^## (\d{4}-\d{2}-\d{2})")
+AGENT_TAG = re.compile(r"\[[\w-]+\]\s*")
+WORD = re.compile(r"\b[a-z]{3,}\b")
+
+# MinHash/LSH: 48-row signatures in 16 bands of 3 rows. Entries sharing a
+# band are candidates (probability ~0.88 at Jaccard 0.5, ~0.35 at 0.3); a
+# candidate is merged only if the signatures estimate Jaccard >= 0.45.
+MINHASH_BANDS = 16
+MINHASH_ROWS = 3
+MINHASH_THRESHOLD = 0.45
+STOPWORDS = frozenset(
+    "the and for with from that this was were are not but into when then than "
+    "has have had use used using only also all any its our out via".split()
+)
+REPRESENTATIVE_CHARS = 80
+
+
+def _graduation_params(scratchpad_cfg):
+    """Engine and its parameters, from "graduation_engine" / "graduation_ngrams".
+
+    Stored in the index: a config change rebuilds it.
+    """
+    if scratchpad_cfg.get("graduation_engine") == "minhash":
+        return {"engine": "minhash", "bands": MINHASH_BANDS, "rows": MINHASH_ROWS}
+    sizes = scratchpad_cfg.get("graduation_ngrams", [2])
+    if not isinstance(sizes, list):
+        sizes = [sizes]
+    try:
+        sizes = sorted({int(n) for n in sizes if int(n) >= 2})
+    except (TypeError, ValueError):
+        sizes = []
+    return {"engine": "ngram", "ngrams": sizes or [2]}
 
-    if len(session_entries) < 3:
-        return []  # Not enough sessions to detect patterns
 
-    # Find phrases (bigrams) that appear across 3+ different sessions
-    phrase_sessions = defaultdict(set)  # phrase -> set of dates
+def _scratchpad_sections(content):
+    """{sha1 of section text: (date, text)} for each "## YYYY-MM-DD" section."""
+    sections, current_date, current = {}, None, []
 
-    for session_date, entries in session_entries.items():
-        for entry in entries:
-            words = re.findall(r"\b[a-z]{3,}\b", entry)
-            for i in range(len(words) - 1):
-                bigram = f"{words[i]} {words[i + 1]}"
-                phrase_sessions[bigram].add(session_date)
+    def close():
+        if current_date:
+            text = "\n".join(current)
+            sections[hashlib.sha1(text.encode("utf-8")).hexdigest()] = (current_date, text)
 
-    # Filter: 3+ different session dates, cap at 5 suggestions
-    candidates = []
-    for phrase, dates in sorted(phrase_sessions.items(), key=lambda x: -len(x[1])):
-        if len(dates) >= 3:
-            candidates.append(f'"{phrase}" (in {len(dates)} sessions)')
-        if len(candidates) >= 5:
-            break
+    for line in content.splitlines():
+        date_match = SESSION_HEADING.match(line)
+        if date_match:
+            close()
+            current_date, current = date_match.group(1), [line]
+        elif current_date:
+            current.append(line)
+    close()
+    return sections
+
+
+def _section_entries(text):
+    """The "- " entries of one section, agent tags stripped, short ones skipped."""
+    entries = []
+    for line in text.splitlines()[1:]:
+        if not line.strip().startswith("- "):
+            continue
+        # Strip agent tags like [claude], [lorekeeper], etc.
+        clean = AGENT_TAG.sub("", line.strip()[2:]).strip()
+        if len(clean) > 10:  # Skip very short entries
+            entries.append(clean)
+    return entries
+
+
+def _section_ngrams(text, sizes):
+    """Sorted distinct n-grams of the entries of one section."""
+    grams = set()
+    for entry in _section_entries(text):
+        words = WORD.findall(entry.lower())
+        for n in sizes:
+            for i in range(len(words) - n + 1):
+                grams.add(" ".join(words[i:i + n]))
+    return sorted(grams)
+
+
+def _entry_signature(entry, width):
+    """MinHash signature of one entry (base64 of width 32-bit rows), or None if it has no words.
+
+    Shingles are the entry's distinct words minus stopwords: a reworded lesson
+    keeps most of them. SHAKE-128 gives each shingle width independent 32-bit
+    hashes; the signature is their column-wise minimum.
+    """
+    shingles = {w for w in WORD.findall(entry.lower()) if w not in STOPWORDS}
+    if not shingles:
+        return None
+    row_format = f"<{width}I"
+    signature = [
+        min(column)
+        for column in zip(*(
+            struct.unpack(row_format, hashlib.shake_128(shingle.encode("utf-8")).digest(4 * width))
+            for shingle in shingles
+        ))
+    ]
+    return base64.b64encode(struct.pack(row_format, *signature)).decode("ascii")
+
+
+def _section_signatures(text, width):
+    """[[entry, signature]] for the entries of one section."""
+    signatures = []
+    for entry in _section_entries(text):
+        signature = _entry_signature(entry, width)
+        if signature is not None:
+            signatures.append([entry, signature])
+    return signatures
+
+
+def _index_section(text, params):
+    if params["engine"] == "minhash":
+        return {"entries": _section_signatures(text, params["bands"] * params["rows"])}
+    return {"grams": _section_ngrams(text, params["ngrams"])}
+
+
+def _empty_index(params):
+    return {"version": GRADUATION_INDEX_VERSION, "params": params, "sections": {}, "postings": {}}
+
+
+def _load_graduation_index(index_path, params):
+    """The persisted index, or an empty one if missing, stale or corrupt."""
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return _empty_index(params)
+    if (
+        not isinstance(index, dict)
+        or index.get("version") != GRADUATION_INDEX_VERSION
+        or index.get("params") != params
+        or not isinstance(index.get("sections"), dict)
+        or not isinstance(index.get("postings"), dict)
+    ):
+        return _empty_index(params)
+    return index
+
+
+def _update_graduation_index(index, sections, params):
+    """Drop removed sections from the index and add new ones. Returns True if changed.
+
+    postings (ngram engine) maps each phrase to {date: number of sections of
+    that date containing it}, so a removed section only decrements its own
+    phrases.
+    """
+    indexed, postings = index["sections"], index["postings"]
+    changed = False
+    for key in [k for k in indexed if k not in sections]:
+        entry = indexed.pop(key)
+        session_date = entry["date"]
+        for gram in entry.get("grams", ()):
+            dates = postings.get(gram)
+            if dates is None:
+                continue
+            if dates.get(session_date, 0) > 1:
+                dates[session_date] -= 1
+            else:
+                dates.pop(session_date, None)
+                if not dates:
+                    del postings[gram]
+        changed = True
+    for key, (session_date, text) in sections.items():
+        if key in indexed:
+            continue
+        entry = dict(_index_section(text, params), date=session_date)
+        indexed[key] = entry
+        for gram in entry.get("grams", ()):
+            dates = postings.setdefault(gram, {})
+            dates[session_date] = dates.get(session_date, 0) + 1
+        changed = True
+    return changed
+
+
+def _save_graduation_index(index_path, index):
+    if not os.path.isdir(os.path.dirname(index_path)):
+        return
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(index, separators=(",", ":")))
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass  # Fail open: the next run re-processes the new sections
+
+
+def _ngram_candidates(postings):
+    """Phrases in 3+ sessions: by session count, then longer phrases, then alphabetically."""
+    # Bounded heap instead of sorting every phrase: O(P log k)
+    top = heapq.nsmallest(
+        GRADUATION_TOP_K,
+        (
+            (-len(dates), -phrase.count(" "), phrase)
+            for phrase, dates in postings.items()
+            if len(dates) >= GRADUATION_MIN_SESSIONS
+        ),
+    )
+    return [f'"{phrase}" (in {-count} sessions)' for count, _, phrase in top]
+
+
+def _minhash_candidates(indexed, bands, rows):
+    """Clusters of near-duplicate entries spanning 3+ sessions, one sentence each.
+
+    Each entry is checked only against the first entry of each LSH bucket it
+    falls in and merged with union-find, so the cost is one pass over
+    entries x bands, never a comparison of every pair. The representative is
+    the member sharing the most buckets with the others.
+    """
+    width = bands * rows
+    row_format = f"<{width}I"
+    entries = [
+        (section["date"], text, struct.unpack(row_format, base64.b64decode(signature)))
+        for section in indexed.values()
+        for text, signature in section["entries"]
+    ]
+    parent = list(range(len(entries)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets, bucket_sizes, entry_buckets = {}, {}, []
+    for i, (_, _, signature) in enumerate(entries):
+        keys = [(band, signature[band * rows:(band + 1) * rows]) for band in range(bands)]
+        entry_buckets.append(keys)
+        for key in keys:
+            first = buckets.setdefault(key, i)
+            bucket_sizes[key] = bucket_sizes.get(key, 0) + 1
+            if first == i or find(i) == find(first):
+                continue
+            agree = sum(1 for mine, theirs in zip(signature, entries[first][2]) if mine == theirs)
+            if agree >= MINHASH_THRESHOLD * width:
+                parent[find(i)] = find(first)
+
+    clusters = {}
+    for i in range(len(entries)):
+        clusters.setdefault(find(i), []).append(i)
+    ranked = []
+    for members in clusters.values():
+        dates = {entries[i][0] for i in members}
+        if len(dates) < GRADUATION_MIN_SESSIONS:
+            continue
+        best = max(
+            members,
+            key=lambda i: (sum(bucket_sizes[key] for key in entry_buckets[i]), -len(entries[i][1])),
+        )
+        ranked.append((-len(dates), -len(members), entries[best][1]))
+    top = heapq.nsmallest(GRADUATION_TOP_K, ranked)
 
+    candidates = []
+    for sessions, size, text in top:
+        if len(text) > REPRESENTATIVE_CHARS:
+            text = text[:REPRESENTATIVE_CHARS - 3].rstrip() + "..."
+        candidates.append(f'"{text}" ({-size} similar entries in {-sessions} sessions)')
     return candidates
 
 
-def main():
+def analyze_graduation_candidates(scratchpad_path, index_path=None, params=None):
+    """Analyze SCRATCHPAD.md for patterns appearing in 3+ different sessions.
+
+    params comes from _graduation_params() (default: bigram phrases). With
+    index_path, sections unchanged since the last run are not processed
+    again. Only the top 5 candidates are kept.
+
+    Returns list of graduation candidate strings, or empty list.
+    Fails silently (returns []) on any error.
+    """
     try:
-        data = json.load(sys.stdin)
-    except (json.JSONDecodeError, ValueError):
-        print("Lorekeeper: could not parse hook input - failing open", file=sys.stderr)
-        sys.exit(0)
-    cwd = data.get("cwd", ".")
+        with open(scratchpad_path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError):
+        return []
 
-    # Cleanup session marker (used by session-gate to detect post-compression)
-    marker_path = os.path.join(cwd, ".claude", "lorekeeper-session-active.marker")
-    if os.path.exists(marker_path):
+    params = params or {"engine": "ngram", "ngrams": [2]}
+    sections = _scratchpad_sections(content)
+    index = _load_graduation_index(index_path, params) if index_path else _empty_index(params)
+    try:
+        changed = _update_graduation_index(index, sections, params)
+    except (KeyError, TypeError, AttributeError):
+        index = _empty_index(params)  # Malformed entries: rebuild from scratch
+        changed = _update_graduation_index(index, sections, params)
+    if changed and index_path:
+        _save_graduation_index(index_path, index)
+
+    if len({session_date for session_date, _ in sections.values()}) < GRADUATION_MIN_SESSIONS:
+        return []  # Not enough sessions to detect patterns
+    if params["engine"] == "minhash":
         try:
-            os.remove(marker_path)
-        except OSError:
-            pass
+            return _minhash_candidates(index["sections"], params["bands"], params["rows"])
+        except (KeyError, TypeError, ValueError, struct.error):
+            return []
+    return _ngram_candidates(index["postings"])
 
-    # --- Load config (paths + thresholds) ---
-    cfg = _load_config(cwd)
 
+def _checkpoint_session(cwd, cfg, deadline):
+    """Collect pending items and the handoff, persist them and print the summary."""
     pending_items = []
     today = date.today().isoformat()
 
+    # Stat-keyed snapshot: docs unchanged since the last hook run are not re-read
+    state = lorekeeper_docs.doc_state(cwd, cfg)
+
     # 1. Check if SCRATCHPAD was updated today
     scratchpad_cfg = cfg["docs"]["scratchpad"]
     scratchpad_path = os.path.join(cwd, scratchpad_cfg["path"])
     grad_threshold = scratchpad_cfg.get("graduation_threshold", 100)
     max_lines = scratchpad_cfg.get("max_lines", 150)
-    if os.path.isfile(scratchpad_path):
-        try:
-            with open(scratchpad_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        except (OSError, UnicodeDecodeError) as e:
-            pending_items.append(f"SCRATCHPAD.md unreadable ({e})")
-            content = None
-
-        if content is not None:
-            if today not in content:
-                pending_items.append("SCRATCHPAD.md not updated today — add session entry")
-
-            line_count = len(content.splitlines())
-            if line_count > grad_threshold:
-                pending_items.append(
-                    f"SCRATCHPAD.md at {line_count}/{max_lines} lines — review for graduation candidates"
-                )
-            # 1b. Check for graduation candidates (patterns across 3+ sessions)
-            candidates = analyze_graduation_candidates(scratchpad_path)
-            if candidates:
-                pending_items.append(
-                    f"SCRATCHPAD graduation candidates ({len(candidates)}): "
-                    + "; ".join(candidates[:3])
-                    + " — review and graduate to CLAUDE.md Learned Patterns"
-                )
-    else:
+    scratchpad = state["scratchpad"]
+    if scratchpad is None:
         pending_items.append("SCRATCHPAD.md missing")
+    elif scratchpad.get("error"):
+        pending_items.append(f"SCRATCHPAD.md unreadable ({scratchpad['error']})")
+    else:
+        if today not in scratchpad["dates"]:
+            pending_items.append("SCRATCHPAD.md not updated today — add session entry")
+
+        line_count = scratchpad["lines"]
+        if line_count > grad_threshold:
+            pending_items.append(
+                f"SCRATCHPAD.md at {line_count}/{max_lines} lines — review for graduation candidates"
+            )
+        # 1b. Check for graduation candidates (patterns across 3+ sessions)
+        candidates = []
+        if lorekeeper_docs.checkpoint(deadline, "graduation analysis"):
+            candidates = analyze_graduation_candidates(
+                scratchpad_path,
+                os.path.join(cwd, GRADUATION_INDEX_PATH),
+                _graduation_params(scratchpad_cfg),
+            )
+        if candidates:
+            pending_items.append(
+                f"SCRATCHPAD graduation candidates ({len(candidates)}): "
+                + "; ".join(candidates[:3])
+                + " — review and graduate to CLAUDE.md Learned Patterns"
+            )
 
     # 1c. Check if CHANGELOG-DEV.md was updated today
-    changelog_path = os.path.join(cwd, cfg["docs"]["changelog"]["path"])
-    if os.path.isfile(changelog_path):
-        try:
-            with open(changelog_path, "r", encoding="utf-8") as f:
-                changelog_content = f.read()
-            if today not in changelog_content:
-                pending_items.append(
-                    "CHANGELOG-DEV.md not updated today "
-                    "— add entry if significant changes were made"
-                )
-        except (OSError, UnicodeDecodeError):
-            pass
-    else:
+    changelog = state["changelog"]
+    if changelog is None:
         pending_items.append("CHANGELOG-DEV.md missing — create initial entry")
+    elif _readable(changelog) and today not in changelog["dates"]:
+        pending_items.append(
+            "CHANGELOG-DEV.md not updated today "
+            "— add entry if significant changes were made"
+        )
 
     # 2. Check CLAUDE.md line count
     claude_md_cfg = cfg["claude_md"]
-    claude_md_path = os.path.join(cwd, claude_md_cfg["path"])
     warn_threshold = claude_md_cfg.get("warn_threshold", 180)
     claude_max = claude_md_cfg.get("max_lines", 200)
-    if os.path.isfile(claude_md_path):
-        try:
-            with open(claude_md_path, "r", encoding="utf-8") as f:
-                claude_lines = len(f.readlines())
-            if claude_lines > warn_threshold:
-                pending_items.append(
-                    f"CLAUDE.md at {claude_lines}/{claude_max} lines — prune with relevance test"
-                )
-        except (OSError, UnicodeDecodeError):
-            pass  # Fail open — CLAUDE.md line count is advisory
+    claude_md = _readable(state["claude_md"])
+    if claude_md and claude_md["lines"] > warn_threshold:  # Advisory — skipped if unreadable
+        pending_items.append(
+            f"CLAUDE.md at {claude_md['lines']}/{claude_max} lines — prune with relevance test"
+        )
 
     # 3. Run validate-docs.sh (safe: SessionEnd fires once per session)
     bash_cmd = os.environ.get("CLAUDE_CODE_GIT_BASH_PATH", "bash")
     script_path = os.path.join(cwd, cfg["validation_script"])
     validation_summary = ""
-    if os.path.isfile(script_path):
+    if os.path.isfile(script_path) and lorekeeper_docs.checkpoint(deadline, "validate-docs.sh"):
         try:
-            result = subprocess.run(
-                [bash_cmd, script_path],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                cwd=cwd,
+            fail_lines, _, validation_summary, returncode = _validate_docs(
+                cwd, cfg, script_path, lorekeeper_docs.time_left(deadline, 30), state
             )
-            keyword = cfg.get("validation_summary_keyword", "RESULTADO:")
-            for line in result.stdout.splitlines():
-                if keyword in line:
-                    validation_summary = line.strip()
-                    break
-            if result.returncode != 0:
-                fail_lines = [
-                    l.strip() for l in result.stdout.splitlines() if "[FAIL]" in l
-                ]
+            if returncode != 0:
                 for line in fail_lines[:3]:
                     pending_items.append(f"Validation: {line}")
         except (subprocess.TimeoutExpired, FileNotFoundError):
@@ -217,42 +478,28 @@ def main():
     # 4. Generate session handoff summary for next session
     handoff_parts = []
 
-    # Current phase (extract from STATUS.md)
-    status_path = os.path.join(cwd, cfg["docs"]["status"]["path"])
-    if os.path.isfile(status_path):
-        try:
-            with open(status_path, "r", encoding="utf-8") as f:
-                status_lines = f.read().splitlines()
-            in_phase = False
-            for line in status_lines:
-                if re.match(r"^##\s+(Fase actual|Current phase)", line, re.IGNORECASE):
-                    in_phase = True
-                    continue
-                if in_phase:
-                    stripped = line.strip()
-                    if stripped and not stripped.startswith("#"):
-                        handoff_parts.append(f"Phase: {stripped}")
-                        break
-                    if stripped.startswith("#"):
-                        break
-        except (OSError, UnicodeDecodeError):
-            pass
+    # Current phase (from STATUS.md)
+    status = _readable(state["status"])
+    if status and status["phase"]:
+        handoff_parts.append(f"Phase: {status['phase']}")
 
     # Recently changed files (from last commit)
-    try:
-        result = subprocess.run(
-            [bash_cmd, "-c", "git diff --name-only HEAD~1 HEAD 2>/dev/null | head -10"],
-            capture_output=True, text=True, timeout=10, cwd=cwd,
-        )
-        changed = [f.strip() for f in result.stdout.splitlines() if f.strip()]
-        if changed:
-            handoff_parts.append(f"Last commit touched: {', '.join(changed[:5])}")
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
+    if lorekeeper_docs.checkpoint(deadline, "last-commit diff"):
+        try:
+            result = subprocess.run(
+                [bash_cmd, "-c", "git diff --name-only HEAD~1 HEAD 2>/dev/null | head -10"],
+                capture_output=True, text=True, timeout=lorekeeper_docs.time_left(deadline, 10), cwd=cwd,
+            )
+            changed = [f.strip() for f in result.stdout.splitlines() if f.strip()]
+            if changed:
+                handoff_parts.append(f"Last commit touched: {', '.join(changed[:5])}")
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            pass
 
     handoff_summary = " | ".join(handoff_parts) if handoff_parts else ""
 
     # 5. Write pending items + handoff for next session (or cleanup stale)
+    lorekeeper_docs.disarm_watchdog(deadline)  # Done: the watchdog must not cut the write
     pending_path = os.path.join(cwd, ".claude", "lorekeeper-pending.json")
     if pending_items or handoff_summary:
         os.makedirs(os.path.dirname(pending_path), exist_ok=True)
@@ -279,10 +526,52 @@ def main():
             msg += f"    ... and {len(pending_items) - 5} more (not persisted)\n"
     else:
         msg += "  All documentation up to date.\n"
+    if deadline["skipped"]:
+        msg += (
+            f"  {deadline['budget_ms']} ms latency budget reached; skipped: "
+            f"{', '.join(deadline['skipped'])}\n"
+        )
 
     print(msg, file=sys.stderr)
     sys.exit(0)
 
 
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        print("Lorekeeper: could not parse hook input - failing open", file=sys.stderr)
+        sys.exit(0)
+    cwd = data.get("cwd", ".")
+
+    # Cleanup session marker (used by session-gate to detect post-compression)
+    marker_path = os.path.join(cwd, ".claude", "lorekeeper-session-active.marker")
+    if os.path.exists(marker_path):
+        try:
+            os.remove(marker_path)
+        except OSError:
+            pass
+
+    if lorekeeper_docs is None:
+        print("Lorekeeper: lorekeeper_docs.py missing next to the hooks - failing open", file=sys.stderr)
+        sys.exit(0)
+
+    # --- Load config (paths + thresholds) ---
+    cfg = _load_config(cwd)
+    deadline = lorekeeper_docs.hook_deadline("lorekeeper-session-end.py", cwd, LATENCY_BUDGET_MS, WATCHDOG_MS)
+    lorekeeper_docs.arm_watchdog(deadline)
+    try:
+        _checkpoint_session(cwd, cfg, deadline)
+    except KeyboardInterrupt:
+        print(
+            f"Lorekeeper: session end checkpoint stopped by its {deadline['watchdog_ms']} ms watchdog "
+            "— pending items not saved.",
+            file=sys.stderr,
+        )
+    finally:
+        lorekeeper_docs.disarm_watchdog(deadline)
+    sys.exit(0)
+
+
 if __name__ == "__main__":
     main()
@@ -8,12 +8,24 @@ re-injection after context compression in long sessions.
 import sys
 import json
 import os
-import re
-import hashlib
 from datetime import date, datetime, timezone
 
+try:
+    import lorekeeper_docs  # Shared doc-state snapshot + docs validator (deployed alongside)
+except ImportError:
+    lorekeeper_docs = None
+try:
+    import hook_integrity  # Incremental hook-integrity check (deployed alongside)
+except ImportError:
+    hook_integrity = None
+
 HOOK_VERSION = "3.0.0"
 
+# Soft budget for the slow checks, and the hard watchdog (Claude Code kills hooks at 60 s);
+# overridable in lorekeeper_docs.HOOK_BUDGETS_PATH
+LATENCY_BUDGET_MS = 2_000
+WATCHDOG_MS = 10_000
+
 
 def _load_config(cwd):
     """Load lorekeeper config. Returns defaults if not found/corrupt.
@@ -66,68 +78,47 @@ def _version_tuple(v):
         return (0, 0, 0)
 
 
-def _read_file_safe(path):
-    """Read file content. Returns (content, error_msg). Fail-open."""
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read(), None
-    except OSError as e:
-        return None, str(e)
-    except UnicodeDecodeError:
-        return None, "encoding error (not UTF-8)"
+def _verify_hook_integrity(cwd):
+    """Compare deployed hooks against the SHA-256 baseline. Returns list of warnings.
 
+    Only hooks whose size/mtime/inode/ctime changed since the baseline are
+    re-hashed (hook_integrity.py, also registered as the stat-only PreToolUse
+    check), except once a day, when every hook is.
+    """
+    if hook_integrity is not None:
+        return hook_integrity.verify(cwd, rehash_all=hook_integrity.full_rehash_due(cwd))
+    if os.path.exists(os.path.join(cwd, ".claude", "hook-integrity.json")):
+        return ["HOOK INTEGRITY: hook_integrity.py is missing — deployed hooks not verified"]
+    return []  # No baseline — skip (first run or pre-integrity)
 
-def _verify_hook_integrity(cwd):
-    """Compare deployed hooks against SHA-256 baseline. Returns list of warnings."""
-    baseline_path = os.path.join(cwd, ".claude", "hook-integrity.json")
-    if not os.path.exists(baseline_path):
-        return []  # No baseline — skip (first run or pre-integrity)
-    try:
-        with open(baseline_path, "r", encoding="utf-8") as f:
-            baseline = json.load(f)
-    except (OSError, json.JSONDecodeError):
-        return []  # Unreadable baseline — fail open
-    warnings = []
-    claude_dir = os.path.join(cwd, ".claude")
-    for rel_path, expected_hash in baseline.items():
-        full_path = os.path.join(claude_dir, rel_path)
-        if not os.path.exists(full_path):
-            warnings.append(f"HOOK INTEGRITY: {rel_path} is missing (was in baseline)")
-            continue
-        try:
-            with open(full_path, "rb") as f:
-                actual_hash = hashlib.sha256(f.read()).hexdigest()
-            if actual_hash != expected_hash:
-                warnings.append(
-                    f"HOOK INTEGRITY: {rel_path} has been modified since deployment. "
-                    "Verify the change is intentional."
-                )
-        except OSError:
-            warnings.append(f"HOOK INTEGRITY: {rel_path} is unreadable")
-    return warnings
 
+def _readable(doc):
+    """Facts of a doc that exists and could be read, else None.
+
+    NOTE (M-QUAL-001): Same helper in session-gate, commit-gate and session-end — keep in sync.
+    """
+    return doc if doc and not doc.get("error") else None
 
-def _evaluate_scratchpad(cwd, today, scratchpad_cfg):
-    """Evaluate SCRATCHPAD.md status. Returns dict with findings."""
-    path = os.path.join(cwd, scratchpad_cfg["path"])
+
+def _evaluate_scratchpad(doc, today, scratchpad_cfg):
+    """Evaluate SCRATCHPAD.md status from its doc-state facts. Returns dict with findings."""
     max_lines = scratchpad_cfg.get("max_lines", 150)
     grad_threshold = scratchpad_cfg.get("graduation_threshold", 100)
     result = {"exists": False, "line_count": 0, "has_today": False, "actions": [], "max_lines": max_lines}
 
-    if not os.path.exists(path):
+    if doc is None:
         result["actions"].append(
             "SCRATCHPAD.md missing — create with session template"
         )
         return result
 
-    content, err = _read_file_safe(path)
-    if content is None:
-        result["actions"].append(f"SCRATCHPAD.md unreadable ({err})")
+    if doc.get("error"):
+        result["actions"].append(f"SCRATCHPAD.md unreadable ({doc['error']})")
         return result
 
     result["exists"] = True
-    result["line_count"] = len(content.splitlines())
-    result["has_today"] = today in content
+    result["line_count"] = doc["lines"]
+    result["has_today"] = today in doc["dates"]
 
     if result["line_count"] > grad_threshold:
         result["actions"].append(
@@ -142,67 +133,26 @@ def _evaluate_scratchpad(cwd, today, scratchpad_cfg):
     return result
 
 
-def _evaluate_changelog(cwd, today, changelog_cfg):
-    """Evaluate CHANGELOG-DEV.md status. Returns dict with findings."""
-    path = os.path.join(cwd, changelog_cfg["path"])
+def _evaluate_changelog(doc, today):
+    """Evaluate CHANGELOG-DEV.md status from its doc-state facts. Returns dict with findings."""
     result = {"exists": False, "has_today": False, "actions": []}
 
-    if not os.path.exists(path):
+    if doc is None:
         result["actions"].append(
             "CHANGELOG-DEV.md missing — create initial entry"
         )
         return result
 
-    content, err = _read_file_safe(path)
-    if content is None:
-        result["actions"].append(f"CHANGELOG-DEV.md unreadable ({err})")
+    if doc.get("error"):
+        result["actions"].append(f"CHANGELOG-DEV.md unreadable ({doc['error']})")
         return result
 
     result["exists"] = True
-    result["has_today"] = today in content
+    result["has_today"] = today in doc["dates"]
     # No action at session start for changelog — checked at commit-gate and session-end
     return result
 
 
-def _extract_current_phase(cwd, status_cfg):
-    """Extract current phase description from STATUS.md. Returns string or None."""
-    path = os.path.join(cwd, status_cfg["path"])
-    content, _ = _read_file_safe(path)
-    if not content:
-        return None
-
-    lines = content.splitlines()
-    in_phase_section = False
-    for line in lines:
-        if re.match(r"^##\s+(Fase actual|Current phase)", line, re.IGNORECASE):
-            in_phase_section = True
-            continue
-        if in_phase_section:
-            stripped = line.strip()
-            if stripped and not stripped.startswith("#"):
-                return stripped
-            if stripped.startswith("#"):
-                break  # Next section reached
-    return None
-
-
-def _extract_pending_tasks(cwd, status_cfg, max_items=5):
-    """Extract unchecked tasks from STATUS.md. Returns list of strings."""
-    path = os.path.join(cwd, status_cfg["path"])
-    content, _ = _read_file_safe(path)
-    if not content:
-        return []
-
-    tasks = []
-    for line in content.splitlines():
-        match = re.match(r"^\s*-\s*\[\s*\]\s+(.+)", line)
-        if match:
-            tasks.append(match.group(1).strip())
-            if len(tasks) >= max_items:
-                break
-    return tasks
-
-
 _PHASE_ACTIONS = {
     "phase 0": ["Run /ignite", "Complete Discovery + FOUNDATION.md", "Verify generated files"],
     "phase 1": ["Stack decisions in DECISIONS.md", "Ecosystem scan for tools"],
@@ -232,14 +182,8 @@ def _get_phase_actions(phase_str, status_path="docs/STATUS.md", cfg_override=Non
     return []
 
 
-def main():
-    try:
-        data = json.load(sys.stdin)
-    except (json.JSONDecodeError, ValueError):
-        print("Lorekeeper: could not parse hook input - failing open", file=sys.stderr)
-        sys.exit(0)
-    cwd = data.get("cwd", ".")
-
+def _session_protocol(cwd, deadline):
+    """Evaluate the docs and write the session protocol message."""
     # Detect if this is a post-compression re-injection
     # Marker stored in .claude/ (project-scoped) to avoid cross-project false positives
     marker_path = os.path.join(cwd, ".claude", "lorekeeper-session-active.marker")
@@ -322,16 +266,18 @@ def main():
     # --- Load config (paths + thresholds) ---
     cfg = _load_config(cwd)
 
-    # --- Real-time file evaluation ---
+    # --- Real-time file evaluation (stat-keyed snapshot: unchanged docs are not re-read) ---
     today = date.today().isoformat()
-    scratchpad_eval = _evaluate_scratchpad(cwd, today, cfg["docs"]["scratchpad"])
-    changelog_eval = _evaluate_changelog(cwd, today, cfg["docs"]["changelog"])
-    current_phase = _extract_current_phase(cwd, cfg["docs"]["status"])
-    pending_tasks = _extract_pending_tasks(cwd, cfg["docs"]["status"])
+    state = lorekeeper_docs.doc_state(cwd, cfg)
+    status_doc = _readable(state["status"])
+    scratchpad_eval = _evaluate_scratchpad(state["scratchpad"], today, cfg["docs"]["scratchpad"])
+    changelog_eval = _evaluate_changelog(state["changelog"], today)
+    current_phase = status_doc["phase"] if status_doc else None
+    pending_tasks = status_doc["tasks"] if status_doc else []
 
     # --- Hook integrity verification (H-SEC-005, gated by config) ---
     integrity_warnings = []
-    if cfg.get("hook_integrity_check", True):
+    if cfg.get("hook_integrity_check", True) and lorekeeper_docs.checkpoint(deadline, "hook integrity"):
         integrity_warnings = _verify_hook_integrity(cwd)
 
     # Build REQUIRED ACTIONS (prioritized)
@@ -339,6 +285,11 @@ def main():
     # Priority 0: Hook integrity (most critical — possible compromise)
     for warning in integrity_warnings:
         required_actions.append(warning)
+    if deadline["skipped"]:
+        required_actions.append(
+            f"Lorekeeper hit its {deadline['budget_ms']} ms latency budget; skipped: "
+            f"{', '.join(deadline['skipped'])} — run it manually if needed"
+        )
     # Priority 1: Pending items from previous session
     for item in pending_items[:5]:
         required_actions.append(item)
@@ -394,24 +345,12 @@ def main():
         msg += f"    {handoff}\n"
 
     # Phase transition reminder (optional, gated by config)
-    if cfg.get("phase_transition_reminders", False):
-        status_content, _ = _read_file_safe(os.path.join(cwd, status_path))
-        if status_content:
-            phase_0_done = re.search(
-                r"(Phase 0|Fase 0|Foundation|Fundamentos).*?"
-                r"(completad|complete|done|\[x\])",
-                status_content, re.IGNORECASE,
-            )
-            phase_1_active = re.search(
-                r"(Phase 1|Fase 1|Technical Landscape|Panorama).*?"
-                r"(completad|complete|done|in.progress|en.curso|\[x\])",
-                status_content, re.IGNORECASE,
+    if cfg.get("phase_transition_reminders", False) and status_doc:
+        if status_doc["phase_0_done"] and not status_doc["phase_1_active"]:
+            msg += (
+                "\n  PHASE TRANSITION: Phase 0 complete but Phase 1 not started.\n"
+                "  Review _workflow/guides/workflow-guide.md for next steps.\n"
             )
-            if phase_0_done and not phase_1_active:
-                msg += (
-                    "\n  PHASE TRANSITION: Phase 0 complete but Phase 1 not started.\n"
-                    "  Review _workflow/guides/workflow-guide.md for next steps.\n"
-                )
 
     if version_msg:
         msg += f"\n  {version_msg}\n"
@@ -423,6 +362,7 @@ def main():
     msg += "  - Update CHANGELOG-DEV.md if significant changes are made\n"
 
     # Output structured JSON — additionalContext goes directly into Claude's context
+    lorekeeper_docs.disarm_watchdog(deadline)  # Done: the watchdog must not cut the output
     json.dump(
         {
             "hookSpecificOutput": {
@@ -435,5 +375,57 @@ def main():
     sys.exit(0)
 
 
+def _missing_docs_protocol(cwd):
+    """Session message when lorekeeper_docs.py is missing: integrity only.
+
+    The doc checks need the module; the hook-integrity check does not, and a
+    deleted helper file is itself reported as an integrity problem.
+    """
+    warnings = []
+    if _load_config(cwd).get("hook_integrity_check", True):
+        warnings = _verify_hook_integrity(cwd)
+    if not any("lorekeeper_docs.py is missing" in w for w in warnings):
+        warnings.insert(0, "HOOK INTEGRITY: hooks/lorekeeper_docs.py is missing (required by the Lorekeeper hooks)")
+    warnings.append("Restore lorekeeper_docs.py (re-run /ignite); doc checks were skipped this session")
+    msg = "Lorekeeper SESSION PROTOCOL — MANDATORY before any work:\n\nREQUIRED ACTIONS (do these FIRST):\n"
+    for i, warning in enumerate(warnings[:8], 1):
+        msg += f"  {i}. {warning}\n"
+    return msg
+
+
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        print("Lorekeeper: could not parse hook input - failing open", file=sys.stderr)
+        sys.exit(0)
+    cwd = data.get("cwd", ".")
+    if lorekeeper_docs is None:
+        print("Lorekeeper: lorekeeper_docs.py missing next to the hooks - integrity check only", file=sys.stderr)
+        json.dump(
+            {
+                "hookSpecificOutput": {
+                    "hookEventName": "SessionStart",
+                    "additionalContext": _missing_docs_protocol(cwd),
+                }
+            },
+            sys.stdout,
+        )
+        sys.exit(0)
+
+    deadline = lorekeeper_docs.hook_deadline("lorekeeper-session-gate.py", cwd, LATENCY_BUDGET_MS, WATCHDOG_MS)
+    lorekeeper_docs.arm_watchdog(deadline)
+    try:
+        _session_protocol(cwd, deadline)
+    except KeyboardInterrupt:
+        print(
+            f"Lorekeeper: session gate stopped by its {deadline['watchdog_ms']} ms watchdog — failing open",
+            file=sys.stderr,
+        )
+    finally:
+        lorekeeper_docs.disarm_watchdog(deadline)
+    sys.exit(0)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,528 @@
+"""Lorekeeper documentation validator — the 11 checks of scripts/validate-docs.sh.
+
+Imported by lorekeeper-commit-gate and lorekeeper-session-end, which run it
+in-process instead of spawning bash (and the grep/wc chain behind it); also
+the CLI behind the validate-docs.sh wrapper, with the same text output and
+exit codes:
+
+    python .claude/hooks/lorekeeper_docs.py [--strict] [--root <project>]
+
+Also keeps the parsed doc-state snapshot the hooks share: doc_state() stats
+each doc and re-parses only those whose mtime, size or inode changed since
+the snapshot in .claude/lorekeeper-docstate.json, so a session start or a
+commit usually costs a few stat() calls. validate() runs on the same facts
+and returns structured results; render() turns them into the report the
+script always printed.
+
+The three hooks also share their latency budget helpers from here:
+hook_deadline(), checkpoint(), time_left() and arm_watchdog()/disarm_watchdog()
+(the Lorekeeper counterpart of cerbero_core's).
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Shared module, not a hook: hook-daemon.py never serves a file with this line
+NOT_A_HOOK = True
+
+# The stock scripts/validate-docs.sh carries this line. When the configured
+# validation script is that file, unmodified, the hooks call validate()
+# directly; a wrapper edited to run extra checks goes through bash.
+WRAPPER_MARKER = b"# lorekeeper-stock-wrapper v"
+# SHA-256 of each stock wrapper version, line endings normalized to \n
+STOCK_WRAPPER_SHA256 = {
+    "a88bdc411f77319839d7935080215c8293e029635382af45a816c3f1ec9b9b82",  # v1
+}
+STOCK_WRAPPER_MAX_BYTES = 4096
+
+DEFAULTS = {
+    "scratchpad": "docs/SCRATCHPAD.md",
+    "scratchpad_max": 150,
+    "scratchpad_grad": 100,
+    "changelog": "docs/CHANGELOG-DEV.md",
+    "status": "docs/STATUS.md",
+    "status_max": 60,
+    "decisions": "docs/DECISIONS.md",
+    "lessons": "docs/LESSONS-LEARNED.md",
+    "claude_md": "CLAUDE.md",
+    "claude_md_max": 200,
+    "claude_md_warn": 180,
+}
+
+# i18n: ES/EN/PT/FR variants (matched case-insensitively where noted)
+DECISIONS_HEADERS = ("| Fecha |", "| Date |", "| Data |")
+PHASE_MARKERS = ("fase actual", "current phase", "fase atual", "phase actuelle", "## fase", "## phase")
+PENDING_MARKERS = ("pendiente", "pending", "pendente", "en attente")
+INCIDENT_MARKERS = ("template de incidente", "incident template", "modele d'incident")
+REQUIRED_SECTIONS = (
+    "## Stack", "## Commands", "## Style", "## Rules", "## Architecture",
+    "## Conventions", "## Learned Patterns",
+)
+# Every YYYY-MM-DD substring, overlapping ones included, so that
+# "today in content" and "today in dates" always agree
+DATE_PATTERN = re.compile(r"(?=([0-9]{4}-[0-9]{2}-[0-9]{2}))")
+PHASE_HEADING = re.compile(r"^##\s+(Fase actual|Current phase)", re.IGNORECASE)
+UNCHECKED_TASK = re.compile(r"^\s*-\s*\[\s*\]\s+(.+)")
+MAX_TASKS = 5
+# Phase transition reminder (session-gate): a line naming the phase, then its state
+PHASE_0_DONE = (r"Phase 0|Fase 0|Foundation|Fundamentos", r"completad|complete|done|\[x\]")
+PHASE_1_ACTIVE = (
+    r"Phase 1|Fase 1|Technical Landscape|Panorama",
+    r"completad|complete|done|in.progress|en.curso|\[x\]",
+)
+
+# --- Doc-state snapshot ---
+
+SNAPSHOT_PATH = os.path.join(".claude", "lorekeeper-docstate.json")
+SNAPSHOT_VERSION = 1  # bump when parse_doc() changes what it extracts
+# A file modified this recently may change again within the same mtime tick
+# without changing size: its entry is not trusted on the next run (as git does
+# for "racily clean" index entries).
+RACY_SECONDS = 2
+ROLES = ("claude_md", "status", "decisions", "changelog", "scratchpad", "lessons")
+
+OK, WARN, FAIL = "ok", "warn", "fail"
+LABELS = {OK: "[ OK ]", WARN: "[WARN]", FAIL: "[FAIL]"}
+
+
+def settings(cfg):
+    """Doc paths and limits from a lorekeeper config dict (missing keys → defaults)."""
+    s = dict(DEFAULTS)
+    if not isinstance(cfg, dict):
+        return s
+    try:
+        docs = cfg.get("docs", {})
+        sp, st, cm = docs.get("scratchpad", {}), docs.get("status", {}), cfg.get("claude_md", {})
+        s.update(
+            scratchpad=sp.get("path", s["scratchpad"]),
+            scratchpad_max=int(sp.get("max_lines", s["scratchpad_max"])),
+            scratchpad_grad=int(sp.get("graduation_threshold", s["scratchpad_grad"])),
+            changelog=docs.get("changelog", {}).get("path", s["changelog"]),
+            status=st.get("path", s["status"]),
+            status_max=int(st.get("max_lines", s["status_max"])),
+            decisions=docs.get("decisions", {}).get("path", s["decisions"]),
+            lessons=docs.get("lessons_learned", {}).get("path", s["lessons"]),
+            claude_md=cm.get("path", s["claude_md"]),
+            claude_md_max=int(cm.get("max_lines", s["claude_md_max"])),
+            claude_md_warn=int(cm.get("warn_threshold", s["claude_md_warn"])),
+        )
+    except (AttributeError, TypeError, ValueError):
+        return dict(DEFAULTS)  # Unusable config — same fallback as the old script
+    return s
+
+
+def load_config(root):
+    """Raw .claude/lorekeeper-config.json, or {} if missing/corrupt."""
+    try:
+        with open(os.path.join(root, ".claude", "lorekeeper-config.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _line_mentions(text, subject, state):
+    """True if a line matches `subject` and, after it, `state` (case-insensitive).
+
+    Same answer as re.search(f"({subject}).*?({state})") in linear time: that
+    regex rescans the rest of the line from every repeat of subject.
+    """
+    for line in text.split("\n"):
+        found = re.search(subject, line, re.IGNORECASE)
+        if found and re.search(state, line[found.end():], re.IGNORECASE):
+            return True
+    return False
+
+
+def _current_phase(lines):
+    """First non-empty line under "## Fase actual" / "## Current phase", or None."""
+    in_phase_section = False
+    for line in lines:
+        if PHASE_HEADING.match(line):
+            in_phase_section = True
+            continue
+        if in_phase_section:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("#"):
+                return stripped
+            if stripped.startswith("#"):
+                break  # Next section reached
+    return None
+
+
+def parse_doc(data):
+    """Every fact any Lorekeeper hook or check needs from one doc (raw bytes).
+
+    "error" is set when the file is not valid UTF-8: the hooks report it as
+    unreadable, the checks run on the text decoded with replacement
+    characters (as grep did).
+    """
+    try:
+        text, error = data.decode("utf-8"), None
+    except UnicodeDecodeError:
+        text, error = data.decode("utf-8", "replace"), "encoding error (not UTF-8)"
+    lower = text.lower()
+    lines = text.splitlines()
+    raw_lines = text.split("\n")
+    tasks = []
+    for line in lines:
+        match = UNCHECKED_TASK.match(line)
+        if match:
+            tasks.append(match.group(1).strip())
+            if len(tasks) >= MAX_TASKS:
+                break
+    return {
+        "error": error,
+        "lines": len(lines),
+        "newlines": data.count(b"\n"),  # what `wc -l` reports
+        "dates": sorted(set(DATE_PATTERN.findall(text))),
+        "phase": _current_phase(lines) if text else None,
+        "tasks": tasks,
+        "decisions_header": any(h in text for h in DECISIONS_HEADERS),
+        "decision_rows": sum(1 for line in raw_lines if line.startswith("| 20")),
+        "changelog_entries": sum(1 for line in raw_lines if line.startswith("## 20")),
+        "phase_marker": any(m in lower for m in PHASE_MARKERS),
+        "pending_marker": any(m in lower for m in PENDING_MARKERS),
+        "incident_marker": any(m in lower for m in INCIDENT_MARKERS),
+        "sections": [section for section in REQUIRED_SECTIONS if section in text],
+        "phase_0_done": _line_mentions(text, *PHASE_0_DONE),
+        "phase_1_active": _line_mentions(text, *PHASE_1_ACTIVE),
+    }
+
+
+def _stat_key(st):
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def doc_state(root, cfg=None):
+    """Parsed facts for each doc role, from the snapshot where still valid.
+
+    Returns {role: facts}, where facts is parse_doc() output plus "path", or
+    None for a missing file. Unreadable files get {"path", "error"} only.
+    The snapshot is rewritten only when an entry changed; failures to read or
+    write it just mean parsing again.
+    """
+    s = settings(load_config(root) if cfg is None else cfg)
+    snapshot_path = os.path.join(root, SNAPSHOT_PATH)
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            snapshot = {}
+        entries = snapshot.get("docs", {})
+    except (OSError, ValueError, AttributeError):
+        entries = {}
+    if not isinstance(entries, dict):
+        entries = {}
+
+    state, changed, now = {}, False, time.time()
+    for role in ROLES:
+        path = s[role]
+        full_path = os.path.join(root, path)
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            state[role] = None
+            if entries.pop(path, None) is not None:
+                changed = True
+            continue
+        key = _stat_key(st)
+        entry = entries.get(path)
+        if isinstance(entry, dict) and entry.get("key") == key and isinstance(entry.get("facts"), dict):
+            state[role] = dict(entry["facts"], path=path)
+            continue
+        try:
+            with open(full_path, "rb") as f:
+                facts = parse_doc(f.read())
+        except OSError as e:
+            state[role] = {"path": path, "error": str(e)}
+            continue
+        state[role] = dict(facts, path=path)
+        racy = now - st.st_mtime < RACY_SECONDS
+        entries[path] = {"key": None if racy else key, "facts": facts}
+        changed = True
+
+    if changed and os.path.isdir(os.path.dirname(snapshot_path)):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": SNAPSHOT_VERSION, "docs": entries}, f)
+            os.replace(tmp_path, snapshot_path)
+        except OSError:
+            pass  # Fail open: the facts were parsed anyway
+    return state
+
+
+# --- Latency budget (the three Lorekeeper hooks) ---
+
+# Optional per-hook overrides: {"lorekeeper-commit-gate.py": {"budget_ms": 40000, "watchdog_ms": 55000}}
+HOOK_BUDGETS_PATH = os.path.join(".claude", "hook-budgets.json")
+
+
+def hook_deadline(hook, cwd, budget_ms, watchdog_ms):
+    """Deadline state for one hook run, with HOOK_BUDGETS_PATH overrides applied."""
+    project = os.environ.get("CLAUDE_PROJECT_DIR") or cwd
+    try:
+        with open(os.path.join(project, HOOK_BUDGETS_PATH), "r", encoding="utf-8") as f:
+            overrides = json.load(f).get(hook, {})
+        budget_ms = max(0, int(overrides.get("budget_ms", budget_ms)))
+        watchdog_ms = max(0, int(overrides.get("watchdog_ms", watchdog_ms)))
+    except (OSError, ValueError, TypeError, AttributeError):
+        pass  # No or unusable overrides — keep the defaults
+    return {
+        "budget_ms": budget_ms, "watchdog_ms": max(watchdog_ms, budget_ms),
+        "end": time.monotonic() + budget_ms / 1000, "skipped": [],
+        "lock": None, "done": False,
+    }
+
+
+def time_left(deadline, cap):
+    """Seconds left in the budget, at most cap (a subprocess timeout)."""
+    return min(cap, max(0.0, deadline["end"] - time.monotonic()))
+
+
+def checkpoint(deadline, check):
+    """True if `check` may still run; once the budget is spent, records it as skipped."""
+    if time.monotonic() < deadline["end"]:
+        return True
+    deadline["skipped"].append(check)
+    return False
+
+
+def arm_watchdog(deadline):
+    """Interrupt the main thread at watchdog_ms so the hook fails open before the external kill.
+
+    The hook catches KeyboardInterrupt; subprocess.run() kills its child on
+    it. Call disarm_watchdog() before writing any output. Uses _thread, not
+    threading, to keep startup cheap.
+    """
+    import _thread
+
+    deadline["lock"] = _thread.allocate_lock()
+
+    def fire():
+        time.sleep(deadline["watchdog_ms"] / 1000)
+        with deadline["lock"]:
+            if not deadline["done"]:
+                deadline["done"] = True
+                _thread.interrupt_main()
+
+    _thread.start_new_thread(fire, ())
+
+
+def disarm_watchdog(deadline):
+    """Stop the watchdog once the work is done. Safe to call more than once.
+
+    An interrupt the watchdog already sent arrives here, before the output
+    is written, not halfway through it.
+    """
+    if deadline["lock"] is None:
+        deadline["done"] = True
+        return
+    with deadline["lock"]:
+        deadline["done"] = True
+
+
+# --- Checks ---
+
+
+def _check_recent(results, doc, label, today):
+    if not doc:
+        return
+    if today in doc["dates"]:
+        results.append((OK, f"{label}: actualizado hoy ({today})"))
+    else:
+        last = doc["dates"][-1] if doc["dates"] else ""
+        results.append((WARN, f"{label}: ultima fecha {last} (no hoy)"))
+
+
+def _check_lines(results, doc, limit):
+    if not doc:
+        return
+    if doc["newlines"] > limit:
+        results.append((FAIL, f"{doc['path']}: {doc['newlines']} lineas (maximo {limit})"))
+    else:
+        results.append((OK, f"{doc['path']}: {doc['newlines']}/{limit} lineas"))
+
+
+def is_stock_wrapper(script_path):
+    """True if script_path is an unmodified stock validate-docs.sh."""
+    try:
+        with open(script_path, "rb") as f:
+            content = f.read(STOCK_WRAPPER_MAX_BYTES + 1)
+    except OSError:
+        return False
+    if len(content) > STOCK_WRAPPER_MAX_BYTES or WRAPPER_MARKER not in content:
+        return False
+    return hashlib.sha256(content.replace(b"\r\n", b"\n")).hexdigest() in STOCK_WRAPPER_SHA256
+
+
+def validate(root, cfg=None, today=None, state=None):
+    """Run the 11 checks against the docs under `root`.
+
+    cfg is a lorekeeper config dict (loaded from `root` when None); state is
+    a doc_state() result the caller already has.
+    Returns {"sections": [(title, [(status, message), ...]), ...],
+    "errors": int, "warnings": int}.
+    """
+    if cfg is None:
+        cfg = load_config(root)
+    s = settings(cfg)
+    today = today or date.today().isoformat()
+    if state is None:
+        state = doc_state(root, cfg)
+    # Unreadable (OSError) docs: only reported missing, as `[ -f ]` + grep did
+    docs = {role: facts if facts and "lines" in facts else None for role, facts in state.items()}
+    claude, status, decisions = docs["claude_md"], docs["status"], docs["decisions"]
+    changelog, scratchpad, lessons = docs["changelog"], docs["scratchpad"], docs["lessons"]
+    sections = []
+
+    results = []
+    for role in ROLES:
+        if state[role]:
+            results.append((OK, f"{s[role]} existe"))
+        else:
+            results.append((FAIL, f"{s[role]} NO ENCONTRADO"))
+    sections.append(("1. Archivos obligatorios", results))
+
+    results = []
+    _check_lines(results, claude, s["claude_md_max"])
+    _check_lines(results, status, s["status_max"])
+    _check_lines(results, scratchpad, s["scratchpad_max"])
+    sections.append(("2. Limites de lineas", results))
+
+    results = []
+    if decisions:
+        if decisions["decisions_header"]:
+            results.append((OK, "Header de tabla presente"))
+        else:
+            results.append((FAIL, "Falta header de tabla (| Fecha/Date/Data | Decision | ...)"))
+        results.append((OK, f"{decisions['decision_rows']} decisiones registradas"))
+    sections.append(("3. Formato de DECISIONS.md", results))
+
+    results = []
+    if changelog:
+        entries = changelog["changelog_entries"]
+        if entries > 0:
+            results.append((OK, f"{entries} entradas en changelog"))
+        else:
+            results.append((FAIL, "Changelog vacio (sin entradas ## YYYY-MM-DD)"))
+    sections.append(("4. Formato de CHANGELOG-DEV.md", results))
+
+    results = []
+    _check_recent(results, status, "STATUS", today)
+    _check_recent(results, changelog, "CHANGELOG-DEV", today)
+    _check_recent(results, scratchpad, "SCRATCHPAD", today)
+    sections.append(("5. Actualizaciones recientes", results))
+
+    results = []
+    if status:
+        if status["phase_marker"]:
+            results.append((OK, "Tiene seccion de fase actual"))
+        else:
+            results.append((WARN, "No tiene indicador de fase actual"))
+        if status["pending_marker"]:
+            results.append((OK, "Tiene seccion de pendientes"))
+        else:
+            results.append((WARN, "No tiene seccion de pendientes"))
+    sections.append(("6. Coherencia de STATUS.md", results))
+
+    results = []
+    if claude:
+        for section in REQUIRED_SECTIONS:
+            if section in claude["sections"]:
+                results.append((OK, f"CLAUDE.md tiene '{section}'"))
+            else:
+                results.append((FAIL, f"CLAUDE.md FALTA '{section}'"))
+    sections.append(("7. Secciones obligatorias en CLAUDE.md", results))
+
+    results = []
+    if scratchpad:
+        if today in scratchpad["dates"]:
+            results.append((OK, f"SCRATCHPAD tiene entrada de hoy ({today})"))
+        else:
+            results.append((WARN, "SCRATCHPAD no tiene entrada de hoy"))
+    sections.append(("8. Sesion actual en SCRATCHPAD.md", results))
+
+    results = []
+    if scratchpad:
+        grad, count = s["scratchpad_grad"], scratchpad["newlines"]
+        if count > grad:
+            results.append((WARN, f"SCRATCHPAD.md tiene {count} lineas (>{grad}) "
+                                  "— revisar candidatos de graduacion"))
+        else:
+            results.append((OK, f"SCRATCHPAD.md: {count} lineas (< threshold de graduacion)"))
+    sections.append(("9. Graduacion pendiente", results))
+
+    results = []
+    if claude:
+        count = claude["newlines"]
+        if count > s["claude_md_warn"]:
+            results.append((WARN, f"CLAUDE.md tiene {count} lineas "
+                                  f"(>{s['claude_md_warn']}/{s['claude_md_max']}) "
+                                  "— podar con prueba de relevancia"))
+        else:
+            results.append((OK, f"CLAUDE.md: {count} lineas (margen OK)"))
+    sections.append(("10. Limite de CLAUDE.md", results))
+
+    results = []
+    if lessons:
+        if lessons["incident_marker"]:
+            results.append((OK, "LESSONS-LEARNED.md tiene template de incidente"))
+        else:
+            results.append((WARN, "LESSONS-LEARNED.md falta template de incidente"))
+    elif not state["lessons"]:
+        results.append((OK, "LESSONS-LEARNED.md no existe aun (se creara con /ignite)"))
+    sections.append(("11. Estructura de LESSONS-LEARNED.md", results))
+
+    flat = [st for _, results in sections for st, _ in results]
+    return {"sections": sections, "errors": flat.count(FAIL), "warnings": flat.count(WARN)}
+
+
+def messages(report, status):
+    """Report lines of one status, as the script printed them ("[FAIL] ...")."""
+    return [f"{LABELS[st]} {msg}" for _, results in report["sections"]
+            for st, msg in results if st == status]
+
+
+def verdict(report, strict=False):
+    """(summary line, exit code) — the script's "RESULTADO:" line."""
+    if report["errors"]:
+        return "RESULTADO: FALLO — documentacion necesita atencion", 1
+    if report["warnings"]:
+        if strict:
+            return "RESULTADO: FALLO (modo strict) — docs parcialmente al dia", 1
+        return "RESULTADO: PARCIAL — docs parcialmente al dia", 0
+    return "RESULTADO: OK — documentacion al dia", 0
+
+
+def render(report, strict=False):
+    """The full text report of validate-docs.sh, and its exit code."""
+    bar = "=" * 40
+    out = ["", bar, "  Validacion de Docs", bar, ""]
+    for title, results in report["sections"]:
+        out.append(title)
+        out.extend(f"  {LABELS[st]} {msg}" for st, msg in results)
+        out.append("")
+    summary, code = verdict(report, strict)
+    out += [bar, f"  Resumen: {report['errors']} errores, {report['warnings']} warnings", bar, f"  {summary}"]
+    return "\n".join(out) + "\n", code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate Lorekeeper project documentation.")
+    parser.add_argument("--strict", action="store_true", help="Warnings also exit 1")
+    parser.add_argument("--root", default=os.getcwd(), help="Project root (default: current directory)")
+    args = parser.parse_args(argv)
+    text, code = render(validate(args.root), args.strict)
+    sys.stdout.write(text)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
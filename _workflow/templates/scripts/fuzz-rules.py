@@ -0,0 +1,436 @@
+"""Fuzz every hook regex with adversarial inputs and flag super-linear ones.
+
+Run from project root (uses .claude/hooks/ when deployed, else the Ignite
+template directories next to this script):
+    python scripts/fuzz-rules.py                          # All rules, exit 1 on a ReDoS
+    python scripts/fuzz-rules.py --size 256k              # Larger inputs (slower)
+    python scripts/fuzz-rules.py --hooks pre-tool-security.py --verbose
+
+Collects every regex a hook can run: the compiled rules it holds once
+imported (module globals, including lists, tuples and dicts of them) and the
+literal patterns its source passes to re.search(), re.match() and friends.
+Hooks without a __main__ guard are only read, never imported.
+
+Attack inputs are derived from each pattern: its partial matches repeated
+(many starts that each fail late), every quantified piece pumped to the full
+size with a tail that breaks the match, the same pumped piece repeated, and
+the shortest match minus its last character repeated. Each input is timed
+with finditer() at sizes growing 4x up to --size; the growth exponent of a
+step is log4 of the time ratio (1.0 is linear, 2.0 quadratic). A rule fails
+when an input grows faster than --max-growth or takes longer than --max-ms at
+--size; growth is judged from the first step over NOISE_FLOOR_MS, so a
+quadratic rule is caught on small inputs before it gets slow. Exits 1 if any
+rule fails.
+"""
+import argparse
+import ast
+import importlib.util
+import json
+import math
+import os
+import re
+import sys
+import time
+
+try:  # Python 3.11+ moved the parser; the old module name still warns
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Template directories holding the hooks, relative to this script (Ignite repo layout)
+TEMPLATE_HOOK_DIRS = (
+    os.path.join(SCRIPT_DIR, "..", "hooks"),
+    os.path.join(SCRIPT_DIR, "..", "hooks", "lorekeeper"),
+    os.path.join(SCRIPT_DIR, "..", "skills", "cerbero", "hooks"),
+)
+
+# Imported even without a __main__ guard: libraries with no side effects
+SHARED_MODULES = ("cerbero_core.py",)
+
+SIZES = {"16k": 16 << 10, "64k": 64 << 10, "256k": 256 << 10, "1m": 1 << 20}
+
+# re functions whose first argument is a pattern
+_RE_FUNCTIONS = {"compile", "search", "match", "fullmatch", "sub", "subn", "findall", "finditer", "split"}
+# Positional index of the flags argument per function
+_FLAGS_ARG = {"compile": 1, "search": 2, "match": 2, "fullmatch": 2, "findall": 2, "finditer": 2,
+              "split": 3, "sub": 4, "subn": 4}
+
+# Characters tried as members of a class, in order of preference for samples.
+# Covers word/non-word, space/line-break and the punctuation the rules use.
+_ALPHABET = (
+    "a0 _-/+=.:;|&<>()[]{}\"'\\\n\t\r!#$%*,?@^`~zZ9"
+    "\u00e9\u0130\u200b\u00a0\U000e0041"
+)
+_CATEGORIES = {
+    "CATEGORY_DIGIT": r"\d", "CATEGORY_NOT_DIGIT": r"\D",
+    "CATEGORY_SPACE": r"\s", "CATEGORY_NOT_SPACE": r"\S",
+    "CATEGORY_WORD": r"\w", "CATEGORY_NOT_WORD": r"\W",
+    "CATEGORY_LINEBREAK": r"\n", "CATEGORY_NOT_LINEBREAK": r"[^\n]",
+}
+# Appended after a pumped piece so the match fails as late as possible
+_TAILS = ("", "!", "_", "\n")
+_REPEAT_OPS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+_CHAR_OPS = ("LITERAL", "NOT_LITERAL", "ANY", "IN")
+
+# Input sizes per attack: --size divided by these, smallest first
+SIZE_STEPS = (256, 64, 16, 4, 1)
+# Past this time for one input, larger ones are not attempted (the rule failed)
+GIVE_UP_SECONDS = 0.2
+# Below this time an input is timing noise: its growth is not judged
+NOISE_FLOOR_MS = 2.0
+
+
+# --- Rule collection ---
+
+
+def _find_patterns(value, name, out, depth=0):
+    """Append (name, compiled) for every re.Pattern reachable from value."""
+    if isinstance(value, re.Pattern):
+        out.append((name, value))
+    elif depth < 3 and isinstance(value, (list, tuple, set, frozenset)):
+        for i, item in enumerate(value):
+            _find_patterns(item, f"{name}[{i}]", out, depth + 1)
+    elif depth < 3 and isinstance(value, dict):
+        for key, item in value.items():
+            _find_patterns(item, f"{name}[{key!r}]", out, depth + 1)
+
+
+def _flags_value(node):
+    """Constant value of a flags expression like re.I | re.M, else 0."""
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "re":
+        value = getattr(re, node.attr, 0)
+        return value if isinstance(value, int) else 0
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _flags_value(node.left) | _flags_value(node.right)
+    return 0
+
+
+def _source_patterns(path):
+    """(name, compiled) for string literals passed to re.<function>() in a file."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    found = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id == "re"
+                and node.func.attr in _RE_FUNCTIONS and node.args
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, (str, bytes))):
+            continue
+        flags_node = None
+        index = _FLAGS_ARG[node.func.attr]
+        if len(node.args) > index:
+            flags_node = node.args[index]
+        for keyword in node.keywords:
+            if keyword.arg == "flags":
+                flags_node = keyword.value
+        try:
+            compiled = re.compile(node.args[0].value, _flags_value(flags_node) if flags_node else 0)
+        except re.error:
+            continue
+        found.append((f"line {node.lineno}", compiled))
+    return found
+
+
+def _import_patterns(path, index):
+    """(name, compiled) for every pattern held by the module once imported."""
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        stem = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+        spec = importlib.util.spec_from_file_location(f"fuzz_{index}_{stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.pop(0)
+    found = []
+    for name, value in vars(module).items():
+        if not name.startswith("__"):
+            _find_patterns(value, name, found)
+    return found
+
+
+def _importable(path):
+    if os.path.basename(path) in SHARED_MODULES:
+        return True
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    return re.search(r"""if\s+__name__\s*==\s*["']__main__["']""", source) is not None
+
+
+def collect_rules(hook_dirs, only=None):
+    """[(rule_id, compiled)] for every distinct (pattern, flags) in the hooks."""
+    rules = []
+    seen = set()
+    index = 0
+    for directory in hook_dirs:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.endswith(".py") or not os.path.isfile(path) or (only and name not in only):
+                continue
+            index += 1
+            found = []
+            if _importable(path):
+                try:
+                    found.extend(_import_patterns(path, index))
+                except Exception as e:  # A hook that cannot import here still has source rules
+                    print(f"fuzz-rules: could not import {name} ({e}); source patterns only", file=sys.stderr)
+            found.extend(_source_patterns(path))
+            for label, compiled in found:
+                key = (compiled.pattern, compiled.flags)
+                if key not in seen:
+                    seen.add(key)
+                    rules.append((f"{name}:{label}", compiled))
+    return rules
+
+
+# --- Attack inputs ---
+
+
+def _in_class(items, ch):
+    """Membership of ch in a parsed character class (IN node items)."""
+    negate = False
+    hit = False
+    for op, av in items:
+        kind = op.name
+        if kind == "NEGATE":
+            negate = True
+        elif kind == "LITERAL":
+            hit = hit or ord(ch) == av
+        elif kind == "RANGE":
+            hit = hit or av[0] <= ord(ch) <= av[1]
+        elif kind == "CATEGORY":
+            hit = hit or re.match(_CATEGORIES.get(av.name, r"(?!)"), ch) is not None
+    return hit != negate
+
+
+def _members(op, av):
+    """Alphabet characters a single-character node matches, or None."""
+    kind = op.name
+    if kind == "LITERAL":
+        return [chr(av)]
+    if kind == "NOT_LITERAL":
+        return [c for c in _ALPHABET if ord(c) != av]
+    if kind == "ANY":
+        return [c for c in _ALPHABET if c != "\n"]
+    if kind == "IN":
+        return [c for c in _ALPHABET if _in_class(av, c)]
+    return None
+
+
+def _sample(items):
+    """A short string matched by a parsed sequence (first branch, minimum repeats)."""
+    out = []
+    for op, av in items:
+        kind = op.name
+        if kind in _CHAR_OPS:
+            chars = _members(op, av)
+            out.append(chars[0] if chars else "")
+        elif kind in _REPEAT_OPS:
+            out.append(_sample(av[2]) * av[0])
+        elif kind == "SUBPATTERN":
+            out.append(_sample(av[-1]))
+        elif kind == "ATOMIC_GROUP":
+            out.append(_sample(av))
+        elif kind == "BRANCH":
+            out.append(_sample(av[1][0]))
+        elif kind == "GROUPREF_EXISTS":
+            out.append(_sample(av[1]))
+    return "".join(out)
+
+
+def _flatten(items):
+    """Top-level pieces with plain groups expanded inline."""
+    pieces = []
+    for op, av in items:
+        if op.name == "SUBPATTERN":
+            pieces.extend(_flatten(av[-1]))
+        else:
+            pieces.append((op, av))
+    return pieces
+
+
+def _pumps(op, av, depth=0):
+    """Strings that one more iteration of a repeat (at any depth in the piece) accepts."""
+    kind = op.name
+    pumps = []
+    if kind in _REPEAT_OPS and av[1] > 1:
+        body = list(av[2])
+        chars = _members(*body[0]) if len(body) == 1 and body[0][0].name in _CHAR_OPS else None
+        if chars:
+            word = [c for c in chars if re.match(r"\w", c)]
+            other = [c for c in chars if not re.match(r"\w", c)]
+            pumps.extend(chars[:1] + word[:1] + other[:2])
+            if word and other:
+                pumps.append(word[0] + other[0])
+        else:
+            pumps.append(_sample(body))
+    if depth < 4:
+        children = []
+        if kind in _REPEAT_OPS:
+            children = list(av[2])
+        elif kind == "SUBPATTERN":
+            children = list(av[-1])
+        elif kind == "BRANCH":
+            children = [item for branch in av[1] for item in branch]
+        for child_op, child_av in children:
+            pumps.extend(_pumps(child_op, child_av, depth + 1))
+    return [p for p in dict.fromkeys(pumps) if p]
+
+
+def attack_inputs(compiled):
+    """[(label, build)] where build(size) returns an adversarial input of ~size chars."""
+    pattern = compiled.pattern
+    if isinstance(pattern, bytes):
+        pattern = pattern.decode("latin-1")
+    pieces = _flatten(list(sre_parse.parse(pattern, compiled.flags & ~re.UNICODE)))
+    attacks = {}
+
+    def repeat(unit):
+        return lambda size: (unit * (size // len(unit) + 1))[:size]
+
+    for k in range(1, len(pieces) + 1):
+        prefix = _sample(pieces[:k])
+        if prefix:
+            attacks.setdefault(prefix, (f"repeat {prefix[:24]!r}", repeat(prefix)))
+    full = _sample(pieces)
+    if len(full) > 1:
+        attacks.setdefault(full[:-1], (f"repeat {full[:-1][:24]!r}", repeat(full[:-1])))
+    for i, (op, av) in enumerate(pieces):
+        head = _sample(pieces[:i])
+        for pump in _pumps(op, av):
+            for tail in _TAILS:
+                key = (head, pump, tail)
+
+                def build(size, head=head, pump=pump, tail=tail):
+                    return head + pump * max(1, (size - len(head) - len(tail)) // len(pump)) + tail
+
+                attacks.setdefault(key, (f"{head[:16]!r} + {pump!r}*n + {tail!r}", build))
+            unit = head + pump * 16
+            attacks.setdefault(unit, (f"repeat {head[:16]!r} + {pump!r}*16", repeat(unit)))
+    return list(attacks.values())
+
+
+# --- Timing ---
+
+
+def _time_finditer(compiled, text):
+    """Best-of wall time (s) to run finditer() over text to completion."""
+    best = None
+    spent = 0.0
+    runs = 0
+    while runs < 3 or (runs < 7 and spent < 0.05):
+        start = time.perf_counter()
+        for _ in compiled.finditer(text):
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        runs += 1
+        if elapsed > GIVE_UP_SECONDS:
+            break
+    return best
+
+
+def fuzz_rule(compiled, size, max_growth, max_ms):
+    """Worst attack for one rule: dict with label, ms at size, growth, failed.
+
+    Stops at the first failing attack: one is enough to fail the rule.
+    """
+    worst = None
+    for label, build in attack_inputs(compiled):
+        growth = 0.0
+        previous = None
+        elapsed = None
+        for divisor in SIZE_STEPS:
+            text = build(max(1, size // divisor))
+            if isinstance(compiled.pattern, bytes):
+                text = text.encode("utf-8")
+            elapsed = _time_finditer(compiled, text)
+            if previous is not None and elapsed * 1000 >= NOISE_FLOOR_MS:
+                growth = max(growth, math.log(elapsed / max(previous, 1e-9), 4))
+            previous = elapsed
+            if growth > max_growth or elapsed > GIVE_UP_SECONDS:
+                break
+        complete = divisor == 1
+        failed = growth > max_growth or not complete or elapsed * 1000 > max_ms
+        result = {
+            "attack": label,
+            "ms": round(elapsed * 1000, 3) if complete else None,
+            "growth": round(growth, 2),
+            "failed": failed,
+        }
+        rank = (failed, elapsed if complete else 0.0, growth)
+        if worst is None or rank > worst[0]:
+            worst = (rank, result)
+        if failed:
+            break
+    return worst[1] if worst else {"attack": "-", "ms": 0.0, "growth": 0.0, "failed": False}
+
+
+# --- Driver ---
+
+
+def find_hook_dirs(explicit):
+    if explicit:
+        return explicit
+    deployed = os.path.join(os.getcwd(), ".claude", "hooks")
+    if os.path.isfile(os.path.join(deployed, "validate-prompt.py")):
+        return [deployed]
+    return [os.path.normpath(d) for d in TEMPLATE_HOOK_DIRS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ReDoS fuzz benchmark for hook rules")
+    parser.add_argument("--hooks", help="Comma-separated hook file names (default: all)")
+    parser.add_argument("--size", default="64k", choices=sorted(SIZES, key=SIZES.get),
+                        help="Largest input per attack (default 64k)")
+    parser.add_argument("--max-growth", type=float, default=1.5,
+                        help="Allowed growth exponent per 4x input (default 1.5; 1.0 = linear)")
+    parser.add_argument("--max-ms", type=float, default=250.0,
+                        help="Allowed time for one input at --size (default 250 ms)")
+    parser.add_argument("--hooks-dir", action="append", help="Directory holding the hooks (repeatable)")
+    parser.add_argument("--verbose", action="store_true", help="Print every rule, not only failures")
+    parser.add_argument("--json", help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    only = {h.strip() for h in args.hooks.split(",") if h.strip()} if args.hooks else None
+    hook_dirs = find_hook_dirs(args.hooks_dir)
+    rules = collect_rules(hook_dirs, only)
+    if not rules:
+        print(f"fuzz-rules: no rules found in {', '.join(hook_dirs)}", file=sys.stderr)
+        sys.exit(2)
+
+    size = SIZES[args.size]
+    print(f"{len(rules)} rules, inputs up to {args.size} chars\n")
+    print(f"{'rule':<56} {'ms @ ' + args.size:>10} {'growth':>6}  worst input")
+    report = {}
+    failures = []
+    for rule_id, compiled in rules:
+        result = fuzz_rule(compiled, size, args.max_growth, args.max_ms)
+        result["pattern"] = compiled.pattern if isinstance(compiled.pattern, str) else repr(compiled.pattern)
+        report[rule_id] = result
+        if result["failed"]:
+            failures.append(rule_id)
+        if result["failed"] or args.verbose:
+            ms = "-" if result["ms"] is None else f"{result['ms']:.2f}"
+            status = "FAIL " if result["failed"] else ""
+            print(f"{rule_id[:56]:<56} {ms:>10} {result['growth']:>6.2f}  {status}{result['attack']}", flush=True)
+            if result["failed"]:
+                print(f"    {result['pattern'][:110]}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"size": size, "rules": report, "failures": failures}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if failures:
+        print(f"\n{len(failures)} of {len(rules)} rule(s) are super-linear or over {args.max_ms:g} ms")
+        sys.exit(1)
+    print(f"\nAll {len(rules)} rules stay linear up to {size >> 10}k chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,13 @@
 Run from project root after deploying hooks:
     python scripts/generate-hook-baseline.py
 
-Creates a baseline file that lorekeeper-session-gate.py uses to detect
-unauthorized hook modifications at session start.
+Creates a baseline file that lorekeeper-session-gate.py (full check) and
+hook_integrity.py (stat-only PreToolUse check) use to detect unauthorized
+hook modifications. Each entry records the SHA-256 plus the file's size,
+mtime_ns, inode and ctime_ns, so later checks re-hash only files whose stat
+changed.
+Files are hashed in parallel, in chunks.
 """
-import hashlib
-import json
 import os
 import sys
 
@@ -20,25 +22,24 @@ def main():
         print(f"Error: hooks directory not found at {hooks_dir}", file=sys.stderr)
         sys.exit(1)
 
-    baseline = {}
-    for root, _dirs, files in os.walk(hooks_dir):
-        for filename in sorted(files):
-            if not filename.endswith(".py"):
-                continue
-            full_path = os.path.join(root, filename)
-            rel_path = os.path.relpath(full_path, os.path.join(cwd, ".claude"))
-            with open(full_path, "rb") as f:
-                file_hash = hashlib.sha256(f.read()).hexdigest()
-            baseline[rel_path.replace("\\", "/")] = file_hash
-
-    out_path = os.path.join(cwd, ".claude", "hook-integrity.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(baseline, f, indent=2, sort_keys=True)
-        f.write("\n")
+    sys.path.insert(0, hooks_dir)
+    try:
+        import hook_integrity  # Deployed with the hooks
+    except ImportError:
+        print(f"Error: hook_integrity.py not found in {hooks_dir} — deploy it first", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        baseline = hook_integrity.build_baseline(cwd)
+        hook_integrity.save_baseline(cwd, baseline)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
+    out_path = os.path.join(cwd, hook_integrity.BASELINE_PATH)
     print(f"Baseline generated: {len(baseline)} hooks hashed -> {out_path}")
-    for rel, h in sorted(baseline.items()):
-        print(f"  {rel}: {h[:16]}...")
+    for rel, entry in sorted(baseline.items()):
+        print(f"  {rel}: {entry['sha256'][:16]}...")
 
 
 if __name__ == "__main__":
@@ -7,111 +7,67 @@ Usage:
     python cerbero-scanner.py --file <path>              # Scan a file
     python cerbero-scanner.py --stdin                     # Read from stdin
     python cerbero-scanner.py --file <path> --strip-only  # Pre-processor for Tier 3
+    python cerbero-scanner.py --dir <path> --jobs 4       # Batch: every text file in a tree
+    python cerbero-scanner.py --glob "skills/**/*.md"     # Batch: files matching a glob
+    python cerbero-scanner.py --file <path> --stream      # Bounded memory for huge inputs
+    python cerbero-scanner.py --file <path> --no-cache    # Skip the scan result cache
+    python cerbero-scanner.py --file <path> --profile     # Add per-check "timings" (no cache)
 """
 import sys
 import json
 import re
-import base64
 import argparse
 import os
-import unicodedata
+import glob
+import hashlib
+import tempfile
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from datetime import datetime, timezone
 
-SCANNER_VERSION = "1.1.0"
+import cerbero_core  # Shared Unicode tables, normalize() and detectors (same directory)
+
+# Standalone CLI, not a hook: hook-daemon.py never serves a file with this line
+NOT_A_HOOK = True
+
+SCANNER_VERSION = "1.2.0"  # Bump when the report schema changes
 
 # --- Suppression annotation detection (H-SEC-003) ---
 # Suppression annotations in scanned content are treated as evasion attempts.
 # The scanner evaluates UNTRUSTED content — self-suppression is a bypass vector.
 
 _SUPPRESS_ANNOTATION = re.compile(
-    r"(?:#|//|<!--)\s*cerbero:ignore-next-line\s*(?:-->)?\s*$"
+    r"(?:#|//|<!--)\s*cerbero:ignore-next-line\s*(?:-->\s*)?$"
 )
 
 
-def scan_suppression_annotations(text):
-    """Flag suppression annotations as scanner evasion attempts."""
-    findings = []
-    for i, line in enumerate(text.splitlines(), 1):
-        if _SUPPRESS_ANNOTATION.search(line.strip()):
-            findings.append({
-                "check": "suppression_attempt",
-                "severity": "CRITICAL",
-                "detail": "Scanner evasion: suppression annotation in scanned content",
-                "line": i,
-                "context": line.strip()[:80],
-            })
-    return findings
-
-
 # --- Tier 1: Injection phrase patterns ---
 
+# (pattern, anchors): lowercase literals at least one of which every match
+# contains; rules whose anchors are absent from the folded text are skipped.
 INJECTION_PATTERNS = [
-    r"ignore\s+(all\s+)?previous\s+instructions",
-    r"ignore\s+(all\s+)?prior\s+instructions",
-    r"disregard\s+(all\s+)?previous",
-    r"forget\s+(all\s+)?previous",
-    r"override\s+(all\s+)?previous",
-    r"you\s+are\s+now\s+(a|an)\s+",
-    r"new\s+system\s+prompt",
-    r"act\s+as\s+(a|an|my)\s+",
-    r"pretend\s+you\s+are",
-    r"from\s+now\s+on\s+you\s+(will|must|should|are)",
-    r"<\s*system\s*>",
-    r"\[INST\]",
-    r"\[/INST\]",
-    r"BEGIN\s+SYSTEM\s+MESSAGE",
+    (r"ignore\s+(all\s+)?previous\s+instructions", ("ignore",)),
+    (r"ignore\s+(all\s+)?prior\s+instructions", ("ignore",)),
+    (r"disregard\s+(all\s+)?previous", ("disregard",)),
+    (r"forget\s+(all\s+)?previous", ("forget",)),
+    (r"override\s+(all\s+)?previous", ("override",)),
+    (r"you\s+are\s+now\s+(a|an)\s+", ("now",)),
+    (r"new\s+system\s+prompt", ("system",)),
+    (r"act\s+as\s+(a|an|my)\s+", ("act",)),
+    (r"pretend\s+you\s+are", ("pretend",)),
+    (r"from\s+now\s+on\s+you\s+(will|must|should|are)", ("from",)),
+    (r"<\s*system\s*>", ("system",)),
+    (r"\[INST\]", ("inst",)),
+    (r"\[/INST\]", ("inst",)),
+    (r"BEGIN\s+SYSTEM\s+MESSAGE", ("system",)),
 ]
 
-# --- Tier 1: Zero-width character codepoints ---
+# --- Tier 1: Invisible Unicode (tables live in cerbero_core.py) ---
 
-ZERO_WIDTH_CHARS = {
-    0x200B: "ZERO WIDTH SPACE",
-    0x200C: "ZERO WIDTH NON-JOINER",
-    0x200D: "ZERO WIDTH JOINER",
-    0xFEFF: "BYTE ORDER MARK / ZERO WIDTH NO-BREAK SPACE",
-    0x00AD: "SOFT HYPHEN",
-    0x2060: "WORD JOINER",
-    0x180E: "MONGOLIAN VOWEL SEPARATOR",
-}
-
-# Tag characters (U+E0000-U+E007F) — 100% ASR for smuggling (Rehberger 2024).
-# 3+ consecutive = suspicious. Full block includes U+E0001 (LANGUAGE TAG).
-# Used in emoji tag sequences but exploited for instruction smuggling
-# in MCP tool descriptions (confirmed: Claude, Copilot, Cursor).
-TAG_CHAR_PATTERN = re.compile(r"[\U000E0000-\U000E007F]{3,}")
-
-# Bidi override characters — make text render in misleading order during review.
-BIDI_OVERRIDE_PATTERN = re.compile(
-    r"[\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069]"
-)
-
-# Variation Selectors — VS1-16 (U+FE00-FE0F) + VS17-256 (U+E0100-E01EF).
-# Glassworm campaign (Mar 2026, 400+ repos) used VS for binary encoding.
-# 2+ consecutive = suspicious (1 VS after base char is legitimate emoji modifier).
-VS_PATTERN = re.compile(r"[\uFE00-\uFE0F\U000E0100-\U000E01EF]{2,}")
-
-# Sneaky Bits — U+2062 (invisible times) / U+2064 (invisible plus).
-# Binary encoding technique (Rehberger, Mar 2025). 3+ consecutive = suspicious.
-SNEAKY_BITS_PATTERN = re.compile(r"[\u2062\u2064]{3,}")
-
-# Cyrillic/Greek→Latin confusables for normalization before injection scan.
-# Synced from validate-prompt.py.
-CONFUSABLES = str.maketrans({
-    "\u0430": "a", "\u0435": "e", "\u043e": "o", "\u0440": "p",
-    "\u0441": "c", "\u0443": "y", "\u0445": "x", "\u04bb": "h",
-    "\u0456": "i", "\u0458": "j", "\u043a": "k", "\u043c": "m",
-    "\u043d": "n", "\u0442": "t", "\u0432": "v", "\u0437": "z",
-    "\u0410": "A", "\u0415": "E", "\u041e": "O", "\u0420": "P",
-    "\u0421": "C", "\u0423": "Y", "\u0425": "X", "\u0406": "I",
-    "\u041a": "K", "\u041c": "M", "\u041d": "N", "\u0422": "T",
-    "\u0412": "V",
-    "\u03B1": "a", "\u03BF": "o", "\u03B5": "e", "\u03B9": "i",
-    "\u03C1": "p",
-    "\u0391": "A", "\u0392": "B", "\u0395": "E", "\u0397": "H",
-    "\u0399": "I", "\u039A": "K", "\u039C": "M", "\u039D": "N",
-    "\u039F": "O", "\u03A1": "P", "\u03A4": "T", "\u03A5": "Y",
-    "\u03A7": "X",
-})
+# Zero-width codepoint → name, reported one finding per character
+ZERO_WIDTH_CHARS = cerbero_core.ZERO_WIDTH_NAMES
 
 # --- Tier 1: CSS hiding patterns ---
 
@@ -145,362 +101,718 @@ MODEL_REFERENCES = [
 
 # --- Tier 2: Data acquisition patterns ---
 
+# Gaps are tempered dots that stop at the next occurrence of the part before
+# them, never a bare .*: with .* every repeat of that part rescans the rest of
+# the line, quadratic on "curl curl curl ..." (ReDoS). A line still matches
+# whenever .* matched it; the match starts at the last repeat instead. SELECT
+# lets "SELECT FROM" through its gap: that repeat cannot start a match itself.
 DATA_ACQUISITION_PATTERNS = [
-    (r"curl\s+.*-o\s", "download", "curl -o download"),
-    (r"curl\s+.*--output\s", "download", "curl --output download"),
-    (r"wget\s+.*-O\s", "download", "wget -O download"),
-    (r"wget\s+.*--output-document", "download", "wget --output-document download"),
-    (r"Invoke-WebRequest\s+.*-OutFile", "download", "Invoke-WebRequest -OutFile download"),
+    (r"curl\s(?:(?!curl\s).)*?-o\s", "download", "curl -o download"),
+    (r"curl\s(?:(?!curl\s).)*?--output\s", "download", "curl --output download"),
+    (r"wget\s(?:(?!wget\s).)*?-O\s", "download", "wget -O download"),
+    (r"wget\s(?:(?!wget\s).)*?--output-document", "download", "wget --output-document download"),
+    (
+        r"Invoke-WebRequest\s(?:(?!Invoke-WebRequest\s).)*?-OutFile",
+        "download", "Invoke-WebRequest -OutFile download",
+    ),
     (r"mongodb://", "db_connection", "MongoDB connection string"),
     (r"postgres://", "db_connection", "PostgreSQL connection string"),
     (r"mysql://", "db_connection", "MySQL connection string"),
     (r"jdbc:", "db_connection", "JDBC connection string"),
-    (r"SELECT\s+.*\s+FROM\s+", "sql", "SQL SELECT query"),
+    (r"SELECT\s(?:(?!SELECT\s(?!FROM\s)).)*?\sFROM\s", "sql", "SQL SELECT query"),
     (r"INSERT\s+INTO\s+", "sql", "SQL INSERT query"),
     (r"DROP\s+TABLE", "sql", "SQL DROP TABLE"),
 ]
 
+# --- Compiled line-rule engine ---
+# Per-line rules are compiled once at import and rewritten so they cannot
+# match across a line break. Each rule then runs over the whole text in one
+# finditer() pass (sre's literal-prefix search skips clean regions) instead of
+# once per line, and hits are mapped back to str.splitlines() line numbers.
+# Case-insensitive rules run against a case-folded copy of the text built once
+# per scan: sre only applies its fast literal search to case-sensitive patterns.
+# A single alternation of all rules was measured slower than this under
+# CPython (sre retries every branch at every position) and would also drop
+# overlapping hits from different rules on the same line.
+
+# Line boundaries as defined by str.splitlines().
+_LINE_BREAK_CHARS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_LINE_BREAK = re.compile(r"\r\n|[\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+_SPACE_NO_BREAK = r"[^\S\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]"
+_ANY_NO_BREAK = r"[^\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]"
+_END_OF_LINE = r"(?=[\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]|\Z)"
+
+# re.IGNORECASE equates A-Z plus these four characters with ASCII letters.
+# Folding them one-to-one keeps string length, so match offsets are shared.
+_CASE_FOLD_MAP = {chr(cp): chr(cp + 32) for cp in range(0x41, 0x5B)}
+_CASE_FOLD_MAP.update({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+_CASE_FOLD = str.maketrans(_CASE_FOLD_MAP)
+
+
+def _confine_to_line(pattern):
+    """Rewrite a per-line pattern so it cannot match across a line break.
+
+    \\s and . outside character classes lose the line-break characters, and
+    $ becomes an end-of-line lookahead.
+    """
+    out = []
+    i = 0
+    in_class = False
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            token = pattern[i:i + 2]
+            i += 2
+            if token == r"\s" and not in_class:
+                token = _SPACE_NO_BREAK
+            out.append(token)
+            continue
+        i += 1
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == ".":
+            ch = _ANY_NO_BREAK
+        elif ch == "$":
+            ch = _END_OF_LINE
+        out.append(ch)
+    return "".join(out)
+
+
+def _fold_pattern(pattern):
+    """Lowercase the ASCII letters of a pattern, leaving escapes untouched."""
+    return re.sub(
+        r"\\.|[A-Z]",
+        lambda m: m.group() if len(m.group()) > 1 else m.group().lower(),
+        pattern,
+    )
+
+
+def _compile_line_rule(pattern, ignorecase=True):
+    """Compile a per-line rule for whole-text scanning. Returns (regex, folded)."""
+    source = _confine_to_line(pattern)
+    if ignorecase:
+        source = _fold_pattern(source)
+    return re.compile(source), ignorecase
+
+
+_SUPPRESS_RULES = [_compile_line_rule(_SUPPRESS_ANNOTATION.pattern, ignorecase=False)]
+_INJECTION_RULES = [_compile_line_rule(p) for p, _ in INJECTION_PATTERNS]
+_INJECTION_PREFILTER = cerbero_core.compile_prefilter([anchors for _, anchors in INJECTION_PATTERNS])
+_BASE64_RULES = [_compile_line_rule(r"[A-Za-z0-9+/]{20,}={0,2}", ignorecase=False)]
+_ZERO_WIDTH_RULES = [(re.compile("[" + "".join(chr(cp) for cp in ZERO_WIDTH_CHARS) + "]"), False)]
+_BIDI_RULES = [(cerbero_core.BIDI_OVERRIDE_PATTERN, False)]
+_CSS_HIDING_RULES = [_compile_line_rule(p) for p, _ in CSS_HIDING_PATTERNS]
+_ENCODING_RULES = [_compile_line_rule(p, ignorecase=False) for p, _ in ENCODING_PATTERNS]
+_TOOL_SCHEMA_RULES = [_compile_line_rule(p) for p in IMPERATIVE_WORDS + MODEL_REFERENCES]
+_DATA_ACQUISITION_RULES = [_compile_line_rule(p) for p, _, _ in DATA_ACQUISITION_PATTERNS]
+
+# Base64 decode budget for one scan (or one whole stream): encoded characters
+# decoded, plus cerbero_core.BASE64_CANDIDATE_COST per distinct candidate.
+# Repeats cost nothing. Past it the report carries a "base64_budget" section
+# instead of decoding further.
+SCAN_BASE64_BUDGET_BYTES = 32 << 20
+
+_LONG_DESCRIPTION = re.compile(r'"description"\s*:\s*"([^"]*)"')
+
+
+def _scan_context(text, origin=(0, 0, 0)):
+    """Per-scan state shared by all checks: text, folded copy, line index.
+
+    origin is (lines, columns, bytes) already consumed before `text` when it
+    is one window of a larger stream; columns only apply to its first line.
+    """
+    return {
+        "text": text, "folded": None, "origin": origin,
+        "line_starts": None, "line_bytes": None, "byte_cursor": (-1, 0),
+        "finding_limit": None, "owned_bytes": None, "overflow": {},
+        "b64_budget": None, "profile": None, "stats": None,
+        "owned_chars": None, "line_head": None, "raw_injection_lines": None,
+    }
+
+
+def _sub_context(ctx, text):
+    """Context for a nested scan (decoded payload, comment body) charged to the same check."""
+    sub = _scan_context(text)
+    sub["stats"] = ctx["stats"]
+    return sub
+
+
+def _base64_budget(ctx):
+    if ctx["b64_budget"] is None:
+        ctx["b64_budget"] = cerbero_core.base64_budget(SCAN_BASE64_BUDGET_BYTES)
+    return ctx["b64_budget"]
+
+
+def _budget_report(budget):
+    """Report section for a spent base64 budget, or None if it held."""
+    if budget is None or not budget["exhausted"]:
+        return None
+    return {
+        "skipped_candidates": budget["skipped"],
+        "decoded_bytes": budget["max_bytes"] - budget["bytes_left"],
+    }
+
+
+# --- Profiling (--profile) ---
+
+
+def _new_stats():
+    return {
+        "wall_ms": 0.0, "lines_visited": 0, "regex_evals": 0, "rules_skipped": 0,
+        "matches": 0, "bytes_decoded": 0,
+    }
+
+
+def _new_profile():
+    return {"checks": {}, "normalization": {"wall_ms": 0.0, "chars": 0}, "normalized_rescan": _new_stats()}
+
+
+def _tally(ctx, regex_evals=0, matches=0, lines=0, bytes_decoded=0, rules_skipped=0):
+    """Add to the profiling counters of the check in progress (no-op unless profiling).
+
+    lines is the line count of a text the check passed over, counted once per
+    text however many rules ran over it.
+    """
+    stats = ctx["stats"]
+    if stats is None:
+        return
+    stats["regex_evals"] += regex_evals
+    stats["matches"] += matches
+    stats["lines_visited"] += lines
+    stats["bytes_decoded"] += bytes_decoded
+    stats["rules_skipped"] += rules_skipped
+
+
+def _run_check(check, text, ctx, stats=None):
+    """Call one scan_* check, timing it into ctx["profile"] (or stats) when profiling."""
+    profile = ctx["profile"]
+    if profile is None:
+        return check(text, ctx=ctx)
+    if stats is None:
+        stats = profile["checks"].setdefault(check.__name__, _new_stats())
+    ctx["stats"] = stats
+    start = time.perf_counter()
+    try:
+        return check(text, ctx=ctx)
+    finally:
+        stats["wall_ms"] += (time.perf_counter() - start) * 1000
+        ctx["stats"] = None
+
+
+def _timings_report(profile, total_seconds):
+    """The report's "timings" section, wall times rounded to microseconds."""
+    def rounded(stats):
+        return {**stats, "wall_ms": round(stats["wall_ms"], 3)}
+
+    return {
+        "total_ms": round(total_seconds * 1000, 3),
+        "checks": {name: rounded(stats) for name, stats in profile["checks"].items()},
+        "normalization": rounded(profile["normalization"]),
+        "normalized_rescan": rounded(profile["normalized_rescan"]),
+    }
+
+
+def _sum_timings(sections, total_seconds):
+    """Add up per-file "timings" sections into one (batch mode)."""
+    def add(into, stats):
+        for key, value in stats.items():
+            into[key] = into.get(key, 0) + value
+
+    checks, normalization, rescan = {}, {}, {}
+    for section in sections:
+        for name, stats in section["checks"].items():
+            add(checks.setdefault(name, {}), stats)
+        add(normalization, section["normalization"])
+        add(rescan, section["normalized_rescan"])
+    for stats in [normalization, rescan] + list(checks.values()):
+        if "wall_ms" in stats:
+            stats["wall_ms"] = round(stats["wall_ms"], 3)
+    return {
+        "total_ms": round(total_seconds * 1000, 3),
+        "checks": checks, "normalization": normalization, "normalized_rescan": rescan,
+    }
+
+
+def _folded_text(ctx):
+    if ctx["folded"] is None:
+        text = ctx["text"]
+        # str.lower() is much faster than translate() and matches the same
+        # rules (patterns only hold ASCII letters), except that U+0130
+        # expands to two chars and U+0131/U+017F are left unfolded.
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = text.translate(_CASE_FOLD)
+        elif not text.isascii():
+            folded = folded.replace("\u0131", "i").replace("\u017f", "s")
+        ctx["folded"] = folded
+    return ctx["folded"]
+
+
+def _line_starts(ctx):
+    if ctx["line_starts"] is None:
+        ctx["line_starts"] = [0] + [m.end() for m in _LINE_BREAK.finditer(ctx["text"])]
+    return ctx["line_starts"]
+
+
+def _location(ctx, pos, line_no=None):
+    """Locate a text offset: 1-based line and column, 0-based UTF-8 byte offset.
+
+    Line lookup is a bisect over the line-start table built once per scan,
+    instead of re-counting newlines in the prefix for every finding.
+    """
+    starts = _line_starts(ctx)
+    if line_no is None:
+        line_no = bisect_right(starts, pos)
+    line_start = starts[line_no - 1]
+    text = ctx["text"]
+    if text.isascii():
+        byte_offset = pos
+    else:
+        if ctx["line_bytes"] is None:
+            line_bytes = [0]
+            for i in range(1, len(starts)):
+                segment = text[starts[i - 1]:starts[i]]
+                line_bytes.append(line_bytes[-1] + len(segment.encode("utf-8", "surrogatepass")))
+            ctx["line_bytes"] = line_bytes
+        # Findings arrive in ascending order within a check, so resume from the
+        # previous lookup when it sits earlier on the same line (long
+        # minified lines would otherwise re-encode their prefix per match).
+        base_pos, base_byte = ctx["byte_cursor"]
+        if not line_start <= base_pos <= pos:
+            base_pos, base_byte = line_start, ctx["line_bytes"][line_no - 1]
+        byte_offset = base_byte + len(text[base_pos:pos].encode("utf-8", "surrogatepass"))
+        ctx["byte_cursor"] = (pos, byte_offset)
+    line_offset, column_offset, byte_origin = ctx["origin"]
+    column = pos - line_start + 1 + (column_offset if line_no == 1 else 0)
+    return {"line": line_no + line_offset, "column": column, "byte_offset": byte_origin + byte_offset}
+
+
+def _line_text(ctx, line_no):
+    """Return line `line_no` (1-based) without its terminator."""
+    starts = _line_starts(ctx)
+    end = starts[line_no] if line_no < len(starts) else len(ctx["text"])
+    return ctx["text"][starts[line_no - 1]:end].rstrip(_LINE_BREAK_CHARS)
+
+
+# Longest line-start context a finding carries
+_CONTEXT_CHARS = 80
+
+
+def _line_context(ctx, line_no, width):
+    """Context string: the stripped start of line `line_no`, at most width chars.
+
+    In a stream window starting mid-line, ctx["line_head"] holds the start of
+    that line from earlier windows, so the context is the one run_scan gives.
+    """
+    line = _line_text(ctx, line_no)
+    if line_no == 1 and ctx["line_head"] is not None:
+        line = ctx["line_head"] + line
+    return line.strip()[:width]
+
+
+def _add_finding(ctx, findings, finding):
+    """Append a finding, or only count it once the scan's per-check limit is hit.
+
+    Streaming sets finding_limit so a window full of matches cannot hold them
+    all in memory; counted findings outside owned_bytes belong to a
+    neighbouring window and are left for it.
+    """
+    limit = ctx["finding_limit"]
+    if limit is None or len(findings) < limit:
+        findings.append(finding)
+        return
+    low, high = ctx["owned_bytes"]
+    if low <= finding.get("byte_offset", low) < high:
+        key = (finding["check"], finding["severity"], bool(finding.get("contains_injection")))
+        ctx["overflow"][key] = ctx["overflow"].get(key, 0) + 1
+
+
+def _rule_hits(ctx, rules, first_per_line=True, prefilter=None):
+    """Run each rule over the whole text once.
+
+    Returns (line_no, rule_index, start, end) tuples sorted the way the
+    per-line loops reported them: by line, then rule order, then position.
+    With first_per_line, only the first match of a rule on a line is kept
+    (re.search semantics); otherwise every match is (re.finditer semantics).
+    A prefilter (cerbero_core.compile_prefilter, folded rules only) skips
+    rules whose anchors do not occur in the folded text.
+    """
+    starts = _line_starts(ctx)
+    hits = []
+    indexes = range(len(rules))
+    if prefilter is not None:
+        indexes = cerbero_core.prefilter_rules(prefilter, _folded_text(ctx))
+    matches = 0
+    for index in indexes:
+        regex, folded = rules[index]
+        haystack = _folded_text(ctx) if folded else ctx["text"]
+        last_line = 0
+        for match in regex.finditer(haystack):
+            matches += 1
+            line_no = bisect_right(starts, match.start())
+            if first_per_line and line_no == last_line:
+                continue
+            last_line = line_no
+            hits.append((line_no, index, match.start(), match.end()))
+    _tally(ctx, len(indexes), matches, len(starts), rules_skipped=len(rules) - len(indexes))
+    hits.sort()
+    return hits
+
+
+def _delimited(text, opener, closer):
+    """(start, end) of each opener...closer span, shortest first, left to right.
+
+    What re.finditer(opener + r"[\\s\\S]*?" + closer) finds, with str.find():
+    that regex rescans to the end of the text from every unclosed opener,
+    quadratic on "<!--<!--<!--..." (ReDoS). Here the first unclosed one ends it.
+    """
+    pos = 0
+    while True:
+        start = text.find(opener, pos)
+        if start < 0:
+            return
+        end = text.find(closer, start + len(opener))
+        if end < 0:
+            return
+        pos = end + len(closer)
+        yield start, pos
+
+
+def _replace_delimited(text, opener, closer, repl):
+    """re.sub(opener + r"[\\s\\S]*?" + closer, repl, text), linear (see _delimited)."""
+    parts = []
+    pos = 0
+    for start, end in _delimited(text, opener, closer):
+        parts.append(text[pos:start])
+        parts.append(repl)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
 # --- Scanner functions ---
 
 
-def scan_injection_phrases(text):
+def scan_suppression_annotations(text, ctx=None):
+    """Flag suppression annotations as scanner evasion attempts."""
+    ctx = ctx or _scan_context(text)
+    findings = []
+    for line_no, _, start, _ in _rule_hits(ctx, _SUPPRESS_RULES):
+        _add_finding(ctx, findings, {
+            "check": "suppression_attempt",
+            "severity": "CRITICAL",
+            "detail": "Scanner evasion: suppression annotation in scanned content",
+            **_location(ctx, start, line_no),
+            "context": _line_context(ctx, line_no, 80),
+        })
+    return findings
+
+
+def scan_injection_phrases(text, ctx=None):
     """Tier 1: Detect direct prompt injection phrases."""
+    ctx = ctx or _scan_context(text)
+    starts = _line_starts(ctx)
     findings = []
-    for i, line in enumerate(text.splitlines(), 1):
-        for pattern in INJECTION_PATTERNS:
-            match = re.search(pattern, line, re.IGNORECASE)
-            if match:
-                start = max(0, match.start() - 25)
-                end = min(len(line), match.end() + 25)
-                findings.append({
-                    "check": "injection_phrase",
-                    "severity": "CRITICAL",
-                    "detail": f"Pattern: {pattern}",
-                    "line": i,
-                    "context": line[start:end],
-                })
+    for line_no, index, start, end in _rule_hits(ctx, _INJECTION_RULES, prefilter=_INJECTION_PREFILTER):
+        line = _line_text(ctx, line_no)
+        offset = starts[line_no - 1]
+        _add_finding(ctx, findings, {
+            "check": "injection_phrase",
+            "severity": "CRITICAL",
+            "detail": f"Pattern: {INJECTION_PATTERNS[index][0]}",
+            **_location(ctx, start, line_no),
+            "context": line[max(0, start - offset - 25):min(len(line), end - offset + 25)],
+        })
     return findings
 
 
-def scan_base64_payloads(text, max_depth=3):
+def scan_base64_payloads(text, max_depth=3, ctx=None):
     """Tier 1: Detect base64-encoded payloads and recursively decode."""
+    ctx = ctx or _scan_context(text)
+    budget = _base64_budget(ctx)
+    bytes_left = budget["bytes_left"]
+    injected = {}  # Decoded text -> contains injection, so repeated blobs are rescanned once
     findings = []
-    b64_pattern = re.compile(r"[A-Za-z0-9+/]{20,}={0,2}")
-
-    for i, line in enumerate(text.splitlines(), 1):
-        for match in b64_pattern.finditer(line):
-            encoded = match.group()
-            decoded_chain = _recursive_decode(encoded, max_depth)
-            if decoded_chain is None:
-                continue
+    for line_no, _, start, end in _rule_hits(ctx, _BASE64_RULES, first_per_line=False):
+        encoded = text[start:end]
+        decoded_chain = _recursive_decode(encoded, max_depth, budget)
+        if decoded_chain is None:
+            continue
 
-            decoded_text = decoded_chain[-1]
-            injection_findings = scan_injection_phrases(decoded_text)
-
-            findings.append({
-                "check": "base64_payload",
-                "severity": "CRITICAL" if injection_findings else "HIGH",
-                "detail": f"Encoded: {encoded[:40]}...",
-                "line": i,
-                "context": decoded_text[:100],
-                "recursive_depth": len(decoded_chain),
-                "contains_injection": bool(injection_findings),
-            })
+        decoded_text = decoded_chain[-1]
+        injection_findings = injected.get(decoded_text)
+        if injection_findings is None:
+            injection_findings = injected[decoded_text] = bool(
+                scan_injection_phrases(decoded_text, _sub_context(ctx, decoded_text))
+            )
+
+        _add_finding(ctx, findings, {
+            "check": "base64_payload",
+            "severity": "CRITICAL" if injection_findings else "HIGH",
+            "detail": f"Encoded: {encoded[:40]}...",
+            **_location(ctx, start, line_no),
+            "context": decoded_text[:100],
+            "recursive_depth": len(decoded_chain),
+            "contains_injection": bool(injection_findings),
+        })
+    _tally(ctx, bytes_decoded=bytes_left - budget["bytes_left"])
     return findings
 
 
-def _recursive_decode(text, depth):
-    """Attempt recursive base64 decoding up to max depth."""
+def _recursive_decode(text, depth, budget):
+    """Attempt recursive base64 decoding up to max depth (repeats hit the budget's cache)."""
     if depth <= 0:
         return None
-    try:
-        decoded = base64.b64decode(text).decode("utf-8", errors="strict")
-    except Exception:
+    decoded = cerbero_core.decode_base64(text, budget, strict=True)
+    if decoded is None:
         return None
 
     if not decoded.isprintable() and not any(c in decoded for c in "\n\r\t"):
         return None
 
-    deeper = _recursive_decode(decoded.strip(), depth - 1)
+    deeper = _recursive_decode(decoded.strip(), depth - 1, budget)
     if deeper is not None:
         return [decoded] + deeper
     return [decoded]
 
 
-def scan_zero_width_chars(text):
+def scan_zero_width_chars(text, ctx=None):
     """Tier 1: Detect invisible zero-width Unicode characters."""
+    ctx = ctx or _scan_context(text)
     findings = []
-    for i, line in enumerate(text.splitlines(), 1):
-        for pos, char in enumerate(line):
-            cp = ord(char)
-            if cp in ZERO_WIDTH_CHARS:
-                findings.append({
-                    "check": "zero_width_char",
-                    "severity": "HIGH",
-                    "detail": f"U+{cp:04X} ({ZERO_WIDTH_CHARS[cp]})",
-                    "line": i,
-                    "context": f"position {pos}",
-                })
+    for line_no, _, start, _ in _rule_hits(ctx, _ZERO_WIDTH_RULES, first_per_line=False):
+        cp = ord(text[start])
+        location = _location(ctx, start, line_no)
+        _add_finding(ctx, findings, {
+            "check": "zero_width_char",
+            "severity": "HIGH",
+            "detail": f"U+{cp:04X} ({ZERO_WIDTH_CHARS[cp]})",
+            **location,
+            "context": f"position {location['column'] - 1}",
+        })
     return findings
 
 
-def scan_tag_characters(text):
+def scan_tag_characters(text, ctx=None):
     """Tier 1: Detect Unicode tag character sequences (C-SEC-003).
 
     Tag chars (U+E0000-E007F) have 100% ASR for instruction smuggling
     (Rehberger 2024, confirmed against Claude, Copilot, Cursor).
     """
+    ctx = ctx or _scan_context(text)
     findings = []
-    for match in TAG_CHAR_PATTERN.finditer(text):
-        line_num = text[:match.start()].count("\n") + 1
-        length = len(match.group())
-        # Attempt decode: tag chars map to ASCII (U+E0041 = 'A')
-        decoded = "".join(chr(ord(c) - 0xE0000) for c in match.group()
-                         if 0xE0000 <= ord(c) <= 0xE007F)
-        findings.append({
+    hits = decoded_chars = 0
+    for hit in cerbero_core.iter_detect(text, ("TAG_SMUGGLING",)):
+        length = len(hit["match"])
+        decoded = cerbero_core.decode_tag_characters(hit["match"])
+        hits += 1
+        decoded_chars += len(decoded)
+        _add_finding(ctx, findings, {
             "check": "tag_character_smuggling",
             "severity": "CRITICAL",
             "detail": f"{length} tag chars" + (f", decoded: '{decoded[:80]}'" if decoded.strip() else ""),
-            "line": line_num,
+            **_location(ctx, hit["start"]),
             "context": decoded[:80] if decoded.strip() else f"[{length} invisible chars]",
         })
+    _tally(ctx, 1, hits, len(_line_starts(ctx)), decoded_chars)
     return findings
 
 
-def scan_bidi_overrides(text):
+def scan_bidi_overrides(text, ctx=None):
     """Tier 1: Detect bidirectional override characters (C-SEC-004)."""
+    ctx = ctx or _scan_context(text)
     findings = []
-    bidi_names = {
-        0x202A: "LRE", 0x202B: "RLE", 0x202C: "PDF", 0x202D: "LRO", 0x202E: "RLO",
-        0x2066: "LRI", 0x2067: "RLI", 0x2068: "FSI", 0x2069: "PDI",
-    }
-    for i, line in enumerate(text.splitlines(), 1):
-        for pos, char in enumerate(line):
-            cp = ord(char)
-            if cp in bidi_names:
-                findings.append({
-                    "check": "bidi_override",
-                    "severity": "HIGH",
-                    "detail": f"U+{cp:04X} ({bidi_names[cp]})",
-                    "line": i,
-                    "context": f"position {pos}",
-                })
+    for line_no, _, start, _ in _rule_hits(ctx, _BIDI_RULES, first_per_line=False):
+        cp = ord(text[start])
+        location = _location(ctx, start, line_no)
+        _add_finding(ctx, findings, {
+            "check": "bidi_override",
+            "severity": "HIGH",
+            "detail": f"U+{cp:04X} ({cerbero_core.BIDI_NAMES[cp]})",
+            **location,
+            "context": f"position {location['column'] - 1}",
+        })
     return findings
 
 
-def _decode_variation_selectors(text):
-    """Decode Glassworm-style Variation Selector encoding.
-
-    Algorithm: VS1-16 (U+FE00-FE0F) → byte 0x00-0x0F
-               VS17-256 (U+E0100-E01EF) → byte 0x10-0xFF
-    Returns decoded bytes as string, or empty string if decode fails.
-    """
-    raw_bytes = []
-    for char in text:
-        cp = ord(char)
-        if 0xFE00 <= cp <= 0xFE0F:
-            raw_bytes.append(cp - 0xFE00)
-        elif 0xE0100 <= cp <= 0xE01EF:
-            raw_bytes.append(cp - 0xE0100 + 16)
-    if not raw_bytes:
-        return ""
-    try:
-        return bytes(raw_bytes).decode("utf-8", errors="replace")
-    except Exception:
-        return ""
-
-
-def scan_variation_selectors(text):
+def scan_variation_selectors(text, ctx=None):
     """Tier 1: Detect Variation Selector clusters + Glassworm decode (C-SEC-003, S-SEC-013).
 
     Glassworm campaign (Mar 2026, 400+ repos): VS codepoints encode arbitrary bytes.
     """
+    ctx = ctx or _scan_context(text)
     findings = []
-    for match in VS_PATTERN.finditer(text):
-        line_num = text[:match.start()].count("\n") + 1
-        length = len(match.group())
-        decoded = _decode_variation_selectors(match.group())
+    hits = decoded_chars = 0
+    for hit in cerbero_core.iter_detect(text, ("VARIATION_SELECTOR",)):
+        length = len(hit["match"])
+        decoded = cerbero_core.decode_variation_selectors(hit["match"])
+        hits += 1
+        decoded_chars += len(decoded)
         detail = f"{length} variation selectors"
         if decoded.strip() and decoded.isprintable():
             detail += f", Glassworm decode: '{decoded[:80]}'"
             # Rescan decoded content for injection phrases
-            injection_hits = scan_injection_phrases(decoded)
+            injection_hits = scan_injection_phrases(decoded, _sub_context(ctx, decoded))
             if injection_hits:
                 detail += " [CONTAINS INJECTION]"
-        findings.append({
+        _add_finding(ctx, findings, {
             "check": "variation_selector_encoding",
             "severity": "CRITICAL",
             "detail": detail,
-            "line": line_num,
+            **_location(ctx, hit["start"]),
             "context": decoded[:80] if decoded.strip() else f"[{length} VS chars]",
-            "contains_injection": bool(decoded.strip() and scan_injection_phrases(decoded)),
+            "contains_injection": bool(
+                decoded.strip() and scan_injection_phrases(decoded, _sub_context(ctx, decoded))
+            ),
         })
+    _tally(ctx, 1, hits, len(_line_starts(ctx)), decoded_chars)
     return findings
 
 
-def scan_sneaky_bits(text):
+def scan_sneaky_bits(text, ctx=None):
     """Tier 1: Detect Sneaky Bits binary encoding (C-SEC-003).
 
     U+2062 (invisible times) / U+2064 (invisible plus) used as 0/1 bits.
     Technique demonstrated by Rehberger (Mar 2025).
     """
+    ctx = ctx or _scan_context(text)
     findings = []
-    for match in SNEAKY_BITS_PATTERN.finditer(text):
-        line_num = text[:match.start()].count("\n") + 1
-        length = len(match.group())
+    hits = decoded_chars = 0
+    for hit in cerbero_core.iter_detect(text, ("SNEAKY_BITS",)):
+        length = len(hit["match"])
         # Attempt binary decode: U+2062=0, U+2064=1
-        bits = "".join("0" if ord(c) == 0x2062 else "1" for c in match.group())
-        decoded = ""
-        if len(bits) >= 8:
-            try:
-                decoded = "".join(chr(int(bits[i:i+8], 2))
-                                  for i in range(0, len(bits) - 7, 8)
-                                  if int(bits[i:i+8], 2) > 0)
-            except (ValueError, OverflowError):
-                pass
+        decoded = cerbero_core.decode_sneaky_bits(hit["match"])
+        hits += 1
+        decoded_chars += len(decoded)
         detail = f"{length} sneaky bits chars"
         if decoded.strip() and decoded.isprintable():
             detail += f", decoded: '{decoded[:80]}'"
-        findings.append({
+        _add_finding(ctx, findings, {
             "check": "sneaky_bits_encoding",
             "severity": "HIGH",
             "detail": detail,
-            "line": line_num,
+            **_location(ctx, hit["start"]),
             "context": decoded[:80] if decoded.strip() else f"[{length} invisible chars]",
         })
+    _tally(ctx, 1, hits, len(_line_starts(ctx)), decoded_chars)
     return findings
 
 
-def _normalize_for_injection_scan(text):
-    """Normalize text for injection phrase detection (C-SEC-005).
-
-    Strips ZW chars, applies NFKC, translates confusables.
-    Used to catch obfuscated injection phrases.
-    """
-    # Strip all known invisible characters
-    zw_re = re.compile(
-        r"[\u200b\u200c\u200d\ufeff\u00ad\u2060\u180e"
-        r"\uFE00-\uFE0F\U000E0100-\U000E01EF"
-        r"\u2062\u2064"
-        r"\U000E0000-\U000E007F]"
-    )
-    cleaned = zw_re.sub("", text)
-    nfkc = unicodedata.normalize("NFKC", cleaned)
-    return nfkc.translate(CONFUSABLES)
-
-
-def scan_html_comments(text):
+def scan_html_comments(text, ctx=None):
     """Tier 1: Detect HTML comments containing instructions."""
+    ctx = ctx or _scan_context(text)
     findings = []
-    for match in re.finditer(r"<!--([\s\S]*?)-->", text):
-        comment = match.group(1)
-        start = text[:match.start()].count("\n") + 1
+    hits = 0
+    for start, end in _delimited(text, "<!--", "-->"):
+        comment = text[start + 4:end - 3]
+        hits += 1
 
-        injection_findings = scan_injection_phrases(comment)
+        injection_findings = scan_injection_phrases(comment, _sub_context(ctx, comment))
 
         preview = comment.strip()[:100]
-        findings.append({
+        _add_finding(ctx, findings, {
             "check": "html_comment",
             "severity": "CRITICAL" if injection_findings else "MEDIUM",
             "detail": f"Comment: {preview}",
-            "line": start,
+            **_location(ctx, start),
             "context": preview,
             "contains_injection": bool(injection_findings),
         })
+    _tally(ctx, 1, hits, len(_line_starts(ctx)))
     return findings
 
 
-def scan_css_hiding(text, file_path=""):
+def scan_css_hiding(text, file_path="", ctx=None):
     """Tier 1: Detect CSS techniques for hiding content.
     M-1: Skips actual stylesheets where these patterns are expected."""
     if file_path:
         ext = os.path.splitext(file_path)[1].lower()
         if ext in (".css", ".html", ".htm", ".scss", ".sass", ".less", ".svelte", ".vue"):
             return []
+    ctx = ctx or _scan_context(text)
     findings = []
-    for i, line in enumerate(text.splitlines(), 1):
-        for pattern, desc in CSS_HIDING_PATTERNS:
-            if re.search(pattern, line, re.IGNORECASE):
-                findings.append({
-                    "check": "css_hiding",
-                    "severity": "MEDIUM",
-                    "detail": desc,
-                    "line": i,
-                    "context": line.strip()[:50],
-                })
+    for line_no, index, start, _ in _rule_hits(ctx, _CSS_HIDING_RULES):
+        _add_finding(ctx, findings, {
+            "check": "css_hiding",
+            "severity": "MEDIUM",
+            "detail": CSS_HIDING_PATTERNS[index][1],
+            **_location(ctx, start, line_no),
+            "context": _line_context(ctx, line_no, 50),
+        })
     return findings
 
 
-def scan_encoding_red_flags(text):
+def scan_encoding_red_flags(text, ctx=None):
     """Tier 1: Detect suspicious encoding patterns."""
+    ctx = ctx or _scan_context(text)
     findings = []
-    for i, line in enumerate(text.splitlines(), 1):
-        for pattern, enc_type in ENCODING_PATTERNS:
-            for match in re.finditer(pattern, line):
-                findings.append({
-                    "check": "encoding_red_flag",
-                    "severity": "MEDIUM",
-                    "detail": f"{enc_type}: {match.group()}",
-                    "line": i,
-                    "context": line.strip()[:50],
-                })
+    for line_no, index, start, end in _rule_hits(ctx, _ENCODING_RULES, first_per_line=False):
+        _add_finding(ctx, findings, {
+            "check": "encoding_red_flag",
+            "severity": "MEDIUM",
+            "detail": f"{ENCODING_PATTERNS[index][1]}: {text[start:end]}",
+            **_location(ctx, start, line_no),
+            "context": _line_context(ctx, line_no, 50),
+        })
     return findings
 
 
-def scan_tool_schema_red_flags(text):
+def scan_tool_schema_red_flags(text, ctx=None):
     """Tier 2: Detect suspicious patterns in tool schemas/descriptions."""
+    ctx = ctx or _scan_context(text)
     findings = []
-    for i, line in enumerate(text.splitlines(), 1):
-        for pattern in IMPERATIVE_WORDS:
-            if re.search(pattern, line, re.IGNORECASE):
-                findings.append({
-                    "check": "tool_schema_imperative",
-                    "severity": "MEDIUM",
-                    "detail": f"Imperative word: {pattern}",
-                    "line": i,
-                    "context": line.strip()[:50],
-                })
-
-        for pattern in MODEL_REFERENCES:
-            if re.search(pattern, line, re.IGNORECASE):
-                findings.append({
-                    "check": "tool_schema_model_ref",
-                    "severity": "HIGH",
-                    "detail": f"Model reference: {pattern}",
-                    "line": i,
-                    "context": line.strip()[:50],
-                })
+    for line_no, index, start, _ in _rule_hits(ctx, _TOOL_SCHEMA_RULES):
+        if index < len(IMPERATIVE_WORDS):
+            _add_finding(ctx, findings, {
+                "check": "tool_schema_imperative",
+                "severity": "MEDIUM",
+                "detail": f"Imperative word: {IMPERATIVE_WORDS[index]}",
+                **_location(ctx, start, line_no),
+                "context": _line_context(ctx, line_no, 50),
+            })
+        else:
+            _add_finding(ctx, findings, {
+                "check": "tool_schema_model_ref",
+                "severity": "HIGH",
+                "detail": f"Model reference: {MODEL_REFERENCES[index - len(IMPERATIVE_WORDS)]}",
+                **_location(ctx, start, line_no),
+                "context": _line_context(ctx, line_no, 50),
+            })
 
     # Check for overly long descriptions (>500 chars per field)
-    for match in re.finditer(r'"description"\s*:\s*"([^"]*)"', text):
+    hits = 0
+    for match in _LONG_DESCRIPTION.finditer(text):
         desc = match.group(1)
+        hits += 1
         if len(desc) > 500:
-            line_num = text[:match.start()].count("\n") + 1
-            findings.append({
+            _add_finding(ctx, findings, {
                 "check": "tool_schema_long_desc",
                 "severity": "MEDIUM",
                 "detail": f"Description length: {len(desc)} chars (>500)",
-                "line": line_num,
+                **_location(ctx, match.start()),
                 "context": desc[:50] + "...",
             })
+    _tally(ctx, 1, hits)
 
     return findings
 
 
-def scan_data_acquisition(text):
+def scan_data_acquisition(text, ctx=None):
     """Tier 2: Detect download commands, DB connections, and SQL."""
+    ctx = ctx or _scan_context(text)
     findings = []
-    for i, line in enumerate(text.splitlines(), 1):
-        for pattern, acq_type, desc in DATA_ACQUISITION_PATTERNS:
-            if re.search(pattern, line, re.IGNORECASE):
-                findings.append({
-                    "check": "data_acquisition",
-                    "severity": "MEDIUM",
-                    "detail": desc,
-                    "line": i,
-                    "context": line.strip()[:50],
-                    "type": acq_type,
-                })
+    for line_no, index, start, _ in _rule_hits(ctx, _DATA_ACQUISITION_RULES):
+        _, acq_type, desc = DATA_ACQUISITION_PATTERNS[index]
+        _add_finding(ctx, findings, {
+            "check": "data_acquisition",
+            "severity": "MEDIUM",
+            "detail": desc,
+            **_location(ctx, start, line_no),
+            "context": _line_context(ctx, line_no, 50),
+            "type": acq_type,
+        })
     return findings
 
 
@@ -511,11 +823,11 @@ def strip_comments_and_strings(text):
     Removes: //, #, /* */, string literals, docstrings.
     """
     # Remove multi-line comments /* ... */
-    result = re.sub(r"/\*[\s\S]*?\*/", " ", text)
+    result = _replace_delimited(text, "/*", "*/", " ")
 
     # Remove docstrings (triple quotes)
-    result = re.sub(r'"""[\s\S]*?"""', ' ""', result)
-    result = re.sub(r"'''[\s\S]*?'''", " ''", result)
+    result = _replace_delimited(result, '"""', '"""', ' ""')
+    result = _replace_delimited(result, "'''", "'''", " ''")
 
     # Remove single-line string literals (preserve the quotes as markers)
     result = re.sub(r'"[^"\n]*"', '""', result)
@@ -539,6 +851,583 @@ def strip_comments_and_strings(text):
     return "\n".join(cleaned)
 
 
+# --- Scan cache ---
+
+# Reports are cached by content under <project>/.claude/security/scan-cache/
+# (only when the project has a .claude/ directory), or under --cache-dir.
+# --shared-cache uses one per-user directory for every project.
+SCAN_CACHE_DIRNAME = "scan-cache"
+
+# Least recently used entries are evicted past either limit.
+SCAN_CACHE_MAX_BYTES = 64 << 20
+SCAN_CACHE_MAX_ENTRIES = 10000
+
+
+def _ruleset_hash():
+    """Hash every rule and table that shapes a report, besides the input itself."""
+    tables = (
+        _SUPPRESS_RULES, _INJECTION_RULES, _BASE64_RULES, _ZERO_WIDTH_RULES, _BIDI_RULES,
+        _CSS_HIDING_RULES, _ENCODING_RULES, _TOOL_SCHEMA_RULES, _DATA_ACQUISITION_RULES,
+    )
+    material = [
+        [[regex.pattern, folded] for table in tables for regex, folded in table],
+        [[kind, p.pattern] for kind, p in cerbero_core.DETECTORS],
+        [p.pattern for p in (cerbero_core.INVISIBLE_CHARS, _LONG_DESCRIPTION)],
+        INJECTION_PATTERNS, CSS_HIDING_PATTERNS, ENCODING_PATTERNS,
+        IMPERATIVE_WORDS, MODEL_REFERENCES, DATA_ACQUISITION_PATTERNS,
+        sorted(ZERO_WIDTH_CHARS.items()), sorted(cerbero_core.BIDI_NAMES.items()),
+        sorted(cerbero_core.CONFUSABLES.items()),
+        [SCAN_BASE64_BUDGET_BYTES, cerbero_core.BASE64_CANDIDATE_COST],
+    ]
+    return hashlib.sha256(json.dumps(material).encode("ascii")).hexdigest()
+
+
+RULESET_HASH = _ruleset_hash()
+
+
+def _code_hash():
+    """Hash the detection code itself (this file and cerbero_core.py).
+
+    A fix to a detector changes reports without touching any rule table.
+    Unreadable sources hash as a per-process token, so nothing is served from
+    or shared through the cache rather than serving reports of unknown code.
+    """
+    digest = hashlib.sha256()
+    for path in (__file__, cerbero_core.__file__):
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except (OSError, TypeError):
+            return f"unreadable:{os.getpid()}:{time.time()}"
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+CODE_HASH = _code_hash()
+
+
+def default_cache_dir(shared=False):
+    """Project cache directory (None without a .claude/ dir), or the per-user one."""
+    if shared:
+        if os.name == "nt":
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "cerbero", SCAN_CACHE_DIRNAME)
+    project = os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    if not os.path.isdir(os.path.join(project, ".claude")):
+        return None
+    return os.path.join(project, ".claude", "security", SCAN_CACHE_DIRNAME)
+
+
+def _cache_key(digest, stream=False):
+    """Entry key: content digest + scanner version + rule set + detection code + scan mode."""
+    mode = "full"
+    if stream:
+        mode = (f"stream:{STREAM_WINDOW_CHARS}:{STREAM_OVERLAP_CHARS}:"
+                f"{STREAM_COMMENT_CARRY_CHARS}:{STREAM_MAX_FINDINGS_PER_CHECK}")
+    material = f"{digest}\0{SCANNER_VERSION}\0{RULESET_HASH}\0{CODE_HASH}\0{mode}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+
+def cache_load(cache_dir, key, target_name):
+    """Return the cached report for `key` re-targeted at target_name, or None."""
+    path = _cache_path(cache_dir, key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)  # mtime doubles as the LRU clock
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or "findings" not in entry or "summary" not in entry:
+        return None
+    report = _build_report(target_name, entry["findings"], entry["summary"])
+    for section in ("stream", "base64_budget"):
+        if section in entry:
+            report[section] = entry[section]
+    report["cached"] = True
+    return report
+
+
+def cache_store(cache_dir, key, report):
+    """Store a report (minus timestamp and target). Failures are ignored."""
+    entry = {k: v for k, v in report.items() if k in ("findings", "summary", "stream", "base64_budget")}
+    subdir = os.path.dirname(_cache_path(cache_dir, key))
+    try:
+        os.makedirs(subdir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=subdir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, _cache_path(cache_dir, key))
+    except OSError:
+        pass  # Fail open: the scan result is still returned
+
+
+def cache_evict(cache_dir, max_bytes=SCAN_CACHE_MAX_BYTES, max_entries=SCAN_CACHE_MAX_ENTRIES):
+    """Drop least recently used entries until the cache fits both limits."""
+    entries = []
+    try:
+        for dirpath, _, filenames in os.walk(cache_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    total = 0
+    for index, (_, size, path) in enumerate(entries):
+        total += size
+        if index >= max_entries or total > max_bytes:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _text_digest(text):
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_text_cached(text, target_name, cache_dir=None, profile=False):
+    """run_scan() through the cache; cache_dir None scans directly (profiled runs must)."""
+    if cache_dir is None:
+        return run_scan(text, target_name, profile)
+    key = _cache_key(_text_digest(text))
+    report = cache_load(cache_dir, key, target_name)
+    if report is None:
+        report = run_scan(text, target_name)
+        cache_store(cache_dir, key, report)
+    return report
+
+
+def stream_file_cached(path, cache_dir=None, profile=False):
+    """run_stream_scan() over a UTF-8 file through the cache."""
+    key = None
+    if cache_dir is not None:
+        # Decoding is strict UTF-8 without newline translation, so the file
+        # bytes are exactly the encoded text a full scan would hash.
+        key = _cache_key(_file_digest(path), stream=True)
+        report = cache_load(cache_dir, key, path)
+        if report is not None:
+            return report
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        report = run_stream_scan(f, path, profile)
+    if key is not None:
+        cache_store(cache_dir, key, report)
+    return report
+
+
+# --- Batch mode ---
+
+# Skipped without opening the file.
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".pdf",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".tar", ".jar", ".whl",
+    ".so", ".dll", ".dylib", ".exe", ".bin", ".o", ".a", ".node", ".wasm",
+    ".pyc", ".pyo", ".class", ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".mp3", ".mp4", ".wav", ".mov", ".avi", ".sqlite", ".db",
+}
+
+# Never descended into by --dir.
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__"}
+
+# A NUL byte in the first block marks the file as binary (same heuristic as git).
+BINARY_SNIFF_BYTES = 8192
+
+_VERDICT_RANK = {"CLEAN": 0, "SUSPICIOUS": 1, "REJECT": 2}
+
+
+def _parse_extensions(value):
+    """Parse '.py,md' into {'.py', '.md'}. Returns None for an empty value."""
+    if not value:
+        return None
+    exts = set()
+    for ext in value.split(","):
+        ext = ext.strip().lower()
+        if ext:
+            exts.add(ext if ext.startswith(".") else "." + ext)
+    return exts or None
+
+
+def collect_targets(root=None, pattern=None, include_ext=None, exclude_ext=None):
+    """List files for a batch scan, sorted. Returns (paths, skipped)."""
+    if pattern:
+        base = os.path.join(root, pattern) if root else pattern
+        candidates = [p for p in glob.glob(base, recursive=True) if os.path.isfile(p)]
+    else:
+        candidates = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            candidates.extend(os.path.join(dirpath, name) for name in filenames)
+
+    paths = []
+    skipped = []
+    for path in sorted(candidates):
+        ext = os.path.splitext(path)[1].lower()
+        if include_ext is not None and ext not in include_ext:
+            continue
+        if exclude_ext is not None and ext in exclude_ext:
+            continue
+        if ext in BINARY_EXTENSIONS:
+            skipped.append({"target": path, "reason": "binary extension"})
+            continue
+        paths.append(path)
+    return paths, skipped
+
+
+def _read_text_file(path):
+    """Read a file for scanning. Returns (text, skip_reason)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return None, f"unreadable ({e.strerror})"
+    if b"\0" in data[:BINARY_SNIFF_BYTES]:
+        return None, "binary content"
+    try:
+        return data.decode("utf-8"), None
+    except UnicodeDecodeError:
+        return None, "not UTF-8"
+
+
+def _stream_text_file(path, cache_dir=None, profile=False):
+    """Stream-scan a large file. Returns (report, skip_reason)."""
+    try:
+        with open(path, "rb") as f:
+            if b"\0" in f.read(BINARY_SNIFF_BYTES):
+                return None, "binary content"
+        return stream_file_cached(path, cache_dir, profile), None
+    except OSError as e:
+        return None, f"unreadable ({e.strerror})"
+    except UnicodeDecodeError:
+        return None, "not UTF-8"
+
+
+def _scan_batch_file(path, cache_dir=None, profile=False):
+    """Worker: scan one file. Returns (report, skip_entry); one of them is None."""
+    try:
+        large = os.path.getsize(path) > STREAM_AUTO_BYTES
+    except OSError:
+        large = False
+    if large:
+        report, reason = _stream_text_file(path, cache_dir, profile)
+        if report is None:
+            return None, {"target": path, "reason": reason}
+        del report["scanner_version"], report["timestamp"]
+        return report, None
+    text, reason = _read_text_file(path)
+    if text is None:
+        return None, {"target": path, "reason": reason}
+    report = scan_text_cached(text, path, cache_dir, profile)
+    del report["scanner_version"], report["timestamp"]
+    return report, None
+
+
+def run_batch(paths, skipped, target_name, jobs=1, cache_dir=None, profile=False):
+    """Scan many files (optionally in a process pool) into one aggregate report.
+
+    With profile, every file report carries "timings" and the aggregate sums
+    them per check (wall times are per worker, so they exceed elapsed time
+    with --jobs).
+    """
+    start = time.perf_counter()
+    scan = partial(_scan_batch_file, cache_dir=cache_dir, profile=profile)
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(scan, paths, chunksize=8))
+    else:
+        results = [scan(path) for path in paths]
+
+    files = []
+    skipped = list(skipped)
+    for report, skip in results:
+        if skip is not None:
+            skipped.append(skip)
+        else:
+            files.append(report)
+    skipped.sort(key=lambda s: s["target"])
+
+    verdicts = {"CLEAN": 0, "SUSPICIOUS": 0, "REJECT": 0}
+    for report in files:
+        verdicts[report["summary"]["verdict"]] += 1
+    verdict = max(
+        (r["summary"]["verdict"] for r in files), key=_VERDICT_RANK.get, default="CLEAN"
+    )
+
+    report = {
+        "scanner_version": SCANNER_VERSION,
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "target": target_name,
+        "files": files,
+        "skipped": skipped,
+        "summary": {
+            "files_scanned": len(files),
+            "files_skipped": len(skipped),
+            "files_cached": sum(1 for r in files if r.get("cached")),
+            "total_findings": sum(r["summary"]["total_findings"] for r in files),
+            "critical": sum(r["summary"]["critical"] for r in files),
+            "high": sum(r["summary"]["high"] for r in files),
+            "medium": sum(r["summary"]["medium"] for r in files),
+            "verdicts": verdicts,
+            "verdict": verdict,
+        },
+    }
+    if profile:
+        report["timings"] = _sum_timings([r["timings"] for r in files], time.perf_counter() - start)
+    return report
+
+
+# --- Streaming mode ---
+
+# Input is scanned in windows of about this many characters. Windows end on a
+# line break, so line rules and line numbers behave exactly as in run_scan.
+STREAM_WINDOW_CHARS = 1 << 18
+
+# A line longer than a window is cut anyway; the windows on both sides of the
+# cut then share this much text so base64 and tag-character runs crossing it
+# are still matched whole (up to this length).
+STREAM_OVERLAP_CHARS = 1 << 14
+
+# An HTML comment still open at a window edge is carried into the next window
+# until it closes or the window grows past STREAM_WINDOW_CHARS + this.
+STREAM_COMMENT_CARRY_CHARS = 1 << 22
+
+# Findings listed per check; the rest are only counted.
+STREAM_MAX_FINDINGS_PER_CHECK = 500
+
+# --file/--dir inputs larger than this are streamed even without --stream.
+STREAM_AUTO_BYTES = 64 << 20
+
+# Checks that report only the first match of a rule per line.
+_FIRST_PER_LINE_CHECKS = {
+    "suppression_attempt", "injection_phrase", "css_hiding",
+    "tool_schema_imperative", "tool_schema_model_ref", "data_acquisition",
+}
+
+
+def _last_line_end(text, end):
+    """Offset just past the last line break in text[:end], or 0 if there is none."""
+    pos = max(text.rfind(c, 0, end) for c in _LINE_BREAK_CHARS)
+    if pos == -1:
+        return 0
+    if text[pos] == "\r" and text.startswith("\n", pos + 1):
+        pos += 1
+    return pos + 1
+
+
+def _open_comment(text, start, end):
+    """Offset of an HTML comment opened but not closed in text[start:end], or -1."""
+    close = text.rfind("-->", start, end)
+    return text.find("<!--", close + 3 if close != -1 else start, end)
+
+
+def _comment_safe_cut(text, start, cut):
+    """Move a cut back to a line start that no HTML comment spans.
+
+    Returns 0 when the only such line start is the start of the text.
+    """
+    while True:
+        comment = _open_comment(text, start, cut)
+        if comment == -1:
+            return cut
+        cut = _last_line_end(text, comment)
+        if not cut:
+            return 0
+
+
+def _stream_windows(stream, stats):
+    """Yield (window, own_start, own_end, advance) tuples covering a text stream.
+
+    Findings starting in window[own_start:own_end] belong to this window; the
+    next window starts at window[advance:]. A window normally ends on a line
+    break and owns all of itself. When a long line has to be cut, the windows
+    on either side of the cut share STREAM_OVERLAP_CHARS of context.
+    """
+    buffer = ""
+    lead = 0
+    target = STREAM_WINDOW_CHARS
+    eof = False
+    while True:
+        while not eof and len(buffer) < target:
+            chunk = stream.read(target - len(buffer))
+            if chunk:
+                buffer += chunk
+            else:
+                eof = True
+        if eof:
+            if len(buffer) > lead:
+                yield buffer, lead, len(buffer), len(buffer)
+            return
+
+        # Never cut after the last character: it may be the \r of a \r\n pair.
+        cut = _last_line_end(buffer, len(buffer) - 1) or len(buffer)
+        safe = _comment_safe_cut(buffer, lead, cut)
+        if not safe:
+            if len(buffer) < STREAM_WINDOW_CHARS + STREAM_COMMENT_CARRY_CHARS:
+                target = len(buffer) + STREAM_WINDOW_CHARS
+                continue
+            stats["oversized_comments"] += 1
+            safe = cut
+
+        if safe < len(buffer):
+            cut = safe
+            yield buffer[:cut], lead, cut, cut
+            buffer = buffer[cut:]
+            lead = 0
+        else:
+            own_end = len(buffer) - STREAM_OVERLAP_CHARS
+            advance = own_end - STREAM_OVERLAP_CHARS
+            yield buffer, lead, own_end, advance
+            buffer = buffer[advance:]
+            lead = STREAM_OVERLAP_CHARS
+        target = STREAM_WINDOW_CHARS
+
+
+def run_stream_scan(stream, target_name, profile=False):
+    """Scan a text stream window by window in bounded memory.
+
+    Produces the same report as run_scan, plus a "stream" section. Summary
+    counts and the verdict cover every finding; the findings list keeps at
+    most STREAM_MAX_FINDINGS_PER_CHECK per check. Findings on a line cut
+    across windows are listed window by window (run_scan orders them by
+    rule). With profile, "timings" adds up every window.
+    """
+    start = time.perf_counter()
+    timings = _new_profile() if profile else None
+    stats = {"windows": 0, "chars": 0, "bytes": 0, "oversized_comments": 0}
+    groups = None
+    dropped = {}
+    severities = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0}
+    # compute_verdict only looks at which checks fired and contains_injection
+    verdict_basis = {}
+    # First-per-line keys for a line that continues into the next window
+    line_keys = set()
+    # Lines of the current cut line with a raw injection hit, and the
+    # normalized-only hits on it, held until the line ends: a raw hit in a
+    # later window drops them, as in run_scan
+    raw_lines = set()
+    held = {}
+    # Start of the line the next window begins in, for context strings
+    line_head = None
+    line_offset = column_offset = byte_offset = 0
+    # One decode budget (and cache) for the whole stream, not per window
+    b64_budget = None
+
+    def keep(kept, finding):
+        severities[finding["severity"]] += 1
+        verdict_basis.setdefault((finding["check"], bool(finding.get("contains_injection"))), finding)
+        if len(kept) < STREAM_MAX_FINDINGS_PER_CHECK:
+            kept.append(finding)
+        else:
+            dropped[finding["check"]] = dropped.get(finding["check"], 0) + 1
+
+    def release(before_line):
+        for key in [key for key in held if key[0] < before_line]:
+            finding = held.pop(key)
+            if finding["line"] not in raw_lines:
+                keep(groups[-1], finding)
+
+    for window, own_start, own_end, advance in _stream_windows(stream, stats):
+        stats["windows"] += 1
+        own_start_byte = byte_offset + len(window[:own_start].encode("utf-8", "surrogatepass"))
+        own_end_byte = own_start_byte + len(window[own_start:own_end].encode("utf-8", "surrogatepass"))
+        ctx = _scan_context(window, origin=(line_offset, column_offset, byte_offset))
+        ctx["finding_limit"] = STREAM_MAX_FINDINGS_PER_CHECK
+        ctx["owned_bytes"] = (own_start_byte, own_end_byte)
+        ctx["owned_chars"] = (own_start, own_end)
+        ctx["b64_budget"] = b64_budget
+        ctx["profile"] = timings
+        ctx["line_head"] = line_head
+        ctx["raw_injection_lines"] = raw_lines
+        results = _collect_findings(window, ctx)
+        b64_budget = ctx["b64_budget"]
+        if groups is None:
+            groups = [[] for _ in results]
+        starts = _line_starts(ctx)
+        # Line holding own_end: it continues into the next window after a cut
+        split_line = line_offset + bisect_right(starts, own_end)
+        # Lines seen by an earlier or a later window too
+        open_lines = {split_line, line_offset + 1} if column_offset else {split_line}
+        if not column_offset:
+            line_keys.clear()
+
+        for kept, findings in zip(groups[:-1], results[:-1]):
+            for finding in findings:
+                # Matches starting in the shared context belong to the neighbour
+                if not own_start_byte <= finding.get("byte_offset", own_start_byte) < own_end_byte:
+                    continue
+                if finding["check"] in _FIRST_PER_LINE_CHECKS:
+                    key = (finding["check"], finding["line"], finding["detail"])
+                    if key in line_keys:
+                        continue
+                    if finding["line"] == split_line:
+                        line_keys.add(key)
+                keep(kept, finding)
+        # Normalized-only hits carry no offsets: dedupe them by line and rule
+        for finding in results[-1]:
+            release(finding["line"])
+            if finding["line"] in open_lines:
+                held.setdefault((finding["line"], finding["detail"]), finding)
+            else:
+                keep(groups[-1], finding)
+        for (check, severity, contains_injection), count in ctx["overflow"].items():
+            severities[severity] += count
+            verdict_basis.setdefault(
+                (check, contains_injection), {"check": check, "contains_injection": contains_injection}
+            )
+            dropped[check] = dropped.get(check, 0) + count
+
+        # Move the origin to where the next window starts
+        lines = bisect_right(starts, advance)
+        if lines > 1:
+            line_head = None
+        if advance > starts[lines - 1]:
+            head = window[starts[lines - 1]:advance]
+            if not line_head:  # Nothing but blanks so far: strip them as run_scan would
+                head = head.lstrip()
+            line_head = ((line_head or "") + head[:_CONTEXT_CHARS])[:_CONTEXT_CHARS]
+        column_offset = advance - starts[lines - 1] + (column_offset if lines == 1 else 0)
+        line_offset += lines - 1
+        byte_offset += len(window[:advance].encode("utf-8", "surrogatepass"))
+        stats["chars"] += own_end - own_start
+        release(line_offset + 1)
+        raw_lines = {line for line in raw_lines if line > line_offset}
+
+    release(float("inf"))
+    stats["bytes"] = byte_offset
+    all_findings = [f for findings in groups or [] for f in findings]
+    report = _build_report(target_name, all_findings, {
+        "total_findings": sum(severities.values()),
+        "critical": severities["CRITICAL"],
+        "high": severities["HIGH"],
+        "medium": severities["MEDIUM"],
+        "verdict": compute_verdict(list(verdict_basis.values())),
+    })
+    report["stream"] = {**stats, "dropped_findings": dropped}
+    budget = _budget_report(b64_budget)
+    if budget:
+        report["base64_budget"] = budget
+    if profile:
+        report["timings"] = _timings_report(timings, time.perf_counter() - start)
+    return report
+
+
 # --- Main logic ---
 
 
@@ -574,52 +1463,111 @@ def compute_verdict(findings):
     return "SUSPICIOUS"
 
 
-def run_scan(text, target_name):
-    """Run all scanner checks and produce JSON report."""
-    all_findings = []
-    all_findings.extend(scan_suppression_annotations(text))
-    all_findings.extend(scan_injection_phrases(text))
-    all_findings.extend(scan_base64_payloads(text))
-    all_findings.extend(scan_zero_width_chars(text))
+# Every check run_scan makes, in report order
+_CHECKS = (
+    scan_suppression_annotations,
+    scan_injection_phrases,
+    scan_base64_payloads,
+    scan_zero_width_chars,
     # Unicode attack detection (C-SEC-003/004/005, S-SEC-013)
-    all_findings.extend(scan_tag_characters(text))
-    all_findings.extend(scan_bidi_overrides(text))
-    all_findings.extend(scan_variation_selectors(text))
-    all_findings.extend(scan_sneaky_bits(text))
-    all_findings.extend(scan_html_comments(text))
-    all_findings.extend(scan_css_hiding(text))
-    all_findings.extend(scan_encoding_red_flags(text))
-    all_findings.extend(scan_tool_schema_red_flags(text))
-    all_findings.extend(scan_data_acquisition(text))
+    scan_tag_characters,
+    scan_bidi_overrides,
+    scan_variation_selectors,
+    scan_sneaky_bits,
+    scan_html_comments,
+    scan_css_hiding,
+    scan_encoding_red_flags,
+    scan_tool_schema_red_flags,
+    scan_data_acquisition,
+)
+
+
+def _collect_findings(text, ctx):
+    """Run every check over one text; returns a findings list per check, in report order."""
+    results = [_run_check(check, text, ctx) for check in _CHECKS]
+    # Streaming carries the lines caught in earlier windows of a cut line
+    raw_injection_lines = ctx["raw_injection_lines"]
+    if raw_injection_lines is None:
+        raw_injection_lines = set()
+    raw_injection_lines.update(f["line"] for f in results[1])
 
     # C-SEC-005: Also scan NORMALIZED text for obfuscated injection phrases
-    normalized = _normalize_for_injection_scan(text)
+    normalized_findings = []
+    profile = ctx["profile"]
+    start = time.perf_counter()
+    owned = ctx["owned_chars"] or (0, len(text))
+    if owned == (0, len(text)):
+        normalized = cerbero_core.normalize(text, strip_tags=True)
+        own_low, own_high = 0, len(normalized)
+    else:
+        # Piece by piece, so the part of the copy this stream window owns is known
+        pieces = [
+            cerbero_core.normalize(part, strip_tags=True)
+            for part in (text[:owned[0]], text[owned[0]:owned[1]], text[owned[1]:])
+        ]
+        normalized = "".join(pieces)
+        own_low, own_high = len(pieces[0]), len(pieces[0]) + len(pieces[1])
+    if profile is not None:
+        profile["normalization"]["wall_ms"] += (time.perf_counter() - start) * 1000
+        profile["normalization"]["chars"] += len(text)
     if normalized != text:
-        norm_injections = scan_injection_phrases(normalized)
+        norm_ctx = _scan_context(normalized, origin=(ctx["origin"][0], 0, 0))
+        norm_ctx["profile"] = profile
+        norm_injections = _run_check(
+            scan_injection_phrases, normalized, norm_ctx, profile and profile["normalized_rescan"]
+        )
+        norm_starts = _line_starts(norm_ctx)
         # Only add if they weren't already caught in raw scan
-        raw_injection_lines = {f["line"] for f in all_findings if f["check"] == "injection_phrase"}
         for finding in norm_injections:
-            if finding["line"] not in raw_injection_lines:
+            pos = norm_starts[finding["line"] - ctx["origin"][0] - 1] + finding["column"] - 1
+            if own_low <= pos < own_high and finding["line"] not in raw_injection_lines:
+                # Column/byte offsets point into the normalized copy, not the input
+                finding.pop("column", None)
+                finding.pop("byte_offset", None)
                 finding["detail"] += " (detected after Unicode normalization)"
-                all_findings.append(finding)
+                normalized_findings.append(finding)
+    results.append(normalized_findings)
+    return results
 
-    critical = sum(1 for f in all_findings if f["severity"] == "CRITICAL")
-    high = sum(1 for f in all_findings if f["severity"] == "HIGH")
-    medium = sum(1 for f in all_findings if f["severity"] == "MEDIUM")
 
-    report = {
+def _build_report(target_name, findings, summary):
+    return {
         "scanner_version": SCANNER_VERSION,
         "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "target": target_name,
-        "findings": all_findings,
-        "summary": {
-            "total_findings": len(all_findings),
-            "critical": critical,
-            "high": high,
-            "medium": medium,
-            "verdict": compute_verdict(all_findings),
-        },
+        "findings": findings,
+        "summary": summary,
     }
+
+
+def run_scan(text, target_name, profile=False):
+    """Run all scanner checks and produce JSON report.
+
+    With profile, the report gains a "timings" section: per check wall time,
+    lines visited, regex passes, matches and bytes decoded, plus the time
+    spent normalizing and re-scanning the normalized text.
+    """
+    start = time.perf_counter()
+    ctx = _scan_context(text)
+    ctx["profile"] = _new_profile() if profile else None
+    all_findings = [f for findings in _collect_findings(text, ctx) for f in findings]
+
+    critical = sum(1 for f in all_findings if f["severity"] == "CRITICAL")
+    high = sum(1 for f in all_findings if f["severity"] == "HIGH")
+    medium = sum(1 for f in all_findings if f["severity"] == "MEDIUM")
+
+    report = _build_report(target_name, all_findings, {
+        "total_findings": len(all_findings),
+        "critical": critical,
+        "high": high,
+        "medium": medium,
+        "verdict": compute_verdict(all_findings),
+    })
+    budget = _budget_report(ctx["b64_budget"])
+    if budget:
+        report["base64_budget"] = budget
+    if profile:
+        report["timings"] = _timings_report(ctx["profile"], time.perf_counter() - start)
     return report
 
 
@@ -627,12 +1575,56 @@ def main():
     parser = argparse.ArgumentParser(description="Cerbero external scanner (Tier 0)")
     parser.add_argument("--file", help="Path to file to scan")
     parser.add_argument("--stdin", action="store_true", help="Read from stdin")
+    parser.add_argument("--dir", help="Batch mode: scan every text file under this directory")
+    parser.add_argument(
+        "--glob",
+        help="Batch mode: scan files matching this glob (** recurses; relative to --dir if given)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Batch mode: worker processes (0 = one per CPU, default 1)",
+    )
+    parser.add_argument("--include-ext", help="Batch mode: only these extensions, e.g. .py,.md,.json")
+    parser.add_argument("--exclude-ext", help="Batch mode: skip these extensions")
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Scan in bounded-memory windows (automatic for files over 64 MiB)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always scan; skip the result cache")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help='Add per-check "timings" to the report (implies --no-cache)',
+    )
+    parser.add_argument("--cache-dir", help="Result cache directory (default: .claude/security/scan-cache)")
+    parser.add_argument(
+        "--shared-cache", action="store_true",
+        help="Use the per-user result cache shared by all projects",
+    )
     parser.add_argument(
         "--strip-only",
         action="store_true",
         help="Pre-processor mode: strip comments and strings, output to stdout",
     )
     args = parser.parse_args()
+    cache_dir = None if args.no_cache or args.profile else args.cache_dir or default_cache_dir(args.shared_cache)
+
+    if args.dir or args.glob:
+        if args.file or args.stdin or args.strip_only:
+            parser.error("--dir/--glob cannot be combined with --file, --stdin or --strip-only")
+        if args.dir and not os.path.isdir(args.dir):
+            print(json.dumps({"error": f"Directory not found: {args.dir}"}))
+            sys.exit(1)
+        paths, skipped = collect_targets(
+            args.dir, args.glob,
+            _parse_extensions(args.include_ext), _parse_extensions(args.exclude_ext),
+        )
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        target_name = os.path.join(args.dir, args.glob) if args.dir and args.glob else args.dir or args.glob
+        report = run_batch(paths, skipped, target_name, jobs, cache_dir, args.profile)
+        if cache_dir and report["summary"]["files_cached"] < report["summary"]["files_scanned"]:
+            cache_evict(cache_dir)
+        print(json.dumps(report, indent=2))
+        sys.exit(0)
 
     if not args.file and not args.stdin:
         parser.print_help()
@@ -642,9 +1634,20 @@ def main():
         if not os.path.isfile(args.file):
             print(json.dumps({"error": f"File not found: {args.file}"}))
             sys.exit(1)
-        with open(args.file, "r", encoding="utf-8") as f:
+        if not args.strip_only and (args.stream or os.path.getsize(args.file) > STREAM_AUTO_BYTES):
+            report = stream_file_cached(args.file, cache_dir, args.profile)
+            if cache_dir and not report.get("cached"):
+                cache_evict(cache_dir)
+            print(json.dumps(report, indent=2))
+            sys.exit(0)
+        # newline="" keeps CRLF intact so byte_offset matches the file on disk
+        with open(args.file, "r", encoding="utf-8", newline="") as f:
             text = f.read()
         target_name = args.file
+    elif args.stream and not args.strip_only:
+        report = run_stream_scan(sys.stdin, "stdin", args.profile)
+        print(json.dumps(report, indent=2))
+        sys.exit(0)
     else:
         text = sys.stdin.read()
         target_name = "stdin"
@@ -653,7 +1656,9 @@ def main():
         print(strip_comments_and_strings(text))
         sys.exit(0)
 
-    report = run_scan(text, target_name)
+    report = scan_text_cached(text, target_name, cache_dir, args.profile)
+    if cache_dir and not report.get("cached"):
+        cache_evict(cache_dir)
     print(json.dumps(report, indent=2))
     sys.exit(0)
 
@@ -0,0 +1,578 @@
+"""Cerbero detection core: shared Unicode tables, normalization and detectors.
+
+Imported by validate-prompt.py, validate-tool-output.py and cerbero-scanner.py,
+which must be deployed next to this file (all of them live in .claude/hooks/).
+Every table is compiled once at import; a rule or performance fix made here
+applies to every entry point.
+
+API:
+    normalize(text)          -> text with invisible chars stripped, NFKC, confusables mapped
+    normalize_counted(text)  -> (normalized, number of invisible chars stripped)
+    detect(text)             -> list of findings: {"kind", "start", "end", "match"}
+    iter_detect(text)        -> the same findings, lazily (bounded memory on floods)
+    compile_prefilter(anchors) / prefilter_rules(prefilter, text)
+                             -> which regex rules can possibly match, from literal anchors
+    base64_budget() / decode_base64(candidate, budget)
+                             -> deduplicated base64 decoding under a per-invocation budget
+    hook_deadline(hook, cwd) / checkpoint(deadline, check) / arm_watchdog(deadline)
+                             -> per-hook latency budget, skipped-check bookkeeping, watchdog
+    hook_profile(hook) / profile_mark(profile, check) / profile_emit(profile)
+                             -> per-check timings of a hook run when CERBERO_PROFILE is set
+
+Stdlib only. Nothing runs at import besides compiling tables, so it is safe to
+import anywhere.
+"""
+import sys
+import os
+import re
+import time
+import json
+import signal
+import binascii
+import hashlib
+import unicodedata
+
+# Shared module, not a hook: hook-daemon.py never serves a file with this line
+NOT_A_HOOK = True
+
+# ---------------------------------------------------------------------------
+# Normalization tables
+# ---------------------------------------------------------------------------
+
+# Zero-width / invisible characters — stripped before pattern matching (NOT blocked)
+# Includes classic ZW + Variation Selectors + Sneaky Bits for normalization.
+ZERO_WIDTH_CHARS = re.compile(
+    r"[\u200b\u200c\u200d\ufeff\u00ad\u2060\u180e"
+    r"\ufe00-\ufe0f"               # Variation Selectors 1-16
+    r"\U000E0100-\U000E01EF"       # Variation Selectors 17-256
+    r"\u2062\u2064]"               # Sneaky Bits (invisible times/plus)
+)
+
+# Same set plus the tag block (U+E0000-E007F): the scanner strips tag characters
+# too before its normalized injection re-scan (C-SEC-005).
+INVISIBLE_CHARS = re.compile(
+    r"[\u200b\u200c\u200d\ufeff\u00ad\u2060\u180e"
+    r"\ufe00-\ufe0f\U000E0100-\U000E01EF"
+    r"\u2062\u2064"
+    r"\U000E0000-\U000E007F]"
+)
+
+# Classic zero-width codepoints and their names (reported individually by the scanner)
+ZERO_WIDTH_NAMES = {
+    0x200B: "ZERO WIDTH SPACE",
+    0x200C: "ZERO WIDTH NON-JOINER",
+    0x200D: "ZERO WIDTH JOINER",
+    0xFEFF: "BYTE ORDER MARK / ZERO WIDTH NO-BREAK SPACE",
+    0x00AD: "SOFT HYPHEN",
+    0x2060: "WORD JOINER",
+    0x180E: "MONGOLIAN VOWEL SEPARATOR",
+}
+
+# Cyrillic/Greek→Latin confusables (visually identical characters)
+CONFUSABLES = str.maketrans({
+    # Cyrillic lowercase
+    "\u0430": "a", "\u0435": "e", "\u043e": "o", "\u0440": "p",
+    "\u0441": "c", "\u0443": "y", "\u0445": "x", "\u04bb": "h",
+    "\u0456": "i", "\u0458": "j", "\u043a": "k", "\u043c": "m",
+    "\u043d": "n", "\u0442": "t", "\u0432": "v", "\u0437": "z",
+    # Cyrillic uppercase
+    "\u0410": "A", "\u0415": "E", "\u041e": "O", "\u0420": "P",
+    "\u0421": "C", "\u0423": "Y", "\u0425": "X", "\u0406": "I",
+    "\u041a": "K", "\u041c": "M", "\u041d": "N", "\u0422": "T",
+    "\u0412": "V",
+    # Greek lowercase (M-SEC-002)
+    "\u03b1": "a", "\u03bf": "o", "\u03b5": "e", "\u03b9": "i",
+    "\u03c1": "p",
+    # Greek uppercase (M-SEC-002)
+    "\u0391": "A", "\u0392": "B", "\u0395": "E", "\u0397": "H",
+    "\u0399": "I", "\u039a": "K", "\u039c": "M", "\u039d": "N",
+    "\u039f": "O", "\u03a1": "P", "\u03a4": "T", "\u03a5": "Y",
+    "\u03a7": "X",
+})
+
+# ---------------------------------------------------------------------------
+# Unicode threat patterns
+# ---------------------------------------------------------------------------
+
+# Tag characters (U+E0000-U+E007F) — used for emoji tag sequences but exploited
+# for smuggling with 100% ASR (Rehberger 2024). 3+ consecutive = suspicious.
+# Full block includes U+E0001 (LANGUAGE TAG) used in attacks (Cisco AI Defense).
+TAG_SMUGGLING_PATTERN = re.compile(r"[\U000E0000-\U000E007F]{3,}")
+
+# Bidi override characters — can make text render in misleading order
+BIDI_OVERRIDE_PATTERN = re.compile(
+    r"[\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069]"
+)
+BIDI_NAMES = {
+    0x202A: "LRE", 0x202B: "RLE", 0x202C: "PDF", 0x202D: "LRO", 0x202E: "RLO",
+    0x2066: "LRI", 0x2067: "RLI", 0x2068: "FSI", 0x2069: "PDI",
+}
+
+# Variation Selectors — VS1-16 (U+FE00-FE0F) + VS17-256 (U+E0100-E01EF)
+# Used by Glassworm campaign (Mar 2026, 400+ repos) for binary encoding.
+# 1 VS after a base char is legitimate (emoji presentation). 2+ consecutive = suspicious.
+VARIATION_SELECTOR_PATTERN = re.compile(
+    r"[\ufe00-\ufe0f\U000E0100-\U000E01EF]{2,}"
+)
+
+# Sneaky Bits — U+2062 (invisible times) / U+2064 (invisible plus)
+# Binary encoding technique (Rehberger, Mar 2025). 3+ consecutive = suspicious.
+SNEAKY_BITS_PATTERN = re.compile(r"[\u2062\u2064]{3,}")
+
+# Detector order is the order findings are reported in by detect()
+DETECTORS = (
+    ("TAG_SMUGGLING", TAG_SMUGGLING_PATTERN),
+    ("VARIATION_SELECTOR", VARIATION_SELECTOR_PATTERN),
+    ("SNEAKY_BITS", SNEAKY_BITS_PATTERN),
+    ("BIDI_OVERRIDE", BIDI_OVERRIDE_PATTERN),
+)
+
+# Any character a detector could start on: one pass rules out clean text
+_SUSPECT_CHARS = re.compile(
+    r"[\U000E0000-\U000E007F\ufe00-\ufe0f\U000E0100-\U000E01EF\u2062\u2064"
+    r"\u202a-\u202e\u2066-\u2069]"
+)
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+def normalize_counted(text, strip_tags=False):
+    """Strip invisible chars, NFKC normalize, apply confusables table.
+
+    Returns (normalized_text, stripped_count). strip_tags also removes the tag
+    block (U+E0000-E007F). ASCII input is returned as-is: none of the steps
+    can change it.
+    """
+    if text.isascii():
+        return text, 0
+    pattern = INVISIBLE_CHARS if strip_tags else ZERO_WIDTH_CHARS
+    cleaned = pattern.sub("", text)
+    nfkc = unicodedata.normalize("NFKC", cleaned)
+    return nfkc.translate(CONFUSABLES), len(text) - len(cleaned)
+
+
+def normalize(text, strip_tags=False):
+    """Normalized text for pattern matching (see normalize_counted)."""
+    return normalize_counted(text, strip_tags)[0]
+
+
+def _suspect(text, kinds):
+    """Detectors worth running: none at all for text without a suspect character."""
+    if text.isascii() or not _SUSPECT_CHARS.search(text):
+        return ()
+    return [(kind, pattern) for kind, pattern in DETECTORS if kinds is None or kind in kinds]
+
+
+def _finding(kind, match):
+    return {"kind": kind, "start": match.start(), "end": match.end(), "match": match.group()}
+
+
+def iter_detect(text, kinds=None):
+    """Yield Unicode attack findings on raw (pre-normalize) text, detector by detector.
+
+    Each finding is {"kind", "start", "end", "match"}. kinds restricts the
+    detectors run (names from DETECTORS).
+    """
+    for kind, pattern in _suspect(text, kinds):
+        for match in pattern.finditer(text):
+            yield _finding(kind, match)
+
+
+def detect(text, kinds=None, first_only=False):
+    """Unicode attack findings on raw text, in DETECTORS order.
+
+    first_only keeps just the first match of each kind, which is all the hooks
+    need to decide.
+    """
+    if not first_only:
+        return list(iter_detect(text, kinds))
+    findings = []
+    for kind, pattern in _suspect(text, kinds):
+        match = pattern.search(text)
+        if match:
+            findings.append(_finding(kind, match))
+    return findings
+
+
+# ---------------------------------------------------------------------------
+# Literal-anchor prefilter
+# ---------------------------------------------------------------------------
+
+def compile_prefilter(anchor_sets):
+    """Prefilter for a rule table, given one tuple of literal anchors per rule.
+
+    An anchor is a substring every match of the rule must contain, in the case
+    the rule is matched against (the callers lowercase or fold first). A rule
+    with several anchors runs if any of them occurs (alternations); a rule with
+    none always runs. An anchor that contains a shorter anchor is only looked
+    for once the shorter one has been found ("system" after "sys").
+    """
+    anchor_sets = [frozenset(anchors) for anchors in anchor_sets]
+    anchors = sorted({a for anchors in anchor_sets for a in anchors}, key=lambda a: (len(a), a))
+    children = {a: [] for a in anchors}
+    roots = []
+    for i, anchor in enumerate(anchors):
+        parents = [shorter for shorter in anchors[:i] if shorter in anchor]
+        if parents:
+            children[max(parents, key=len)].append(anchor)
+        else:
+            roots.append(anchor)
+    return {
+        "roots": roots,
+        "children": children,
+        "sets": anchor_sets,
+        "always": [i for i, anchors in enumerate(anchor_sets) if not anchors],
+    }
+
+
+def prefilter_rules(prefilter, text):
+    """Indexes (ascending) of the rules whose anchors occur in text.
+
+    One substring search per anchor reached. CPython's str search runs at
+    memchr speed, while re would have to try a keyword alternation at every
+    position, so this beats a single combined regex; the cost on clean text
+    is one pass per root anchor.
+    """
+    present = set()
+    pending = [a for a in prefilter["roots"] if a in text]
+    while pending:
+        anchor = pending.pop()
+        present.add(anchor)
+        pending.extend(a for a in prefilter["children"][anchor] if a in text)
+    if not present:
+        return prefilter["always"]
+    return [i for i, anchors in enumerate(prefilter["sets"]) if not anchors or anchors & present]
+
+
+# ---------------------------------------------------------------------------
+# Base64 decode stage
+# ---------------------------------------------------------------------------
+
+# Per-invocation default: an output full of images, wheels or JWTs stops
+# costing more once this many encoded characters are decoded. Each distinct
+# candidate is charged its length plus a small fixed cost, so flooding a text
+# with thousands of short candidates cannot spend the budget cheaply.
+BASE64_BUDGET_BYTES = 2 << 20
+BASE64_CANDIDATE_COST = 16
+
+# Results are memoized by candidate digest; bounded so streaming stays flat
+BASE64_CACHE_MAX_ENTRIES = 1 << 16
+BASE64_CACHE_MAX_CHARS = 1 << 16
+
+# Strict decodes probe this many leading characters (a multiple of 4) first
+BASE64_PROBE_CHARS = 64
+
+# Longer candidates are keyed by digest rather than by the string itself
+BASE64_KEY_MAX_CHARS = 512
+
+_UNSEEN = object()
+
+
+def base64_budget(max_bytes=BASE64_BUDGET_BYTES, candidate_cost=BASE64_CANDIDATE_COST):
+    """Fresh decode budget, shared by every decode_base64() call of one scan."""
+    return {
+        "max_bytes": max_bytes, "bytes_left": max_bytes, "candidate_cost": candidate_cost,
+        "candidates": 0, "cache": {}, "explored": {}, "skipped": 0, "exhausted": False,
+    }
+
+
+def _could_be_utf8(candidate):
+    """False if the leading bytes already rule out a strict UTF-8 decode."""
+    try:
+        head = binascii.a2b_base64(candidate[:BASE64_PROBE_CHARS])
+    except (binascii.Error, ValueError):
+        return False
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return e.reason == "unexpected end of data"  # Cut mid-character: undecided
+    return True
+
+
+def decode_base64(candidate, budget, strict=False, depth_left=None):
+    """Decode one base64 candidate to text under a per-invocation budget.
+
+    strict decodes UTF-8 strictly and probes the first BASE64_PROBE_CHARS
+    before decoding the rest; otherwise invalid bytes are dropped
+    (errors="ignore"), which no prefix can rule out. Returns None when the
+    candidate is not valid base64 (or not UTF-8 when strict), or when the
+    budget is spent; budget["exhausted"] then stays set and budget["skipped"]
+    counts the candidates left undecoded.
+
+    A repeated candidate is never decoded twice. Callers that rescan and
+    recurse pass depth_left: a repeat already explored with at least that much
+    depth left returns None, since exploring it again cannot find anything new.
+    Without depth_left the cached result is returned, so every occurrence can
+    still be reported.
+    """
+    key = candidate
+    if len(candidate) > BASE64_KEY_MAX_CHARS:
+        key = hashlib.blake2b(candidate.encode("ascii", "replace"), digest_size=16).digest()
+    cache = budget["cache"]
+    decoded = cache.get(key, _UNSEEN)
+    if decoded is not _UNSEEN:
+        if depth_left is not None:
+            explored = budget["explored"]
+            if explored.get(key, -1) >= depth_left:
+                return None
+            explored[key] = depth_left
+        return decoded
+
+    size = len(candidate)
+    cost = size + budget["candidate_cost"]
+    if cost > budget["bytes_left"]:
+        budget["exhausted"] = True
+        budget["skipped"] += 1
+        return None
+    budget["candidates"] += 1
+    budget["bytes_left"] -= cost
+
+    decoded = None
+    if not strict or size <= BASE64_PROBE_CHARS or _could_be_utf8(candidate):
+        try:
+            decoded = binascii.a2b_base64(candidate).decode("utf-8", errors="strict" if strict else "ignore")
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            decoded = None
+
+    if len(cache) >= BASE64_CACHE_MAX_ENTRIES:
+        cache.clear()
+        budget["explored"].clear()
+    if decoded is None or len(decoded) <= BASE64_CACHE_MAX_CHARS:
+        cache[key] = decoded
+        if depth_left is not None:
+            budget["explored"][key] = depth_left
+    return decoded
+
+
+# ---------------------------------------------------------------------------
+# Payload decoders
+# ---------------------------------------------------------------------------
+
+def decode_tag_characters(run):
+    """Tag chars map to ASCII (U+E0041 = 'A')."""
+    return "".join(chr(ord(c) - 0xE0000) for c in run if 0xE0000 <= ord(c) <= 0xE007F)
+
+
+def decode_variation_selectors(run):
+    """Decode Glassworm-style Variation Selector encoding.
+
+    Algorithm: VS1-16 (U+FE00-FE0F) → byte 0x00-0x0F
+               VS17-256 (U+E0100-E01EF) → byte 0x10-0xFF
+    Returns decoded bytes as string, or empty string if decode fails.
+    """
+    raw_bytes = []
+    for char in run:
+        cp = ord(char)
+        if 0xFE00 <= cp <= 0xFE0F:
+            raw_bytes.append(cp - 0xFE00)
+        elif 0xE0100 <= cp <= 0xE01EF:
+            raw_bytes.append(cp - 0xE0100 + 16)
+    if not raw_bytes:
+        return ""
+    try:
+        return bytes(raw_bytes).decode("utf-8", errors="replace")
+    except Exception:
+        return ""
+
+
+def decode_sneaky_bits(run):
+    """U+2062 = 0, U+2064 = 1, read as 8-bit characters (NUL bytes dropped)."""
+    bits = "".join("0" if ord(c) == 0x2062 else "1" for c in run)
+    if len(bits) < 8:
+        return ""
+    try:
+        return "".join(chr(int(bits[i:i+8], 2))
+                       for i in range(0, len(bits) - 7, 8)
+                       if int(bits[i:i+8], 2) > 0)
+    except (ValueError, OverflowError):
+        return ""
+
+
+# ---------------------------------------------------------------------------
+# Latency budget
+# ---------------------------------------------------------------------------
+
+# Optional per-hook overrides: {"validate-tool-output.py": {"budget_ms": 3000, "watchdog_ms": 10000}}
+HOOK_BUDGETS_PATH = os.path.join(".claude", "hook-budgets.json")
+
+# Claude Code kills hooks at their configured timeout (60 s by default); the
+# watchdog fires well before that. A main thread stuck in C code (a runaway
+# regex never yields to the watchdog thread) is ended by SIGALRM this much later.
+WATCHDOG_MS = 10_000
+WATCHDOG_GRACE_MS = 1_000
+
+
+class WatchdogExpired(BaseException):
+    """Raised in the hook's main thread when its watchdog fires.
+
+    A BaseException so that `except Exception` fail-open blocks inside
+    checks do not swallow it.
+    """
+
+
+def hook_deadline(hook, cwd=None, budget_ms=2_000, watchdog_ms=WATCHDOG_MS):
+    """Deadline state for one hook run, with HOOK_BUDGETS_PATH overrides applied.
+
+    budget_ms is the soft budget checks are fitted into (see checkpoint());
+    watchdog_ms is the hard limit enforced by arm_watchdog().
+    """
+    project = os.environ.get("CLAUDE_PROJECT_DIR") or cwd or "."
+    try:
+        with open(os.path.join(project, HOOK_BUDGETS_PATH), "r", encoding="utf-8") as f:
+            overrides = json.load(f).get(hook, {})
+    except (OSError, ValueError, AttributeError):
+        overrides = {}
+    if isinstance(overrides, dict):
+        for key in ("budget_ms", "watchdog_ms"):
+            value = overrides.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+                if key == "budget_ms":
+                    budget_ms = int(value)
+                else:
+                    watchdog_ms = int(value)
+    start = time.monotonic()
+    return {
+        "hook": hook, "budget_ms": budget_ms, "watchdog_ms": max(watchdog_ms, budget_ms),
+        "start": start, "end": start + budget_ms / 1000, "skipped": [],
+        "lock": None, "thread": None, "alarm": False, "fired": False, "done": False,
+    }
+
+
+def time_left(deadline):
+    """Seconds left in the soft budget (never negative)."""
+    return max(0.0, deadline["end"] - time.monotonic())
+
+
+def checkpoint(deadline, check):
+    """True if `check` may still run; once the budget is spent, records it as skipped."""
+    if time.monotonic() < deadline["end"]:
+        return True
+    if check not in deadline["skipped"]:
+        deadline["skipped"].append(check)
+    return False
+
+
+def skipped_note(deadline):
+    """One line naming the checks the budget cut, or None if everything ran."""
+    if not deadline["skipped"]:
+        return None
+    reason = "watchdog" if deadline["fired"] else f"{deadline['budget_ms']} ms latency budget"
+    return f"{reason} reached; skipped: {', '.join(deadline['skipped'])}"
+
+
+def _async_raise(thread_id, exc):
+    """Raise exc in another thread at its next bytecode (exc=None cancels a pending one)."""
+    import ctypes
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), ctypes.py_object(exc) if exc else None)
+
+
+def arm_watchdog(deadline):
+    """Make sure the hook ends before the external kill, even mid-check.
+
+    At watchdog_ms WatchdogExpired is raised in the calling thread; the hook
+    catches it, reports what it has and exits normally (under hook-daemon.py
+    too). Call disarm_watchdog() before writing the final verdict. On POSIX
+    SIGALRM's default action also ends the process WATCHDOG_GRACE_MS later,
+    for a thread that never returns to Python code. Uses _thread, not
+    threading: this runs on every hook call and threading costs ~4 ms to import.
+    """
+    import _thread
+
+    deadline["lock"] = _thread.allocate_lock()
+    deadline["thread"] = _thread.get_ident()
+
+    def fire():
+        time.sleep(deadline["watchdog_ms"] / 1000)
+        with deadline["lock"]:
+            if deadline["done"]:
+                return
+            deadline["fired"] = True
+            try:
+                _async_raise(deadline["thread"], WatchdogExpired)
+            except (ImportError, AttributeError):
+                print(f"{deadline['hook']}: watchdog reached — exiting (fail open)", file=sys.stderr)
+                sys.stderr.flush()
+                os._exit(0)
+
+    _thread.start_new_thread(fire, ())
+    if hasattr(signal, "setitimer"):
+        try:
+            signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        except ValueError:  # Not the main thread: the watchdog thread alone has to do
+            return
+        signal.setitimer(signal.ITIMER_REAL, (deadline["watchdog_ms"] + WATCHDOG_GRACE_MS) / 1000)
+        deadline["alarm"] = True
+
+
+def disarm_watchdog(deadline):
+    """Stop the watchdog before writing the verdict. Safe to call more than once.
+
+    If it fired but WatchdogExpired has not been delivered yet, the pending
+    exception is cancelled: the hook is about to finish anyway.
+    """
+    if deadline["lock"] is None:
+        return
+    with deadline["lock"]:
+        if deadline["done"]:
+            return
+        deadline["done"] = True
+        if deadline["fired"]:
+            _async_raise(deadline["thread"], None)
+    if deadline["alarm"]:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+# ---------------------------------------------------------------------------
+# Profiling
+# ---------------------------------------------------------------------------
+
+# "1" prints a hook's per-check timings to stderr as one JSON line; any other
+# value is a file path the line is appended to (hook stderr is mostly hidden).
+PROFILE_ENV = "CERBERO_PROFILE"
+
+
+def hook_profile(hook):
+    """Timing collector for one hook run, or None unless CERBERO_PROFILE is set."""
+    target = os.environ.get(PROFILE_ENV, "")
+    if target in ("", "0"):
+        return None
+    now = time.perf_counter()
+    return {"hook": hook, "target": target, "start": now, "mark": now, "checks": {}}
+
+
+def profile_mark(profile, check, **counters):
+    """Charge the time since the previous mark to `check`, and add its counters.
+
+    Call it where each check ends; no-op when profiling is off.
+    """
+    if profile is None:
+        return
+    now = time.perf_counter()
+    stats = profile["checks"].setdefault(check, {"wall_ms": 0.0})
+    stats["wall_ms"] += (now - profile["mark"]) * 1000
+    for key, value in counters.items():
+        stats[key] = stats.get(key, 0) + value
+    profile["mark"] = now
+
+
+def profile_emit(profile):
+    """Write the collected timings as one JSON line (fails silently)."""
+    if profile is None:
+        return
+    for stats in profile["checks"].values():
+        stats["wall_ms"] = round(stats["wall_ms"], 3)
+    line = json.dumps({
+        "hook": profile["hook"],
+        "total_ms": round((time.perf_counter() - profile["start"]) * 1000, 3),
+        "checks": profile["checks"],
+    })
+    if profile["target"] == "1":
+        print(f"Cerbero profile: {line}", file=sys.stderr)
+        return
+    try:
+        with open(profile["target"], "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass
@@ -1,15 +1,196 @@
 """Cerbero hook: PreToolUse — audit trail for MCP tool invocations.
 
-Known limitation (M-RES-001): No file locking on concurrent writes. The counter
-read-increment-write has a theoretical TOCTOU race if CC fires parallel PreToolUse
-hooks. Impact: counter off by ±1 (used only for reminder threshold). Log append via
-open('a') is effectively atomic for entries < 4KB on POSIX/NTFS. Accepted risk.
+The log is segmented: entries are appended to .claude/security/mcp-audit.log
+(the active segment). Once it reaches segment_bytes it is renamed to
+mcp-audit.<seq>.log (gzip-compressed to .log.gz with "compress"), and the
+oldest sealed segments are deleted while all segments exceed max_bytes.
+Nothing is ever rewritten. Each entry carries "n", its invocation number; the
+next one comes from the tail of the active segment, or from the segment
+index (mcp-audit.index.json) right after a rotation. Per call: one small tail
+read and one append.
+
+Optional overrides in .claude/security/mcp-audit.json:
+    {"segment_bytes": 1000000, "max_bytes": 10000000, "compress": false}
+
+Known limitation (M-RES-001): No file locking on concurrent writes. Parallel
+PreToolUse hooks may read the same tail and log the same "n" (used only for the
+reminder threshold), and two hooks crossing segment_bytes together may seal a
+tiny extra segment. Log append via open('a') is effectively atomic for entries
+< 4KB on POSIX/NTFS. Accepted risk.
 """
 import sys
 import json
 import os
+import re
 from datetime import datetime, timezone
 
+LOG_NAME = "mcp-audit.log"
+INDEX_NAME = "mcp-audit.index.json"
+CONFIG_NAME = "mcp-audit.json"
+LEGACY_COUNTER_NAME = "invocation-counter.txt"  # Pre-segment counter, read once to seed "n"
+SEGMENT_NAME = re.compile(r"^mcp-audit\.(\d+)\.log(\.gz)?$")
+SEGMENT_BYTES = 1_000_000
+MAX_BYTES = 10_000_000
+TAIL_BYTES = 4096  # An entry is well under this; the last full line is in it
+REMINDER_EVERY = 50
+
+
+def _load_config(log_dir):
+    """Overrides from CONFIG_NAME; defaults if absent or unreadable (fail open)."""
+    try:
+        with open(os.path.join(log_dir, CONFIG_NAME), "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    if not isinstance(config, dict):
+        config = {}
+
+    def positive(key, default):
+        value = config.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            return default
+        return int(value)
+
+    return {
+        "segment_bytes": positive("segment_bytes", SEGMENT_BYTES),
+        "max_bytes": positive("max_bytes", MAX_BYTES),
+        "compress": config.get("compress") is True,
+    }
+
+
+def _load_index(log_dir):
+    try:
+        with open(os.path.join(log_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {"entries": 0, "segments": []}
+    if not isinstance(index, dict) or not isinstance(index.get("segments"), list):
+        return {"entries": 0, "segments": []}
+    return index
+
+
+def _save_index(log_dir, index):
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(dir=log_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, os.path.join(log_dir, INDEX_NAME))
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _last_number(tail):
+    """"n" of the last complete entry in a tail of the log, or None."""
+    for line in reversed(tail.splitlines()):
+        try:
+            n = json.loads(line).get("n")
+        except (ValueError, AttributeError):
+            continue  # Partial first line of the tail, or a corrupt entry
+        return n if isinstance(n, int) else None
+    return None
+
+
+def _previous_count(log_dir, tail):
+    """Invocations logged before this one (no read-modify-write of a counter).
+
+    The legacy counter file is used once, to carry its count over, and removed.
+    """
+    n = _last_number(tail)
+    if n is not None:
+        return n
+    index_entries = _load_index(log_dir).get("entries")
+    if isinstance(index_entries, int) and index_entries > 0:
+        return index_entries  # Active segment just rotated
+    counter_path = os.path.join(log_dir, LEGACY_COUNTER_NAME)
+    try:
+        with open(counter_path, "r", encoding="utf-8") as f:
+            count = int(f.read().strip())
+        os.remove(counter_path)
+    except (OSError, ValueError):
+        return 0
+    return count
+
+
+def _tail_number(path):
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - TAIL_BYTES))
+        return _last_number(f.read().decode("utf-8", "replace"))
+
+
+def _record_entries(index, last):
+    if isinstance(last, int):
+        previous = index.get("entries")
+        index["entries"] = max(last, previous if isinstance(previous, int) else 0)
+
+
+def _seal(log_dir, config):
+    """Rename the active segment to the next numbered segment, compress, enforce max_bytes."""
+    import gzip
+    import shutil
+
+    log_path = os.path.join(log_dir, LOG_NAME)
+    sealing = os.path.join(log_dir, f"mcp-audit.sealing-{os.getpid()}.log")
+    try:
+        if os.path.getsize(log_path) < config["segment_bytes"]:
+            return  # Another hook rotated it first
+        # Record the count first: the fresh active segment continues from it
+        index = _load_index(log_dir)
+        _record_entries(index, _tail_number(log_path))
+        _save_index(log_dir, index)
+        os.replace(log_path, sealing)  # New entries now start a fresh active segment
+    except OSError:
+        return
+
+    segments = []
+    for name in os.listdir(log_dir):
+        match = SEGMENT_NAME.match(name)
+        if match:
+            segments.append((int(match.group(1)), name))
+    seq = max((s for s, _ in segments), default=0) + 1
+    last = _tail_number(sealing)  # Entries appended between the two reads
+
+    name = f"mcp-audit.{seq:06d}.log"
+    if config["compress"]:
+        name += ".gz"
+        with open(sealing, "rb") as src, gzip.open(os.path.join(log_dir, name), "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(sealing)
+    else:
+        os.replace(sealing, os.path.join(log_dir, name))
+    segments.append((seq, name))
+
+    # Retention: drop the oldest sealed segments while everything exceeds max_bytes
+    # (the newest is always kept)
+    segments.sort()
+    sizes = {}
+    for _, seg_name in segments:
+        try:
+            sizes[seg_name] = os.path.getsize(os.path.join(log_dir, seg_name))
+        except OSError:
+            sizes[seg_name] = 0
+    try:
+        total = os.path.getsize(log_path)
+    except OSError:
+        total = 0
+    total += sum(sizes.values())
+    while len(segments) > 1 and total > config["max_bytes"]:
+        _, oldest = segments.pop(0)
+        try:
+            os.remove(os.path.join(log_dir, oldest))
+        except OSError:
+            pass
+        total -= sizes[oldest]
+
+    index = _load_index(log_dir)
+    _record_entries(index, last)
+    index["segments"] = [{"name": seg_name, "bytes": sizes[seg_name]} for _, seg_name in segments]
+    _save_index(log_dir, index)
+
 
 def main():
     try:
@@ -22,7 +203,8 @@ def main():
 
     log_dir = os.path.join(cwd, ".claude", "security")
     os.makedirs(log_dir, exist_ok=True)
-    log_path = os.path.join(log_dir, "mcp-audit.log")
+    log_path = os.path.join(log_dir, LOG_NAME)
+    config = _load_config(log_dir)
 
     entry = {
         "ts": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
@@ -31,39 +213,20 @@ def main():
         "session": data.get("session_id", "unknown"),
     }
 
-    # Log rotation: truncate to last 500 entries if over 1MB
-    try:
-        if os.path.exists(log_path) and os.path.getsize(log_path) > 1_000_000:
-            with open(log_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            with open(log_path, "w", encoding="utf-8") as f:
-                f.writelines(lines[-500:])
-    except OSError:
-        pass  # Fail open on rotation errors
-
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(entry) + "\n")
+    with open(log_path, "a+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - TAIL_BYTES))
+        count = _previous_count(log_dir, f.read().decode("utf-8", "replace")) + 1
+        entry["n"] = count
+        f.write((json.dumps(entry) + "\n").encode("utf-8"))
+        size = f.tell()
 
-    # M-5: Atomic counter update (tempfile + os.replace on same volume)
-    counter_path = os.path.join(log_dir, "invocation-counter.txt")
-    count = 0
-    if os.path.exists(counter_path):
+    if size >= config["segment_bytes"]:
         try:
-            count = int(open(counter_path, "r").read().strip())
-        except (ValueError, OSError):
-            count = 0
-    count += 1
-    try:
-        import tempfile
-        fd, tmp_path = tempfile.mkstemp(dir=log_dir)
-        with os.fdopen(fd, "w") as cf:
-            cf.write(str(count))
-        os.replace(tmp_path, counter_path)
-    except OSError:
-        # Fallback: direct write (non-atomic but functional)
-        with open(counter_path, "w", encoding="utf-8") as cf:
-            cf.write(str(count))
-    if count % 50 == 0:
+            _seal(log_dir, config)
+        except OSError:
+            pass  # Fail open on rotation errors: the active segment keeps growing
+    if count % REMINDER_EVERY == 0:
         print(f"Cerbero: {count} MCP invocations since last reset. Consider running /cerbero verify.", file=sys.stderr)
 
     sys.exit(0)
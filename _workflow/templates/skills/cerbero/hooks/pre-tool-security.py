@@ -13,23 +13,35 @@ import json
 import re
 import shlex
 
+# ReDoS: a gap between two parts of a rule is a tempered dot that stops at the
+# next occurrence of the part before it, (?:(?!curl).)*?, never a bare .*. With
+# .* every repeat of the first part rescans the rest of the line, so a command
+# like "curl curl curl ..." takes quadratic time (cubic with two gaps) and the
+# hook is killed at its timeout, which allows the command. A tempered gap keeps
+# matching linear and matches whenever .* did. After a \s+ the gap starts at a
+# non-space, so the two never split one run of blanks between them (that is
+# quadratic too). Check with scripts/fuzz-rules.py.
 DANGEROUS_PATTERNS = [
     (r"rm\s+-rf?", "recursive delete"),
     (r"mkfs\.", "filesystem format"),
     (r"dd\s+if=", "disk overwrite"),
     (r"chmod\s+777", "world-writable permissions"),
-    (r":\(\)\s*\{.*:\|:&\s*\}\s*;:", "fork bomb"),
-    (r"curl.*\|.*sh", "remote code execution via curl|sh"),
-    (r"wget.*\|.*sh", "remote code execution via wget|sh"),
+    (r":\(\)\s*\{(?:(?!:\(\)\s*\{).)*?:\|:&\s*\}\s*;:", "fork bomb"),
+    (r"curl(?:(?!curl).)*?\|(?:(?!\|).)*?sh", "remote code execution via curl|sh"),
+    (r"wget(?:(?!wget).)*?\|(?:(?!\|).)*?sh", "remote code execution via wget|sh"),
     (r"nc\s+-e", "reverse shell via netcat"),
-    (r"python.*-c.*import\s+os.*\b(system|exec|popen|spawn)\b", "Python OS command execution"),
-    (r"Invoke-WebRequest.*\|.*iex", "PowerShell remote execution"),
+    (
+        r"python(?:(?!python).)*?-c(?:(?!-c).)*?"
+        r"import\s+os(?:(?!import\s+os).)*?\b(system|exec|popen|spawn)\b",
+        "Python OS command execution",
+    ),
+    (r"Invoke-WebRequest(?:(?!Invoke-WebRequest).)*?\|(?:(?!\|).)*?iex", "PowerShell remote execution"),
     (r"iex\s*\(", "PowerShell Invoke-Expression"),
-    (r"Start-Process.*-NoNewWindow", "hidden process execution"),
+    (r"Start-Process(?:(?!Start-Process).)*?-NoNewWindow", "hidden process execution"),
     # C-SEC-001: eval/base64/source bypass patterns
     (r"(?:^|[;&|]\s*)eval\s+\S", "eval command execution"),
     (r"\beval\$", "eval with subshell"),
-    (r"\$\(.*base64\s+(-d|--decode)", "base64 decode in subshell"),
+    (r"\$\((?:(?!\$\().)*?base64\s+(-d|--decode)", "base64 decode in subshell"),
     (r"source\s+/dev/stdin", "stdin source execution"),
     (r"`[^`]*base64\s+(-d|--decode)[^`]*`", "base64 decode in backtick subshell"),
     # M-3: cmd.exe dangerous commands (Windows)
@@ -41,13 +53,17 @@ DANGEROUS_PATTERNS = [
 ]
 
 WARNING_PATTERNS = [
-    (r"curl\s+.*-o\s", "download to disk via curl -o"),
-    (r"curl\s+.*--output\s", "download to disk via curl --output"),
-    (r"wget\s+.*-O\s", "download to disk via wget -O"),
-    (r"wget\s+.*--output-document", "download to disk via wget --output-document"),
-    (r"Invoke-WebRequest.*-OutFile", "download to disk via Invoke-WebRequest"),
+    (r"curl\s+(?:\S(?:(?!curl\s).)*?)?-o\s", "download to disk via curl -o"),
+    (r"curl\s+(?:\S(?:(?!curl\s).)*?)?--output\s", "download to disk via curl --output"),
+    (r"wget\s+(?:\S(?:(?!wget\s).)*?)?-O\s", "download to disk via wget -O"),
+    (r"wget\s+(?:\S(?:(?!wget\s).)*?)?--output-document", "download to disk via wget --output-document"),
+    (r"Invoke-WebRequest(?:(?!Invoke-WebRequest).)*?-OutFile", "download to disk via Invoke-WebRequest"),
 ]
 
+# Compiled once at import (kept warm by hook-daemon.py)
+_DANGEROUS_RULES = [(re.compile(p, re.IGNORECASE), desc) for p, desc in DANGEROUS_PATTERNS]
+_WARNING_RULES = [(re.compile(p, re.IGNORECASE), desc) for p, desc in WARNING_PATTERNS]
+
 
 def _normalize_command(cmd):
     """Best-effort shell normalization via shlex. Resolves quotes, backslashes.
@@ -73,13 +89,13 @@ def main():
 
     # M-4: Scan ALL patterns, collect matches, return highest severity
     blocks = []
-    for pattern, desc in DANGEROUS_PATTERNS:
-        if re.search(pattern, command, re.IGNORECASE) or re.search(pattern, normalized, re.IGNORECASE):
+    for regex, desc in _DANGEROUS_RULES:
+        if regex.search(command) or regex.search(normalized):
             blocks.append(desc)
 
     warnings = []
-    for pattern, desc in WARNING_PATTERNS:
-        if re.search(pattern, command, re.IGNORECASE) or re.search(pattern, normalized, re.IGNORECASE):
+    for regex, desc in _WARNING_RULES:
+        if regex.search(command) or regex.search(normalized):
             warnings.append(desc)
 
     if blocks:
@@ -8,6 +8,11 @@ Defense pipeline: normalize-then-detect
   5. Token proximity detection (defeat paraphrase attacks)
   6. Comment extraction + rescan (defeat HTML/code comment smuggling)
   7. Base64 decode-and-rescan (defeat encoding bypasses)
+Steps 1-3 and the tag/VS/Sneaky Bits/bidi detectors are shared with the other
+Cerbero hooks via cerbero_core.py. Without it the hook fails closed: the
+regex checks run on the raw prompt and the prompt is blocked either way.
+The latency budget fails closed too: the pattern check always runs, and a
+prompt whose later checks were skipped or cut by the watchdog is blocked.
 
 Language coverage (M-2):
   - EN: full patterns (identity hijack, instruction override, proximity pairs)
@@ -15,121 +20,113 @@ Language coverage (M-2):
   - PT: proximity pairs only
   - FR: proximity pairs only
   - DE/IT/other: no coverage
-  To add a language: add patterns to IDENTITY_HIJACK + INSTRUCTION_OVERRIDE + SUSPICIOUS_PAIRS
+  To add a language: add (pattern, anchors) rules to IDENTITY_HIJACK + INSTRUCTION_OVERRIDE
+  and word pairs to SUSPICIOUS_PAIRS
 """
 import sys
 import json
 import re
-import unicodedata
-import base64
 
-# ---------------------------------------------------------------------------
-# Normalization tables
-# ---------------------------------------------------------------------------
+try:
+    import cerbero_core  # Shared normalization + Unicode detectors (deployed alongside)
+except ImportError:
+    cerbero_core = None
 
-# Zero-width / invisible characters — stripped before pattern matching (NOT blocked)
-# Includes classic ZW + Variation Selectors + Sneaky Bits for normalization.
-ZERO_WIDTH_CHARS = re.compile(
-    r"[\u200b\u200c\u200d\ufeff\u00ad\u2060\u180e"
-    r"\uFE00-\uFE0F"               # Variation Selectors 1-16
-    r"\U000E0100-\U000E01EF"       # Variation Selectors 17-256
-    r"\u2062\u2064]"               # Sneaky Bits (invisible times/plus)
-)
+# Zero-width characters stripped by cerbero_core.normalize_counted() are not
+# blocked, only reported past this count.
 ZW_WARN_THRESHOLD = 5
 
-# Cyrillic→Latin confusables (visually identical characters)
-CONFUSABLES = str.maketrans({
-    # Cyrillic lowercase
-    "\u0430": "a", "\u0435": "e", "\u043e": "o", "\u0440": "p",
-    "\u0441": "c", "\u0443": "y", "\u0445": "x", "\u04bb": "h",
-    "\u0456": "i", "\u0458": "j", "\u043a": "k", "\u043c": "m",
-    "\u043d": "n", "\u0442": "t", "\u0432": "v", "\u0437": "z",
-    # Cyrillic uppercase
-    "\u0410": "A", "\u0415": "E", "\u041e": "O", "\u0420": "P",
-    "\u0421": "C", "\u0423": "Y", "\u0425": "X", "\u0406": "I",
-    "\u041a": "K", "\u041c": "M", "\u041d": "N", "\u0422": "T",
-    "\u0412": "V",
-    # Greek lowercase (M-SEC-002)
-    "\u03B1": "a", "\u03BF": "o", "\u03B5": "e", "\u03B9": "i",
-    "\u03C1": "p",
-    # Greek uppercase (M-SEC-002)
-    "\u0391": "A", "\u0392": "B", "\u0395": "E", "\u0397": "H",
-    "\u0399": "I", "\u039A": "K", "\u039C": "M", "\u039D": "N",
-    "\u039F": "O", "\u03A1": "P", "\u03A4": "T", "\u03A5": "Y",
-    "\u03A7": "X",
-})
+# Latency budget, sized against Claude Code's 60 s hook timeout: checks after
+# the pattern check that have not started by then are skipped and the prompt
+# is blocked; the watchdog blocks a check still running at its limit (override
+# per project in .claude/hook-budgets.json).
+LATENCY_BUDGET_MS = 40_000
+WATCHDOG_MS = 55_000
 
 # ---------------------------------------------------------------------------
 # Injection patterns — organized by category, all use \s+ for flexibility
 # ---------------------------------------------------------------------------
 
+# Each rule is (pattern, anchors): anchors are lowercase literals at least one
+# of which every match contains. cerbero_core's prefilter looks for them first
+# and only rules whose anchors occur run their regex. Rules share an anchor
+# where they can ("ignor", "system"): each distinct anchor costs one pass.
+
 IDENTITY_HIJACK = [
-    r"you\s+are\s+now\b",
-    r"pretend\s+you\s+are",
-    r"act\s+as\s+if",
-    r"from\s+now\s+on\s+you",
-    r"roleplay\s+as",
-    r"simulate\s+being",
-    r"assume\s+the\s+role",
-    r"switch\s+to\s.{0,20}\smode",
+    (r"you\s+are\s+now\b", ("now",)),
+    (r"pretend\s+you\s+are", ("pretend",)),
+    (r"act\s+as\s+if", ("act",)),
+    (r"from\s+now\s+on\s+you", ("from",)),
+    (r"roleplay\s+as", ("roleplay",)),
+    (r"simulate\s+being", ("simulate",)),
+    (r"assume\s+the\s+role", ("assume",)),
+    (r"switch\s+to\s.{0,20}\smode", ("switch",)),
     # Spanish
-    r"ahora\s+eres",
-    r"actua\s+como\s+si",
-    r"a\s+partir\s+de\s+ahora",
+    (r"ahora\s+eres", ("ahora",)),
+    (r"actua\s+como\s+si", ("act",)),
+    (r"a\s+partir\s+de\s+ahora", ("ahora",)),
 ]
 
 INSTRUCTION_OVERRIDE = [
-    r"ignore\s+(all\s+)?previous\s+instructions",
-    r"override\s+system\s+prompt",
-    r"forget\s+your\s+rules",
-    r"new\s+system\s+prompt",
-    r"disregard\s+(the\s+|all\s+)?(above|instructions)",
-    r"ignore\s+(the\s+)?above",
-    r"bypass\s+safety",
-    r"ignore\s+all\s+constraints",
+    (r"ignore\s+(all\s+)?previous\s+instructions", ("ignor",)),
+    (r"override\s+system\s+prompt", ("system",)),
+    (r"forget\s+your\s+rules", ("forget",)),
+    (r"new\s+system\s+prompt", ("system",)),
+    (r"disregard\s+(the\s+|all\s+)?(above|instructions)", ("disregard",)),
+    (r"ignore\s+(the\s+)?above", ("ignor",)),
+    (r"bypass\s+safety", ("bypass",)),
+    (r"ignore\s+all\s+constraints", ("ignor",)),
     # Spanish
-    r"ignora\s+(las\s+)?instrucciones",
-    r"olvida\s+tus\s+reglas",
-    r"ignora\s+todo\s+lo\s+anterior",
+    (r"ignora\s+(las\s+)?instrucciones", ("ignor",)),
+    (r"olvida\s+tus\s+reglas", ("olvida",)),
+    (r"ignora\s+todo\s+lo\s+anterior", ("ignor",)),
 ]
 
 SECRECY_PATTERNS = [
-    r"do\s+not\s+tell\s+the\s+user",
-    r"do\s+not\s+report",
-    r"do\s+not\s+share",
-    r"hide\s+this\s+from",
-    r"don'?t\s+mention",
-    r"keep\s+this\s+secret",
-    r"do\s+not\s+reveal",
-    r"never\s+disclose",
+    (r"do\s+not\s+tell\s+the\s+user", ("tell",)),
+    (r"do\s+not\s+report", ("report",)),
+    (r"do\s+not\s+share", ("share",)),
+    (r"hide\s+this\s+from", ("hide",)),
+    (r"don'?t\s+mention", ("mention",)),
+    (r"keep\s+this\s+secret", ("secret",)),
+    (r"do\s+not\s+reveal", ("reveal",)),
+    (r"never\s+disclose", ("disclose",)),
 ]
 
 FORMAT_INJECTION = [
-    r"<system>",
-    r"\[inst\]",
-    r"begin\s+system\s+message",
-    r"</?(system|instruction|prompt)\s*/?>",
-    r"\[system\]",
-    r"<<sys>>",
-    r"human:\s*\n\s*assistant:",
+    (r"<system>", ("system",)),
+    (r"\[inst\]", ("inst",)),
+    (r"begin\s+system\s+message", ("system",)),
+    (r"</?(system|instruction|prompt)\s*/?>", ("system", "inst", "prompt")),
+    (r"\[system\]", ("system",)),
+    (r"<<sys>>", ("sys",)),
+    (r"human:[^\S\n]*\n\s*assistant:", ("assistant:",)),  # Not \s*\n\s*: quadratic on blank lines
 ]
 
-INJECTION_PATTERNS = (
+INJECTION_RULES = (
     IDENTITY_HIJACK + INSTRUCTION_OVERRIDE
     + SECRECY_PATTERNS + FORMAT_INJECTION
 )
+INJECTION_PATTERNS = [p for p, _ in INJECTION_RULES]
 
 # Category lookup for better error messages
 _PATTERN_CATEGORY = {}
-for _p in IDENTITY_HIJACK:
+for _p, _ in IDENTITY_HIJACK:
     _PATTERN_CATEGORY[_p] = "identity hijack"
-for _p in INSTRUCTION_OVERRIDE:
+for _p, _ in INSTRUCTION_OVERRIDE:
     _PATTERN_CATEGORY[_p] = "instruction override"
-for _p in SECRECY_PATTERNS:
+for _p, _ in SECRECY_PATTERNS:
     _PATTERN_CATEGORY[_p] = "secrecy/exfiltration"
-for _p in FORMAT_INJECTION:
+for _p, _ in FORMAT_INJECTION:
     _PATTERN_CATEGORY[_p] = "format injection"
 
+# Compiled once at import (kept warm by hook-daemon.py)
+_INJECTION_RULES = [(p, re.compile(p)) for p in INJECTION_PATTERNS]
+_INJECTION_PREFILTER = (
+    cerbero_core.compile_prefilter([anchors for _, anchors in INJECTION_RULES])
+    if cerbero_core else None
+)
+
 # ---------------------------------------------------------------------------
 # Token proximity detection — catches paraphrases without exact phrases
 # ---------------------------------------------------------------------------
@@ -163,31 +160,6 @@ SUSPICIOUS_PAIRS = [
 BASE64_PATTERN = re.compile(r"(?<!\w)[A-Za-z0-9+/]{20,}={0,2}(?!\w)")
 BASE64_MAX_DECODE_DEPTH = 3
 
-# ---------------------------------------------------------------------------
-# Unicode threat detection
-# ---------------------------------------------------------------------------
-
-# Tag characters (U+E0000-U+E007F) — used for emoji tag sequences but exploited
-# for smuggling with 100% ASR. 3+ consecutive = suspicious.
-# Full block includes U+E0001 (LANGUAGE TAG) used in attacks (Cisco AI Defense).
-TAG_SMUGGLING_PATTERN = re.compile(r"[\U000E0000-\U000E007F]{3,}")
-
-# Bidi override characters — can make text render in misleading order
-BIDI_OVERRIDE_PATTERN = re.compile(
-    r"[\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069]"
-)
-
-# Variation Selectors — VS1-16 (U+FE00-FE0F) + VS17-256 (U+E0100-E01EF)
-# Used by Glassworm campaign (Mar 2026, 400+ repos) for binary encoding.
-# 1 VS after a base char is legitimate (emoji presentation). 2+ consecutive = suspicious.
-VARIATION_SELECTOR_PATTERN = re.compile(
-    r"[\uFE00-\uFE0F\U000E0100-\U000E01EF]{2,}"
-)
-
-# Sneaky Bits — U+2062 (invisible times) / U+2064 (invisible plus)
-# Binary encoding technique (Rehberger, Mar 2025). 3+ consecutive = suspicious.
-SNEAKY_BITS_PATTERN = re.compile(r"[\u2062\u2064]{3,}")
-
 # ---------------------------------------------------------------------------
 # Comment extraction — scan for injection hidden in comments
 # ---------------------------------------------------------------------------
@@ -196,31 +168,35 @@ SNEAKY_BITS_PATTERN = re.compile(r"[\u2062\u2064]{3,}")
 # <!-- <!-- injection --> --> extract up to the first -->. The inner injection
 # text IS captured (with extra <!-- prefix as noise), so injection patterns
 # still match against the extracted content. Accepted edge case.
-COMMENT_PATTERN = re.compile(
-    r"<!--.*?-->|/\*.*?\*/",
-    re.DOTALL,
-)
+# Comments are cut with str.find() from each opener to the next closer, as
+# re.findall(r"<!--.*?-->|/\*.*?\*/", re.DOTALL) would cut them. That regex
+# rescans to the end from every unclosed opener, quadratic on "<!--<!--..."
+# (ReDoS); here an opener kind with no closer left is skipped instead.
+COMMENT_OPENER = re.compile(r"<!--|/\*")
+COMMENT_CLOSERS = {"<!--": "-->", "/*": "*/"}
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _normalize(prompt):
-    """Strip ZW chars, NFKC normalize, apply confusables table.
-
-    Returns (normalized_text, zero_width_count).
-    """
-    zw_count = len(ZERO_WIDTH_CHARS.findall(prompt))
-    cleaned = ZERO_WIDTH_CHARS.sub("", prompt)
-    nfkc = unicodedata.normalize("NFKC", cleaned)
-    deconfused = nfkc.translate(CONFUSABLES)
-    return deconfused, zw_count
-
-
 def _extract_comment_content(text):
     """Extract text hidden inside HTML/code comments, lowercased."""
-    matches = COMMENT_PATTERN.findall(text)
+    matches = []
+    unclosed = set()  # Opener kinds with no closer after the current position
+    pos = 0
+    while len(unclosed) < len(COMMENT_CLOSERS):
+        opener = COMMENT_OPENER.search(text, pos)
+        if not opener:
+            break
+        closer = COMMENT_CLOSERS[opener.group(0)]
+        end = -1 if opener.group(0) in unclosed else text.find(closer, opener.end())
+        if end < 0:
+            unclosed.add(opener.group(0))
+            pos = opener.start() + 1
+            continue
+        pos = end + len(closer)
+        matches.append(text[opener.start():pos])
     if not matches:
         return ""
     stripped = []
@@ -231,54 +207,96 @@ def _extract_comment_content(text):
     return " ".join(stripped).lower()
 
 
-def _check_patterns(text):
-    """Check INJECTION_PATTERNS against text. Returns (pattern, category) or None."""
-    for pattern in INJECTION_PATTERNS:
-        if re.search(pattern, text):
+def _check_patterns(text, counters=None):
+    """Check INJECTION_PATTERNS against text. Returns (pattern, category) or None.
+
+    Only rules whose anchors occur in text are searched (first match in table
+    order, as before). counters, when profiling, tallies the searches run.
+    """
+    if _INJECTION_PREFILTER is None:  # cerbero_core missing: search every rule
+        indices = range(len(_INJECTION_RULES))
+    else:
+        indices = cerbero_core.prefilter_rules(_INJECTION_PREFILTER, text)
+    for index in indices:
+        pattern, regex = _INJECTION_RULES[index]
+        if counters is not None:
+            counters["regex_evals"] += 1
+        if regex.search(text):
             category = _PATTERN_CATEGORY.get(pattern, "injection")
             return pattern, category
     return None
 
 
+def _token_roles(word, cache):
+    """Per-pair (is_a, is_b) flags for one token, memoized per distinct word.
+
+    A means set_a or a CRITICAL_PREFIXES variant (H-SEC-001), B means set_b.
+    """
+    roles = cache.get(word)
+    if roles is None:
+        prefixed = word.startswith(CRITICAL_PREFIXES)
+        roles = tuple(
+            (prefixed or word in set_a, word in set_b)
+            for set_a, set_b in SUSPICIOUS_PAIRS
+        )
+        cache[word] = roles
+    return roles
+
+
+def _window_pair(window):
+    """The (a, b) pair reported for a window that triggers, as first in pair order.
+
+    Exact set_a words win over prefix variants (e.g., 'forgetting' matches
+    prefix 'forget'); ties go to the earliest word in the window.
+    """
+    for set_a, set_b in SUSPICIOUS_PAIRS:
+        matched_a = [w for w in window if w in set_a]
+        if not matched_a:
+            matched_a = [w for w in window if w.startswith(CRITICAL_PREFIXES)]
+        matched_b = [w for w in window if w in set_b]
+        if matched_a and matched_b:
+            return matched_a[0], matched_b[0]
+    return None
+
+
 def _check_proximity(words):
     """Sliding window check for suspicious word pairs.
 
     Matches exact words in set_a/set_b, plus morphological variants via
-    CRITICAL_PREFIXES (e.g., 'forgetting' matches prefix 'forget').
+    CRITICAL_PREFIXES. One pass: each token is classified once and the last
+    A/B position per pair is kept; the first token that closes a pair within
+    PROXIMITY_WINDOW fixes the earliest triggering window, which is then
+    resolved by _window_pair().
     """
-    for i in range(len(words)):
-        window = words[i:i + PROXIMITY_WINDOW]
-        window_set = set(window)
-        for set_a, set_b in SUSPICIOUS_PAIRS:
-            # Exact matches
-            matched_a = window_set & set_a
-            matched_b = window_set & set_b
-            # Prefix matches for set_a (H-SEC-001)
-            if not matched_a:
-                for w in window:
-                    if any(w.startswith(p) for p in CRITICAL_PREFIXES):
-                        matched_a = {w}
-                        break
-            if matched_a and matched_b:
-                return matched_a.pop(), matched_b.pop()
+    cache = {}
+    last_a = [-PROXIMITY_WINDOW] * len(SUSPICIOUS_PAIRS)
+    last_b = [-PROXIMITY_WINDOW] * len(SUSPICIOUS_PAIRS)
+    for pos, word in enumerate(words):
+        for pair, (is_a, is_b) in enumerate(_token_roles(word, cache)):
+            if is_a:
+                last_a[pair] = pos
+            if is_b:
+                last_b[pair] = pos
+            if (is_a or is_b) and pos - min(last_a[pair], last_b[pair]) < PROXIMITY_WINDOW:
+                start = max(0, pos - PROXIMITY_WINDOW + 1)
+                return _window_pair(words[start:start + PROXIMITY_WINDOW])
     return None
 
 
-def _decode_and_rescan_base64(text, depth=0):
+def _decode_and_rescan_base64(text, budget, depth=0):
     """Try to decode base64 matches and scan decoded content for injection.
 
+    Decoding goes through cerbero_core.decode_base64(): repeated blobs are
+    decoded once and the whole prompt shares one byte/candidate budget.
     Returns (decoded_text, pattern, category) if injection found, else None.
     """
     if depth >= BASE64_MAX_DECODE_DEPTH:
         return None
 
     for match in BASE64_PATTERN.finditer(text):
-        candidate = match.group()
-        try:
-            decoded = base64.b64decode(candidate).decode("utf-8", errors="ignore")
-        except Exception:
-            continue
-
+        decoded = cerbero_core.decode_base64(
+            match.group(), budget, depth_left=BASE64_MAX_DECODE_DEPTH - depth
+        )
         if not decoded or len(decoded) < 5:
             continue
 
@@ -288,7 +306,7 @@ def _decode_and_rescan_base64(text, depth=0):
             return decoded, result[0], result[1]
 
         # Recursive: check for nested base64
-        nested = _decode_and_rescan_base64(lower_decoded, depth + 1)
+        nested = _decode_and_rescan_base64(lower_decoded, budget, depth + 1)
         if nested:
             return nested
 
@@ -299,115 +317,178 @@ def _decode_and_rescan_base64(text, depth=0):
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
-    try:
-        data = json.load(sys.stdin)
-    except (json.JSONDecodeError, ValueError):
-        print("Cerbero: could not parse hook input — failing open", file=sys.stderr)
-        sys.exit(0)
+def _scan_prompt(prompt, deadline, warnings, profile=None):
+    """Blocking checks, cheapest first. Returns the block message or None.
 
-    prompt = data.get("prompt", "")
-    if not prompt:
-        sys.exit(0)
+    Non-blocking warnings are appended to `warnings` as they are found, so a
+    run cut short by the watchdog still reports them. The pattern check always
+    runs; once the latency budget is spent the checks after it are skipped
+    (named in deadline["skipped"]) and main() blocks the prompt.
+    profile (cerbero_core.hook_profile) collects per-check timings.
+    """
+    def counters():
+        return {"regex_evals": 0} if profile is not None else None
 
     # --- Step 1: Normalize ---
-    normalized, zw_count = _normalize(prompt)
+    normalized, zw_count = cerbero_core.normalize_counted(prompt)
     lower = normalized.lower()
+    cerbero_core.profile_mark(profile, "normalize", chars=len(prompt))
+
+    # --- Step 2: Unicode attacks on the raw prompt (one character-class pass) ---
+    unicode_kinds = {f["kind"] for f in cerbero_core.detect(prompt, first_only=True)}
+    cerbero_core.profile_mark(profile, "unicode", chars=len(prompt), matches=len(unicode_kinds))
+    if "TAG_SMUGGLING" in unicode_kinds:
+        return "Cerbero: blocked prompt — tag character sequence detected (possible smuggling)"
+    if "VARIATION_SELECTOR" in unicode_kinds:
+        return (
+            "Cerbero: blocked prompt — variation selector sequence detected "
+            "(possible Glassworm-style encoding)"
+        )
+    if "SNEAKY_BITS" in unicode_kinds:
+        return (
+            "Cerbero: blocked prompt — sneaky bits sequence detected "
+            "(possible binary encoding via invisible math operators)"
+        )
+    if "BIDI_OVERRIDE" in unicode_kinds:
+        warnings.append(
+            "Cerbero warning: bidirectional override characters detected. "
+            "Text may render differently than intended."
+        )
+    if zw_count > ZW_WARN_THRESHOLD:
+        warnings.append(
+            f"Cerbero warning: {zw_count} zero-width characters stripped "
+            "from prompt. May indicate hidden content."
+        )
 
-    # --- Step 2: Injection patterns on normalized text (BLOCK) ---
-    result = _check_patterns(lower)
+    # --- Step 3: Injection patterns on normalized text (never skipped) ---
+    stats = counters()
+    result = _check_patterns(lower, stats)
+    cerbero_core.profile_mark(
+        profile, "patterns", chars=len(lower), matches=int(bool(result)), **(stats or {})
+    )
     if result:
         pattern, category = result
-        print(
-            f"Cerbero: blocked prompt — {category} pattern detected: '{pattern}'",
-            file=sys.stderr,
-        )
-        sys.exit(2)
-
-    # --- Step 3: Injection patterns inside comments (BLOCK) ---
-    comment_text = _extract_comment_content(normalized)
-    if comment_text:
-        result = _check_patterns(comment_text)
+        return f"Cerbero: blocked prompt — {category} pattern detected: '{pattern}'"
+
+    # --- Step 4: Injection patterns inside comments ---
+    if cerbero_core.checkpoint(deadline, "comments"):
+        comment_text = _extract_comment_content(normalized)
+        stats = counters()
+        result = _check_patterns(comment_text, stats) if comment_text else None
+        cerbero_core.profile_mark(profile, "comments", chars=len(comment_text), **(stats or {}))
         if result:
             pattern, category = result
-            print(
-                f"Cerbero: blocked prompt — {category} hidden in comment: '{pattern}'",
-                file=sys.stderr,
+            return f"Cerbero: blocked prompt — {category} hidden in comment: '{pattern}'"
+
+    # --- Step 5: Token proximity detection ---
+    if cerbero_core.checkpoint(deadline, "proximity"):
+        words = re.findall(r"\b\w+\b", lower)
+        prox = _check_proximity(words)
+        cerbero_core.profile_mark(profile, "proximity", words=len(words), matches=int(bool(prox)))
+        if prox:
+            return (
+                f"Cerbero: blocked prompt — suspicious word proximity: "
+                f"'{prox[0]}' near '{prox[1]}'"
             )
-            sys.exit(2)
-
-    # --- Step 4: Token proximity detection (BLOCK) ---
-    words = re.findall(r"\b\w+\b", lower)
-    prox = _check_proximity(words)
-    if prox:
-        print(
-            f"Cerbero: blocked prompt — suspicious word proximity: "
-            f"'{prox[0]}' near '{prox[1]}'",
-            file=sys.stderr,
-        )
-        sys.exit(2)
 
-    # --- Step 5: Tag character smuggling (BLOCK) ---
-    if TAG_SMUGGLING_PATTERN.search(prompt):
-        print(
-            "Cerbero: blocked prompt — tag character sequence detected "
-            "(possible smuggling)",
-            file=sys.stderr,
+    # --- Step 6: Base64 decode-and-rescan ---
+    if cerbero_core.checkpoint(deadline, "base64"):
+        b64_budget = cerbero_core.base64_budget()
+        b64_result = _decode_and_rescan_base64(prompt, b64_budget)
+        cerbero_core.profile_mark(
+            profile, "base64",
+            candidates=b64_budget["candidates"],
+            bytes_decoded=b64_budget["max_bytes"] - b64_budget["bytes_left"],
+            matches=int(bool(b64_result)),
         )
-        sys.exit(2)
+        if b64_result:
+            decoded_text, pattern, category = b64_result
+            return f"Cerbero: blocked prompt — {category} pattern in Base64 payload: '{pattern}'"
+        if b64_budget["exhausted"]:
+            # Fail closed: padding a prompt until the budget runs out must not
+            # let the encoded payload behind it through unscanned
+            return (
+                f"Cerbero: blocked prompt — {b64_budget['skipped']} Base64 candidates not decoded "
+                f"(decode budget of {b64_budget['max_bytes']} bytes reached). "
+                "Split the prompt or remove the encoded content."
+            )
+        if BASE64_PATTERN.search(prompt):
+            warnings.append(
+                "Cerbero warning: suspicious Base64 payload detected in prompt. "
+                "Verify source before proceeding."
+            )
+    return None
 
-    # --- Step 5b: Variation Selector encoding (BLOCK) ---
-    if VARIATION_SELECTOR_PATTERN.search(prompt):
-        print(
-            "Cerbero: blocked prompt — variation selector sequence detected "
-            "(possible Glassworm-style encoding)",
-            file=sys.stderr,
-        )
-        sys.exit(2)
 
-    # --- Step 5c: Sneaky Bits binary encoding (BLOCK) ---
-    if SNEAKY_BITS_PATTERN.search(prompt):
-        print(
-            "Cerbero: blocked prompt — sneaky bits sequence detected "
-            "(possible binary encoding via invisible math operators)",
-            file=sys.stderr,
-        )
-        sys.exit(2)
+def _scan_without_core(prompt):
+    """Block message for a prompt screened without cerbero_core.py.
 
-    # --- Step 6: Base64 decode-and-rescan (BLOCK if injection found) ---
-    b64_result = _decode_and_rescan_base64(prompt)
-    if b64_result:
-        decoded_text, pattern, category = b64_result
-        print(
-            f"Cerbero: blocked prompt — {category} pattern in Base64 payload: "
-            f"'{pattern}'",
-            file=sys.stderr,
-        )
-        sys.exit(2)
-
-    # --- Step 7: Warnings (non-blocking) ---
+    The injection, comment and proximity checks are plain regex and still run
+    (on the raw text: no normalization), so a hit names its rule. Everything
+    else blocks too: the Unicode and Base64 checks need the core, and losing
+    one file must not turn prompt screening off.
+    """
+    lower = prompt.lower()
+    result = _check_patterns(lower)
+    if result:
+        return f"Cerbero: blocked prompt — {result[1]} pattern detected: '{result[0]}'"
+    comment_text = _extract_comment_content(prompt)
+    result = _check_patterns(comment_text) if comment_text else None
+    if result:
+        return f"Cerbero: blocked prompt — {result[1]} hidden in comment: '{result[0]}'"
+    prox = _check_proximity(re.findall(r"\b\w+\b", lower))
+    if prox:
+        return f"Cerbero: blocked prompt — suspicious word proximity: '{prox[0]}' near '{prox[1]}'"
+    return (
+        "Cerbero: blocked prompt — cerbero_core.py is missing from .claude/hooks/, so the "
+        "Unicode and Base64 checks cannot run. Restore it (reinstall Cerbero) to continue."
+    )
 
-    if BIDI_OVERRIDE_PATTERN.search(prompt):
-        print(
-            "Cerbero warning: bidirectional override characters detected. "
-            "Text may render differently than intended.",
-            file=sys.stderr,
-        )
 
-    if zw_count > ZW_WARN_THRESHOLD:
-        print(
-            f"Cerbero warning: {zw_count} zero-width characters stripped "
-            "from prompt. May indicate hidden content.",
-            file=sys.stderr,
-        )
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        print("Cerbero: could not parse hook input — failing open", file=sys.stderr)
+        sys.exit(0)
 
-    if BASE64_PATTERN.search(prompt) and not b64_result:
-        print(
-            "Cerbero warning: suspicious Base64 payload detected in prompt. "
-            "Verify source before proceeding.",
-            file=sys.stderr,
+    prompt = data.get("prompt", "")
+    if not prompt:
+        sys.exit(0)
+    if cerbero_core is None:
+        print(_scan_without_core(prompt), file=sys.stderr)
+        sys.exit(2)  # Fail closed
+
+    deadline = cerbero_core.hook_deadline(
+        "validate-prompt.py", data.get("cwd"), budget_ms=LATENCY_BUDGET_MS, watchdog_ms=WATCHDOG_MS
+    )
+    cerbero_core.arm_watchdog(deadline)
+    profile = cerbero_core.hook_profile("validate-prompt.py")
+    warnings = []
+    try:
+        blocked = _scan_prompt(prompt, deadline, warnings, profile)
+        cerbero_core.disarm_watchdog(deadline)
+    except cerbero_core.WatchdogExpired:
+        cerbero_core.disarm_watchdog(deadline)
+        blocked = None
+        deadline["skipped"].append("checks still running at the watchdog")
+    cerbero_core.profile_emit(profile)
+
+    note = cerbero_core.skipped_note(deadline)
+    if not blocked and note:
+        # Fail closed: padding a prompt until the budget runs out must not
+        # skip the checks that would have caught the payload behind it
+        blocked = (
+            f"Cerbero: blocked prompt — only partially scanned ({note}). "
+            "Split the prompt or raise the budget in .claude/hook-budgets.json."
         )
+    if blocked:
+        print(blocked, file=sys.stderr)
+        sys.exit(2)
 
+    # --- Step 7: Warnings (non-blocking) ---
+    for warning in warnings:
+        print(warning, file=sys.stderr)
     sys.exit(0)
 
 